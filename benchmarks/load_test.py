@@ -0,0 +1,136 @@
+"""End-to-end load test of the bot's Dispatcher.
+
+Feeds synthetic updates from simulated users through the same routers as
+main.py, against the in-memory Supabase fake from tests/fakes.py with an
+injected per-query latency, and reports throughput and latency percentiles
+per command. No Telegram or Supabase connection is needed.
+
+Run from the repository root:
+    python -m benchmarks.load_test [--users 1000] [--requests 5000] [--latency 0.005]
+"""
+import argparse
+import asyncio
+import logging
+import random
+import statistics
+import time
+from collections import defaultdict
+
+from aiogram import Bot
+
+from database.connection import db
+from database.operations import DropIDOperations, UserOperations
+from main import create_dispatcher, create_throttling_middleware
+from tests.fakes import FakeSupabaseClient, MockedSession, make_callback_update, make_message_update
+
+# Relative weight of each workload in the generated traffic
+DEFAULT_MIX = "start=1,create_id=1,send=4,inbox=2,callback=2"
+
+CALLBACKS = ["skip_pin", "list_drop_ids"]
+
+def parse_mix(spec: str) -> dict:
+    mix = {}
+    for part in spec.split(','):
+        name, _, weight = part.partition('=')
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+def percentile(samples: list, pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+async def seed(user_ids: list) -> list:
+    """Create every simulated user with one Drop ID; returns the Drop IDs"""
+    drop_ids = []
+    for user_id in user_ids:
+        await UserOperations.get_or_create_user(user_id)
+        drop = await DropIDOperations.create_drop_id(user_id)
+        drop_ids.append(drop.id)
+    return drop_ids
+
+def build_update(kind: str, user_id: int, drop_ids: list, rng: random.Random):
+    if kind == "start":
+        return make_message_update(user_id, "/start")
+    if kind == "create_id":
+        return make_message_update(user_id, "/create_id")
+    if kind == "send":
+        return make_message_update(user_id, f"/send {rng.choice(drop_ids)} load test message")
+    if kind == "inbox":
+        return make_message_update(user_id, "/inbox")
+    if kind == "callback":
+        return make_callback_update(user_id, rng.choice(CALLBACKS))
+    raise ValueError(f"Unknown workload: {kind}")
+
+async def run(args):
+    client = FakeSupabaseClient()
+    db.client = client
+    db.is_connected = True
+
+    rng = random.Random(args.seed)
+    user_ids = [100_000 + i for i in range(args.users)]
+    drop_ids = await seed(user_ids)
+    client.latency = args.latency
+
+    bot = Bot(token="123456:LOAD-test", session=MockedSession())
+    dp = create_dispatcher(throttling=create_throttling_middleware() if args.throttle else None)
+
+    mix = parse_mix(args.mix)
+    kinds = rng.choices(list(mix), weights=list(mix.values()), k=args.requests)
+    updates = [(kind, build_update(kind, rng.choice(user_ids), drop_ids, rng)) for kind in kinds]
+
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def feed(kind, update):
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await dp.feed_update(bot, update)
+            except Exception:
+                errors[kind] += 1
+            latencies[kind].append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(feed(kind, update) for kind, update in updates))
+    elapsed = time.perf_counter() - started
+
+    print(f"{args.requests} updates from {args.users} users, concurrency {args.concurrency}, "
+          f"db latency {args.latency * 1000:.1f} ms, throttling {'on' if args.throttle else 'off'}")
+    print(f"Total: {elapsed:.2f}s, {args.requests / elapsed:,.0f} updates/s, "
+          f"{len(client.queries):,} queries, {len(bot.session.requests):,} API calls\n")
+    print(f"{'command':<12}{'count':>8}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'mean ms':>10}")
+    for kind in mix:
+        samples = latencies.get(kind)
+        if not samples:
+            continue
+        print(f"{kind:<12}{len(samples):>8}{errors[kind]:>8}"
+              f"{percentile(samples, 50) * 1000:>10.1f}"
+              f"{percentile(samples, 95) * 1000:>10.1f}"
+              f"{percentile(samples, 99) * 1000:>10.1f}"
+              f"{statistics.fmean(samples) * 1000:>10.1f}")
+
+    await bot.session.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=100,
+                        help="updates processed at the same time (like polling tasks)")
+    parser.add_argument("--latency", type=float, default=0.005,
+                        help="seconds added to every database query")
+    parser.add_argument("--mix", default=DEFAULT_MIX,
+                        help=f"workload weights (default: {DEFAULT_MIX})")
+    parser.add_argument("--throttle", action="store_true",
+                        help="enable the throttling middleware as in production")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    # main.py configures verbose logging on import; keep the report readable
+    logging.getLogger().setLevel(logging.CRITICAL)
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
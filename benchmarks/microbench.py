@@ -0,0 +1,94 @@
+"""Microbenchmarks for helpers that run on every message.
+
+Results are compared against benchmarks/baseline.json; a benchmark slower
+than its baseline by more than --threshold fails the run (exit code 1).
+Baselines are machine specific: refresh them with --update-baseline on the
+machine that runs the comparison.
+
+Run from the repository root:
+    python -m benchmarks.microbench [--threshold 0.25] [--update-baseline] [--only NAME]
+"""
+import argparse
+import json
+import sys
+import timeit
+from pathlib import Path
+
+from bot.handlers.send import generate_anonymous_id
+from utils.file_handlers import FileTypeDetector, FileValidator
+from utils.text import safe_truncate
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+
+SAMPLE_TEXT = "Hi! Meeting moved to 10:30 (room #4) - bring the *final* draft_v2.pdf, thanks."
+SAMPLE_FILES = [
+    ("image/jpeg", "photo.jpg"),
+    ("application/pdf", "report.PDF"),
+    ("application/octet-stream", "song.mp3"),
+    ("application/octet-stream", "archive.tar.gz"),
+    ("", "notes"),
+]
+SAMPLE_SIZES = [0, 512, 48_000, 3_500_000, 2_000_000_000, None]
+
+# name -> callable doing one representative unit of work
+BENCHMARKS = {
+    "safe_truncate": lambda: safe_truncate(SAMPLE_TEXT, 30),
+    "categorize_file": lambda: [FileTypeDetector.categorize_file(mime, name) for mime, name in SAMPLE_FILES],
+    "format_file_size": lambda: [FileValidator.format_file_size(size) for size in SAMPLE_SIZES],
+    "is_file_safe": lambda: [FileValidator.is_file_safe(name, mime) for mime, name in SAMPLE_FILES],
+    "generate_anonymous_id": lambda: generate_anonymous_id(),
+}
+
+def measure(func, repeat: int = 5) -> float:
+    """Best-of-`repeat` nanoseconds per call (each repeat runs for ~0.2s)"""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1e9
+
+def load_baseline() -> dict:
+    if not BASELINE_PATH.exists():
+        return {}
+    return json.loads(BASELINE_PATH.read_text())
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed slowdown relative to the baseline (0.25 = 25%%)")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="store the measured timings as the new baseline")
+    parser.add_argument("--only", action="append", choices=sorted(BENCHMARKS),
+                        help="run only the named benchmark (repeatable)")
+    args = parser.parse_args()
+
+    baseline = load_baseline()
+    results = {}
+    regressions = []
+
+    print(f"{'benchmark':<24}{'ns/call':>12}{'baseline':>12}{'change':>10}")
+    for name in args.only or BENCHMARKS:
+        results[name] = elapsed = measure(BENCHMARKS[name])
+        expected = baseline.get(name)
+
+        if expected:
+            change = elapsed / expected - 1
+            flag = "  REGRESSION" if change > args.threshold else ""
+            print(f"{name:<24}{elapsed:>12,.0f}{expected:>12,.0f}{change:>+10.1%}{flag}")
+            if flag:
+                regressions.append(name)
+        else:
+            print(f"{name:<24}{elapsed:>12,.0f}{'-':>12}{'-':>10}")
+
+    if args.update_baseline:
+        baseline.update({name: round(value, 1) for name, value in results.items()})
+        BASELINE_PATH.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+        print(f"\nBaseline written to {BASELINE_PATH}")
+        return 0
+
+    if regressions:
+        print(f"\n{len(regressions)} benchmark(s) slower than baseline by more than "
+              f"{args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,6 +5,7 @@ from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 
 from database.operations import DropIDOperations, UserOperations
+from database.errors import DatabaseUnavailableError
 from config import config
 import logging
 
@@ -23,7 +24,7 @@ async def create_drop_id_command(message: types.Message):
         user_id = message.from_user.id
         
         # Ensure user exists in database
-        await UserOperations.get_or_create_user(user_id)
+        await UserOperations.ensure_user(user_id)
         
         # Create a basic Drop ID (no expiration, not single-use)
         drop_id = await DropIDOperations.create_drop_id(user_id)
@@ -65,6 +66,8 @@ async def create_drop_id_command(message: types.Message):
         
         await message.answer(response_text, parse_mode="HTML", reply_markup=keyboard)
         
+    except DatabaseUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error creating Drop ID: {e}")
         await message.answer("❌ Failed to create Drop ID. Please try again.")
@@ -91,6 +94,8 @@ You now have multiple Drop IDs that you can use for different purposes.
         await callback_query.message.edit_text(response_text, parse_mode="HTML")
         await callback_query.answer("New Drop ID created!")
         
+    except DatabaseUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error creating another Drop ID: {e}")
         await callback_query.answer("❌ Failed to create Drop ID", show_alert=True)
@@ -120,6 +125,8 @@ Perfect for one-time transfers or sensitive sharing.
         await callback_query.message.edit_text(response_text, parse_mode="HTML")
         await callback_query.answer("Single-use Drop ID created!")
         
+    except DatabaseUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error creating single-use Drop ID: {e}")
         await callback_query.answer("❌ Failed to create Drop ID", show_alert=True)
@@ -185,6 +192,8 @@ Perfect for temporary sharing needs.
         await callback_query.message.edit_text(response_text, parse_mode="HTML")
         await callback_query.answer(f"Expiring Drop ID created! (expires in {expires_text})")
         
+    except DatabaseUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error creating expiring Drop ID: {e}")
         await callback_query.answer("❌ Failed to create Drop ID", show_alert=True)
@@ -226,6 +235,8 @@ async def list_user_drop_ids(callback_query: types.CallbackQuery):
         await callback_query.message.edit_text(response_text, parse_mode="HTML")
         await callback_query.answer("Your Drop IDs")
         
+    except DatabaseUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error listing Drop IDs: {e}")
         await callback_query.answer("❌ Failed to load Drop IDs", show_alert=True)
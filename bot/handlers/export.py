@@ -0,0 +1,114 @@
+from aiogram import Router, types
+from aiogram.filters import Command
+from aiogram.fsm.context import FSMContext
+from aiogram.fsm.state import State, StatesGroup
+from aiogram.types import FSInputFile
+
+from database.operations import UserOperations, InboxOperations
+from database.errors import DatabaseUnavailableError
+from security.pin import PINManager
+from utils.export import write_inbox_archive
+from utils.file_handlers import FileValidator
+from config import config
+from datetime import datetime
+import logging
+import os
+import tempfile
+
+logger = logging.getLogger(__name__)
+
+export_router = Router()
+
+# Users with an export in progress (one at a time per user)
+exports_in_progress: set = set()
+
+class ExportStates(StatesGroup):
+    """States for the /export flow"""
+    waiting_for_pin = State()
+
+@export_router.message(Command("export"))
+async def export_command(message: types.Message, state: FSMContext):
+    """Handle /export command - send the whole inbox as a ZIP archive"""
+    try:
+        await state.clear()
+        user_id = message.from_user.id
+        
+        # The archive holds every message, so it gets the same protection as /inbox
+        if await UserOperations.user_has_pin(user_id):
+            await state.set_state(ExportStates.waiting_for_pin)
+            await message.answer(
+                "🔐 PIN Required\n\n"
+                "Please enter your 4-6 digit PIN to export your inbox:",
+                parse_mode=None
+            )
+            return
+        
+        await send_inbox_export(message, user_id)
+        
+    except DatabaseUnavailableError:
+        raise
+    except Exception as e:
+        logger.error(f"Error in export command: {e}")
+        await message.answer("❌ Export failed. Please try again.", parse_mode=None)
+
+@export_router.message(ExportStates.waiting_for_pin)
+async def verify_export_pin(message: types.Message, state: FSMContext):
+    """Verify the PIN and send the export"""
+    try:
+        await state.clear()
+        user_id = message.from_user.id
+        pin_hash = await UserOperations.get_user_pin_hash(user_id)
+        
+        if not pin_hash or not PINManager.verify_pin((message.text or "").strip(), pin_hash):
+            await message.answer("❌ Incorrect PIN! Run /export again to retry.", parse_mode=None)
+            return
+        
+        await send_inbox_export(message, user_id)
+        
+    except DatabaseUnavailableError:
+        raise
+    except Exception as e:
+        logger.error(f"Error verifying export PIN: {e}")
+        await message.answer("❌ Export failed. Please try again.", parse_mode=None)
+
+async def send_inbox_export(message: types.Message, user_id: int):
+    """Build the archive in a temporary directory and send it as one document"""
+    if user_id in exports_in_progress:
+        await message.answer("⏳ Your export is already being prepared.", parse_mode=None)
+        return
+    
+    exports_in_progress.add(user_id)
+    try:
+        await message.answer("⏳ Preparing your export...", parse_mode=None)
+        
+        with tempfile.TemporaryDirectory(prefix="dropkey-export-") as directory:
+            path = os.path.join(directory, "inbox.zip")
+            pages = InboxOperations.iter_inbox_pages(user_id, page_size=config.EXPORT_PAGE_SIZE)
+            count = await write_inbox_archive(pages, path)
+            
+            if count == 0:
+                await message.answer("📭 Your inbox is empty - nothing to export.", parse_mode=None)
+                return
+            
+            size = os.path.getsize(path)
+            if size > config.MAX_FILE_SIZE:
+                await message.answer(
+                    f"❌ Your export is {FileValidator.format_file_size(size)}, more than Telegram allows "
+                    f"({FileValidator.format_file_size(config.MAX_FILE_SIZE)}). "
+                    f"Use /retention or delete old Drop IDs to make it smaller.",
+                    parse_mode=None
+                )
+                return
+            
+            filename = f"dropkey-inbox-{datetime.utcnow():%Y-%m-%d}.zip"
+            await message.answer_document(
+                FSInputFile(path, filename=filename),
+                caption=(
+                    f"📦 {count} item{'s' if count != 1 else ''} exported.\n"
+                    f"manifest.json lists every item; message texts are in messages/."
+                ),
+                parse_mode=None
+            )
+            logger.info(f"Exported {count} inbox items ({size} bytes) for user {user_id}")
+    finally:
+        exports_in_progress.discard(user_id)
@@ -19,8 +19,11 @@ async def fallback_handler(message: types.Message):
             "/create_id - Create a Drop ID\n"
             "/send - Send message/file\n"
             "/inbox - Check your inbox\n"
+            "/search - Search your inbox\n"
+            "/export - Download your inbox as a ZIP\n"
             "/disable_id - Disable Drop IDs\n"
             "/enable_id - Enable Drop IDs\n"
-            "/my_ids - View your Drop IDs",
+            "/my_ids - View your Drop IDs\n"
+            "/retention - Set how long items are kept",
             parse_mode=None
         )
\ No newline at end of file
@@ -6,10 +6,15 @@ from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 from aiogram.filters import CommandObject
 
 from database.operations import UserOperations, InboxOperations
+from database.errors import DatabaseUnavailableError
 from security.pin import PINManager
+from utils.media_delivery import deliver_files
+from utils.file_handlers import FileValidator
+from utils.text import safe_truncate
 from config import config
+import html
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
 
 logger = logging.getLogger(__name__)
 
@@ -21,25 +26,68 @@ class InboxStates(StatesGroup):
     setting_new_pin = State()
     confirming_new_pin = State()
 
+# Inbox filters kept in FSM data as {'drop_id': str, 'file_type': str, 'days': int}
+INBOX_FILTER_TYPES = [
+    ("text", "💬 Text"), ("image", "🖼️ Images"), ("document", "📄 Docs"),
+    ("audio", "🎵 Audio"), ("video", "🎬 Video"),
+]
+INBOX_FILTER_DAYS = [(1, "24 hours"), (7, "7 days"), (30, "30 days")]
+
+def inbox_query_filters(filters: dict) -> dict:
+    """Keyword arguments for InboxOperations.get_user_inbox from stored filters"""
+    query_filters = {'drop_id': filters.get('drop_id'), 'file_type': filters.get('file_type')}
+    if filters.get('days'):
+        query_filters['since'] = datetime.utcnow() - timedelta(days=filters['days'])
+    return query_filters
+
+def describe_filters(filters: dict) -> str:
+    """Short human-readable summary of active filters"""
+    parts = []
+    if filters.get('drop_id'):
+        parts.append(f"Drop ID <code>{html.escape(filters['drop_id'])}</code>")
+    if filters.get('file_type'):
+        parts.append(dict(INBOX_FILTER_TYPES).get(filters['file_type'], filters['file_type']))
+    if filters.get('days'):
+        days = filters['days']
+        parts.append(f"last {dict(INBOX_FILTER_DAYS).get(days, f'{days} days')}")
+    return " · ".join(parts)
+
+def filter_menu_keyboard(filters: dict, drop_ids: list) -> InlineKeyboardMarkup:
+    """Filter picker; the active choice in each group is ticked"""
+    def option(text: str, active: bool, callback_data: str) -> InlineKeyboardButton:
+        return InlineKeyboardButton(text=f"✅ {text}" if active else text, callback_data=callback_data)
+
+    rows = []
+    drop_buttons = [option("All Drop IDs", not filters.get('drop_id'), "inbox_fdrop_all")]
+    drop_buttons += [
+        option(drop.id, filters.get('drop_id') == drop.id, f"inbox_fdrop_{drop.id}")
+        for drop in drop_ids[:config.INBOX_FILTER_MAX_DROP_IDS]
+    ]
+    rows += [drop_buttons[i:i + 3] for i in range(0, len(drop_buttons), 3)]
+
+    type_buttons = [option("All types", not filters.get('file_type'), "inbox_ftype_all")]
+    type_buttons += [
+        option(label, filters.get('file_type') == file_type, f"inbox_ftype_{file_type}")
+        for file_type, label in INBOX_FILTER_TYPES
+    ]
+    rows += [type_buttons[i:i + 3] for i in range(0, len(type_buttons), 3)]
+
+    rows.append([option("Any time", not filters.get('days'), "inbox_fdate_0")] + [
+        option(label, filters.get('days') == days, f"inbox_fdate_{days}")
+        for days, label in INBOX_FILTER_DAYS
+    ])
+    rows.append([
+        InlineKeyboardButton(text="📥 Show Inbox", callback_data="refresh_inbox"),
+        InlineKeyboardButton(text="♻️ Clear Filters", callback_data="inbox_fclear")
+    ])
+    return InlineKeyboardMarkup(inline_keyboard=rows)
+
 def text_filter(text: str):
     """Custom text filter for callback queries"""
     async def func(callback_query: types.CallbackQuery):
         return callback_query.data == text
     return func
 
-def escape_markdown(text: str) -> str:
-    """Escape special Markdown characters"""
-    if not text:
-        return ""
-    escape_chars = r'_*[]()~`>#+-=|{}.!'
-    return ''.join(f'\\{char}' if char in escape_chars else char for char in str(text))
-
-def safe_truncate(text: str, max_length: int = 50) -> str:
-    """Safely truncate text without breaking Markdown"""
-    if len(text) <= max_length:
-        return text
-    return text[:max_length-3] + "..."
-
 @inbox_router.message(Command("inbox"))
 async def inbox_command(message: types.Message, state: FSMContext):
     """Handle /inbox command - check if PIN is set and verify"""
@@ -80,6 +128,8 @@ async def inbox_command(message: types.Message, state: FSMContext):
         await state.set_state(InboxStates.waiting_for_pin)
         await state.update_data(user_id=user_id)
         
+    except DatabaseUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error in inbox command: {e}")
         await message.answer("❌ Failed to access inbox. Please try again.", parse_mode=None)
@@ -103,6 +153,8 @@ async def skip_pin_setup(callback_query: types.CallbackQuery):
         user_id = callback_query.from_user.id
         await show_inbox_contents(callback_query.message, user_id)
         await callback_query.answer()
+    except DatabaseUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error showing inbox without PIN: {e}")
         await callback_query.message.edit_text("❌ Failed to access inbox.")
@@ -149,6 +201,8 @@ async def verify_pin_and_show_inbox(message: types.Message, state: FSMContext):
                     parse_mode=None
                 )
                 
+    except DatabaseUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error verifying PIN: {e}")
         await message.answer("❌ Failed to verify PIN. Please try again.")
@@ -179,6 +233,8 @@ async def set_new_pin(message: types.Message, state: FSMContext):
         )
         await state.set_state(InboxStates.confirming_new_pin)
         
+    except DatabaseUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error setting new PIN: {e}")
         await message.answer("❌ Failed to set PIN. Please try again.")
@@ -222,15 +278,16 @@ async def confirm_new_pin(message: types.Message, state: FSMContext):
         # Show inbox after PIN setup
         await show_inbox_contents(message, user_id)
         
+    except DatabaseUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error confirming PIN: {e}")
         await message.answer("❌ Failed to set PIN. Please try again.")
         await state.clear()
 
-async def show_inbox_contents(message: types.Message, user_id: int):
+async def show_inbox_contents(message: types.Message, user_id: int, filters: dict = None):
     """Display user's inbox contents with file delivery options (HTML-formatted, friendly dates/times)"""
     try:
-        import html
         from collections import defaultdict
         from datetime import datetime, timedelta, timezone
         try:
@@ -241,13 +298,28 @@ async def show_inbox_contents(message: types.Message, user_id: int):
             # Fallback: use UTC if zoneinfo unavailable
             tz = timezone.utc
 
-        inbox_items = await InboxOperations.get_user_inbox(user_id)
+        filters = filters or {}
+        inbox_items = await InboxOperations.get_user_inbox(user_id, **inbox_query_filters(filters))
 
         # Ensure inbox_items is always a list
         if inbox_items is None:
             inbox_items = []
             logger.warning(f"Inbox items was None for user {user_id}, using empty list")
 
+        if not inbox_items and any(filters.values()):
+            keyboard = InlineKeyboardMarkup(
+                inline_keyboard=[
+                    [InlineKeyboardButton(text="🔍 Change Filters", callback_data="inbox_filters")],
+                    [InlineKeyboardButton(text="♻️ Clear Filters", callback_data="inbox_fclear")]
+                ]
+            )
+            await message.answer(
+                f"<b>No Matching Items</b>\n\nNothing in your inbox matches: {describe_filters(filters)}",
+                reply_markup=keyboard,
+                parse_mode="HTML"
+            )
+            return
+
         if not inbox_items:
             keyboard = InlineKeyboardMarkup(
                 inline_keyboard=[
@@ -383,7 +455,16 @@ async def show_inbox_contents(message: types.Message, user_id: int):
             parts.append("\n")
 
         # Add management summary and hints
-        parts.append(f"<b>Total Messages:</b> {len(inbox_items)}\n\n")
+        stats = None if any(filters.values()) else await InboxOperations.get_owner_stats(user_id)
+        if any(filters.values()):
+            parts.append(f"<b>Matching Messages:</b> {len(inbox_items)} ({describe_filters(filters)})\n\n")
+        elif stats is not None and stats.item_count:
+            parts.append(
+                f"<b>Total Messages:</b> {stats.item_count} "
+                f"({stats.file_count} files, {FileValidator.format_file_size(stats.total_bytes)})\n\n"
+            )
+        else:
+            parts.append(f"<b>Total Messages:</b> {len(inbox_items)}\n\n")
         parts.append("💡 Click on file buttons below to view / download files.\n")
         parts.append("🔧 Use <code>/disable_id</code> to manage your Drop IDs")
 
@@ -430,12 +511,17 @@ async def show_inbox_contents(message: types.Message, user_id: int):
                     file_buttons.append(current_row)
                     current_row = []
 
+            file_buttons.append([
+                InlineKeyboardButton(text=f"📥 Download All ({len(file_items)})", callback_data="download_all_0")
+            ])
+
             # Add navigation buttons
             nav_buttons = [
                 InlineKeyboardButton(text="🆕 Create Drop ID", callback_data="create_from_inbox"),
                 InlineKeyboardButton(text="🔄 Refresh", callback_data="refresh_inbox")
             ]
             file_buttons.append(nav_buttons)
+            file_buttons.append([InlineKeyboardButton(text="🔍 Filter", callback_data="inbox_filters")])
 
             keyboard = InlineKeyboardMarkup(inline_keyboard=file_buttons)
         else:
@@ -443,29 +529,78 @@ async def show_inbox_contents(message: types.Message, user_id: int):
             keyboard = InlineKeyboardMarkup(
                 inline_keyboard=[
                     [InlineKeyboardButton(text="🆕 Create Drop ID", callback_data="create_from_inbox")],
-                    [InlineKeyboardButton(text="🔄 Refresh", callback_data="refresh_inbox")]
+                    [InlineKeyboardButton(text="🔄 Refresh", callback_data="refresh_inbox")],
+                    [InlineKeyboardButton(text="🔍 Filter", callback_data="inbox_filters")]
                 ]
             )
 
         await message.answer(response_text, reply_markup=keyboard, parse_mode="HTML")
 
+    except DatabaseUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error showing inbox contents: {e}")
         logger.error(f"Full error details:", exc_info=True)
         await message.answer("❌ Failed to load inbox contents. Please try again.")
 
 @inbox_router.callback_query(text_filter("refresh_inbox"))
-async def refresh_inbox(callback_query: types.CallbackQuery):
-    """Refresh inbox contents"""
+async def refresh_inbox(callback_query: types.CallbackQuery, state: FSMContext):
+    """Refresh inbox contents (keeping the active filters)"""
     try:
         user_id = callback_query.from_user.id
+        data = await state.get_data()
         await callback_query.message.edit_text("🔄 Refreshing inbox...")
-        await show_inbox_contents(callback_query.message, user_id)
+        await show_inbox_contents(callback_query.message, user_id, data.get('inbox_filters'))
         await callback_query.answer("Inbox refreshed!")
+    except DatabaseUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error refreshing inbox: {e}")
         await callback_query.answer("❌ Failed to refresh inbox", show_alert=True)
 
+@inbox_router.callback_query(lambda c: c.data.startswith("inbox_f"))
+async def update_inbox_filters(callback_query: types.CallbackQuery, state: FSMContext):
+    """Show the filter picker and apply filter choices"""
+    from database.operations import DropIDOperations
+    try:
+        user_id = callback_query.from_user.id
+        data = await state.get_data()
+        filters = dict(data.get('inbox_filters') or {})
+        choice = callback_query.data
+
+        if choice.startswith("inbox_fdrop_"):
+            drop_id = choice[len("inbox_fdrop_"):]
+            filters['drop_id'] = None if drop_id == "all" else drop_id
+        elif choice.startswith("inbox_ftype_"):
+            file_type = choice[len("inbox_ftype_"):]
+            filters['file_type'] = None if file_type == "all" else file_type
+        elif choice.startswith("inbox_fdate_"):
+            filters['days'] = int(choice[len("inbox_fdate_"):]) or None
+        elif choice == "inbox_fclear":
+            filters = {}
+
+        await state.update_data(inbox_filters=filters)
+
+        if choice == "inbox_fclear":
+            await callback_query.message.edit_text("♻️ Filters cleared. Loading inbox...")
+            await show_inbox_contents(callback_query.message, user_id)
+            await callback_query.answer()
+            return
+
+        drop_ids = await DropIDOperations.get_user_drop_ids(user_id)
+        summary = describe_filters(filters) or "No filters - showing everything"
+        await callback_query.message.edit_text(
+            f"🔍 <b>Filter Inbox</b>\n\n{summary}\n\nPick filters, then tap <b>Show Inbox</b>.",
+            reply_markup=filter_menu_keyboard(filters, drop_ids),
+            parse_mode="HTML"
+        )
+        await callback_query.answer()
+    except DatabaseUnavailableError:
+        raise
+    except Exception as e:
+        logger.error(f"Error updating inbox filters: {e}")
+        await callback_query.answer("❌ Failed to update filters", show_alert=True)
+
 @inbox_router.callback_query(text_filter("create_from_inbox"))
 async def create_from_inbox(callback_query: types.CallbackQuery):
     """Create Drop ID from inbox"""
@@ -481,6 +616,8 @@ async def create_from_inbox(callback_query: types.CallbackQuery):
             parse_mode=None
         )
         await callback_query.answer("Drop ID created!")
+    except DatabaseUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error creating Drop ID from inbox: {e}")
         await callback_query.answer("❌ Failed to create Drop ID", show_alert=True)
@@ -494,7 +631,11 @@ async def view_file(callback_query: types.CallbackQuery):
         
         # Get the file item from database
         from database.connection import db
-        response = db.table('inbox_items').select('*').eq('id', file_item_id).execute()
+        response = await db.table('inbox_items')\
+            .select('*')\
+            .eq('id', file_item_id)\
+            .is_('deleted_at', 'null')\
+            .execute()
         
         if not response.data or len(response.data) == 0:
             await callback_query.answer("❌ File not found", show_alert=True)
@@ -503,7 +644,11 @@ async def view_file(callback_query: types.CallbackQuery):
         file_data = response.data[0]
         
         # Verify the user owns this file (through Drop ID ownership)
-        drop_id_response = db.table('drop_ids').select('owner_id').eq('id', file_data['drop_id']).execute()
+        drop_id_response = await db.table('drop_ids')\
+            .select('owner_id')\
+            .eq('id', file_data['drop_id'])\
+            .is_('deleted_at', 'null')\
+            .execute()
         if not drop_id_response.data or drop_id_response.data[0]['owner_id'] != user_id:
             await callback_query.answer("❌ Access denied", show_alert=True)
             return
@@ -511,6 +656,8 @@ async def view_file(callback_query: types.CallbackQuery):
         # Send the file based on its type
         await send_file_to_user(callback_query, file_data)
         
+    except DatabaseUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error viewing file: {e}")
         await callback_query.answer("❌ Failed to load file", show_alert=True)
@@ -569,6 +716,58 @@ async def send_file_to_user(callback_query: types.CallbackQuery, file_data: dict
         logger.error(f"Error sending file to user: {e}")
         await callback_query.answer("❌ Failed to send file", show_alert=True)
 
+@inbox_router.callback_query(lambda c: c.data.startswith("download_all_"))
+async def download_all_files(callback_query: types.CallbackQuery, state: FSMContext):
+    """Deliver a page of inbox files (matching the active filters) grouped into media groups"""
+    try:
+        offset = int(callback_query.data.replace("download_all_", ""))
+        user_id = callback_query.from_user.id
+        page_size = config.DOWNLOAD_ALL_PAGE_SIZE
+        filters = (await state.get_data()).get('inbox_filters') or {}
+        
+        # Fetch one extra item to know whether another page follows
+        file_items = await InboxOperations.get_user_file_items(
+            user_id, limit=page_size + 1, offset=offset, **inbox_query_filters(filters)
+        )
+        has_more = len(file_items) > page_size
+        file_items = file_items[:page_size]
+        
+        if not file_items:
+            await callback_query.answer("📭 No files to download", show_alert=True)
+            return
+        
+        await callback_query.answer(f"📥 Sending {len(file_items)} files...")
+        delivered = await deliver_files(
+            callback_query.bot,
+            callback_query.message.chat.id,
+            file_items,
+            pause=config.DOWNLOAD_BATCH_PAUSE
+        )
+        
+        keyboard = None
+        if has_more:
+            keyboard = InlineKeyboardMarkup(
+                inline_keyboard=[[
+                    InlineKeyboardButton(
+                        text=f"📥 Next {page_size} files",
+                        callback_data=f"download_all_{offset + page_size}"
+                    )
+                ]]
+            )
+        
+        await callback_query.message.answer(
+            f"✅ Delivered {delivered} file{'s' if delivered != 1 else ''}"
+            f" ({offset + 1}-{offset + delivered}).",
+            reply_markup=keyboard,
+            parse_mode=None
+        )
+        
+    except DatabaseUnavailableError:
+        raise
+    except Exception as e:
+        logger.error(f"Error downloading all files: {e}", exc_info=True)
+        await callback_query.message.answer("❌ Failed to deliver all files. Please try again.", parse_mode=None)
+
 @inbox_router.callback_query(text_filter("clear_inbox"))
 async def clear_inbox_prompt(callback_query: types.CallbackQuery):
     """Prompt for inbox clearance confirmation"""
@@ -602,6 +801,8 @@ async def confirm_clear_inbox(callback_query: types.CallbackQuery):
             parse_mode="HTML"
         )
         await callback_query.answer("Inbox cleared!")
+    except DatabaseUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error clearing inbox: {e}")
         await callback_query.answer("❌ Failed to clear inbox", show_alert=True)
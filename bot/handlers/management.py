@@ -1,8 +1,10 @@
 from aiogram import Router, types
-from aiogram.filters import Command
+from aiogram.filters import Command, CommandObject
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 
-from database.operations import DropIDOperations, UserOperations
+from database.operations import DropIDOperations, InboxOperations, UserOperations
+from database.errors import DatabaseUnavailableError
+from utils.file_handlers import FileValidator
 from config import config
 import logging
 from datetime import datetime
@@ -17,19 +19,6 @@ def text_filter(text: str):
         return callback_query.data == text
     return func
 
-def escape_markdown(text: str) -> str:
-    """Escape special Markdown characters"""
-    if not text:
-        return ""
-    escape_chars = r'_*[]()~`>#+-=|{}.!'
-    return ''.join(f'\\{char}' if char in escape_chars else char for char in str(text))
-
-def safe_truncate(text: str, max_length: int = 50) -> str:
-    """Safely truncate text without breaking Markdown"""
-    if len(text) <= max_length:
-        return text
-    return text[:max_length-3] + "..."
-
 @management_router.message(Command("disable_id"))
 async def disable_id_command(message: types.Message):
     """Handle /disable_id command - show user's Drop IDs for disabling"""
@@ -94,6 +83,8 @@ async def disable_id_command(message: types.Message):
             parse_mode="HTML" 
         )
         
+    except DatabaseUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error in disable_id command: {e}")
         await message.answer("❌ Failed to load Drop IDs. Please try again.", parse_mode=None)
@@ -159,6 +150,8 @@ async def enable_id_command(message: types.Message):
             parse_mode="HTML"
         )
         
+    except DatabaseUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error in enable_id command: {e}")
         await message.answer("❌ Failed to load Drop IDs. Please try again.", parse_mode=None)
@@ -211,6 +204,8 @@ async def disable_single_drop_id(callback_query: types.CallbackQuery):
             )
             await callback_query.answer("Failed to disable", show_alert=True)
             
+    except DatabaseUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error disabling Drop ID: {e}")
         await callback_query.answer("❌ Failed to disable Drop ID", show_alert=True)
@@ -242,6 +237,8 @@ async def enable_single_drop_id(callback_query: types.CallbackQuery):
             )
             await callback_query.answer("Failed to enable", show_alert=True)
             
+    except DatabaseUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error enabling Drop ID: {e}")
         await callback_query.answer("❌ Failed to enable Drop ID", show_alert=True)
@@ -282,6 +279,8 @@ async def disable_all_drop_ids(callback_query: types.CallbackQuery):
         )
         await callback_query.answer(f"Disabled {disabled_count} IDs")
         
+    except DatabaseUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error disabling all Drop IDs: {e}")
         await callback_query.answer("❌ Failed to disable all Drop IDs", show_alert=True)
@@ -321,6 +320,8 @@ async def enable_all_drop_ids(callback_query: types.CallbackQuery):
         )
         await callback_query.answer(f"Enabled {enabled_count} IDs")
         
+    except DatabaseUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error enabling all Drop IDs: {e}")
         await callback_query.answer("❌ Failed to enable all Drop IDs", show_alert=True)
@@ -343,6 +344,7 @@ async def my_ids_command(message: types.Message):
         
         # Sort by creation date (newest first)
         drop_ids.sort(key=lambda x: x.created_at, reverse=True)
+        drop_id_stats = await InboxOperations.get_drop_id_stats(user_id)
         
         # Build response in chunks to avoid message length limits
         chunks = []
@@ -396,6 +398,14 @@ async def my_ids_command(message: types.Message):
                 f"Status: {status} | Type: {drop_type}\n"
                 f"Expires: {expires_text}\n"
                 f"Created: {created_str}\n"
+            )
+            stats = drop_id_stats.get(drop.id)
+            if stats:
+                drop_info += (
+                    f"Inbox: {stats.item_count} items "
+                    f"({FileValidator.format_file_size(stats.total_bytes)})\n"
+                )
+            drop_info += (
                 f"{'─' * 30}\n"
             )
             
@@ -416,7 +426,8 @@ async def my_ids_command(message: types.Message):
             f"• 🟢 Active: {active_count}\n"
             f"• 🔴 Disabled: {disabled_count}\n"
             f"• ⏰ Expired: {expired_count}\n"
-            f"• 📊 Total: {len(drop_ids)}\n\n"
+            f"• 📊 Total: {len(drop_ids)}\n"
+            f"• 📥 Received: {sum(stats.item_count for stats in drop_id_stats.values())} items\n\n"
             f"<b>Management:</b>\n"
             f"• Use /disable_id to disable active IDs\n"
             f"• Use /enable_id to enable disabled IDs\n"
@@ -432,6 +443,8 @@ async def my_ids_command(message: types.Message):
             else:
                 await message.answer(chunk, parse_mode="HTML")
         
+    except DatabaseUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error in my_ids command: {e}")
         await message.answer("❌ Failed to load your Drop IDs. Please try again.", parse_mode=None)
@@ -491,6 +504,8 @@ async def delete_id_command(message: types.Message):
             parse_mode="HTML"
         )
         
+    except DatabaseUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error in delete_id command: {e}")
         await message.answer("❌ Failed to load Drop IDs. Please try again.", parse_mode=None)
@@ -533,6 +548,8 @@ async def delete_single_drop_id(callback_query: types.CallbackQuery):
         )
         await callback_query.answer()
             
+    except DatabaseUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error preparing to delete Drop ID: {e}")
         await callback_query.answer("❌ Failed to prepare deletion", show_alert=True)
@@ -565,6 +582,8 @@ async def confirm_delete_single_drop_id(callback_query: types.CallbackQuery):
             )
             await callback_query.answer("Failed to delete", show_alert=True)
             
+    except DatabaseUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error deleting Drop ID: {e}")
         await callback_query.answer("❌ Failed to delete Drop ID", show_alert=True)
@@ -617,6 +636,8 @@ async def delete_all_drop_ids_prompt(callback_query: types.CallbackQuery):
         )
         await callback_query.answer()
         
+    except DatabaseUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error preparing to delete all Drop IDs: {e}")
         await callback_query.answer("❌ Failed to prepare deletion", show_alert=True)
@@ -655,6 +676,8 @@ async def confirm_delete_all_drop_ids(callback_query: types.CallbackQuery):
         )
         await callback_query.answer(f"Deleted {deleted_count} IDs")
         
+    except DatabaseUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error deleting all Drop IDs: {e}")
         await callback_query.answer("❌ Failed to delete all Drop IDs", show_alert=True)
@@ -666,4 +689,89 @@ async def cancel_delete_all(callback_query: types.CallbackQuery):
         "❌ Bulk deletion cancelled.\n\n"
         "No Drop IDs were deleted."
     )
-    await callback_query.answer("Cancelled")
\ No newline at end of file
+    await callback_query.answer("Cancelled")
+
+def parse_retention(value: str):
+    """Parse a /retention value: days, "off" (keep forever) or "default"; raises ValueError"""
+    value = value.lower()
+    if value == "off":
+        return 0
+    if value == "default":
+        return None
+    try:
+        days = int(value)
+    except ValueError:
+        raise ValueError('Use a number of days, "off" or "default"') from None
+    if not 1 <= days <= config.MAX_RETENTION_DAYS:
+        raise ValueError(f"Retention must be 1-{config.MAX_RETENTION_DAYS} days")
+    return days
+
+def describe_retention(days, inherited: str) -> str:
+    """Human-readable retention period; `inherited` is shown when none is set at this level"""
+    if days is None:
+        return inherited
+    if days == 0:
+        return "kept forever"
+    return f"{days} day{'s' if days != 1 else ''}"
+
+@management_router.message(Command("retention"))
+async def retention_command(message: types.Message, command: CommandObject):
+    """Handle /retention command - show or set how long received items are kept"""
+    try:
+        user_id = message.from_user.id
+        args = (command.args or "").split()
+        
+        if len(args) == 1:
+            days = parse_retention(args[0])
+            # Users who never opened their inbox have no users row yet
+            await UserOperations.get_or_create_user(user_id)
+            await UserOperations.set_retention_days(user_id, days)
+            await message.answer(
+                f"✅ Items in your inbox are now {describe_retention(days, 'kept for the server default period')}.",
+                parse_mode=None
+            )
+            return
+        
+        if len(args) == 2:
+            drop_id = args[0]
+            days = parse_retention(args[1])
+            if not await DropIDOperations.set_retention_days(drop_id, user_id, days):
+                await message.answer("❌ Drop ID not found. Use /my_ids to see your Drop IDs.", parse_mode=None)
+                return
+            await message.answer(
+                f"✅ Items sent to {drop_id} are now {describe_retention(days, 'kept as set for your account')}.",
+                parse_mode=None
+            )
+            return
+        
+        user = await UserOperations.get_or_create_user(user_id)
+        if config.INBOX_RETENTION_DAYS:
+            server_default = f"{config.INBOX_RETENTION_DAYS} days (server default)"
+        else:
+            server_default = "kept forever (server default)"
+        
+        lines = [
+            "<b>Inbox Retention</b>\n",
+            f"Account: {describe_retention(user.retention_days, server_default)}",
+        ]
+        drop_ids = await DropIDOperations.get_user_drop_ids(user_id)
+        for drop in drop_ids:
+            if drop.retention_days is not None:
+                lines.append(f"• <code>{drop.id}</code>: {describe_retention(drop.retention_days, '')}")
+        lines += [
+            "",
+            "<b>Usage</b>",
+            "<code>/retention 30</code> - delete items after 30 days",
+            "<code>/retention off</code> - keep items forever",
+            "<code>/retention default</code> - use the server default",
+            "<code>/retention DROP_ID 7</code> - override for one Drop ID",
+        ]
+        await message.answer("\n".join(lines), parse_mode="HTML")
+        
+    except ValueError as e:
+        await message.answer(f"❌ {e}", parse_mode=None)
+    except DatabaseUnavailableError:
+        raise
+    except Exception as e:
+        logger.error(f"Error in retention command: {e}")
+        await message.answer("❌ Failed to update retention. Please try again.", parse_mode=None)
@@ -0,0 +1,194 @@
+from aiogram import Router, types
+from aiogram.filters import Command, CommandObject
+from aiogram.fsm.context import FSMContext
+from aiogram.fsm.state import State, StatesGroup
+from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
+
+from database.operations import UserOperations, InboxOperations
+from database.errors import DatabaseUnavailableError
+from security.pin import PINManager
+from utils.file_handlers import FileTypeDetector
+from utils.text import safe_truncate
+from config import config
+import html
+import logging
+
+logger = logging.getLogger(__name__)
+
+search_router = Router()
+
+MIN_QUERY_LENGTH = 2
+MAX_QUERY_LENGTH = 100
+
+class SearchStates(StatesGroup):
+    """States for the /search flow"""
+    waiting_for_query = State()
+    waiting_for_pin = State()
+
+@search_router.message(Command("search"))
+async def search_command(message: types.Message, command: CommandObject, state: FSMContext):
+    """Handle /search command - find inbox items by text or file name"""
+    await state.clear()
+
+    if not command.args:
+        await message.answer(
+            "🔎 <b>Search your inbox</b>\n\n"
+            "Send the text or file name to look for:",
+            parse_mode="HTML"
+        )
+        await state.set_state(SearchStates.waiting_for_query)
+        return
+
+    await start_search(message, state, command.args)
+
+@search_router.message(SearchStates.waiting_for_query)
+async def receive_search_query(message: types.Message, state: FSMContext):
+    """Take the search text sent after a bare /search"""
+    if not message.text or message.text.startswith('/'):
+        await state.clear()
+        await message.answer("Search cancelled.", parse_mode=None)
+        return
+
+    await start_search(message, state, message.text)
+
+async def start_search(message: types.Message, state: FSMContext, query: str):
+    """Validate the query and ask for the PIN if the inbox is protected"""
+    try:
+        query = " ".join(query.split())
+        if len(query) < MIN_QUERY_LENGTH or len(query) > MAX_QUERY_LENGTH:
+            await message.answer(
+                f"❌ Search text must be {MIN_QUERY_LENGTH}-{MAX_QUERY_LENGTH} characters long.",
+                parse_mode=None
+            )
+            await state.clear()
+            return
+
+        # Results reveal inbox contents, so they get the same protection as /inbox.
+        # search_query (what the page buttons use) is only stored once the PIN is verified
+        if await UserOperations.user_has_pin(message.from_user.id):
+            await state.set_state(SearchStates.waiting_for_pin)
+            await state.update_data(pending_search_query=query)
+            await message.answer(
+                "🔐 PIN Required\n\n"
+                "Please enter your 4-6 digit PIN to search your inbox:",
+                parse_mode=None
+            )
+            return
+
+        await state.set_state(None)
+        await state.update_data(search_query=query)
+        await show_search_results(message, message.from_user.id, query)
+
+    except DatabaseUnavailableError:
+        raise
+    except Exception as e:
+        logger.error(f"Error starting search: {e}")
+        await message.answer("❌ Search failed. Please try again.", parse_mode=None)
+        await state.clear()
+
+@search_router.message(SearchStates.waiting_for_pin)
+async def verify_search_pin(message: types.Message, state: FSMContext):
+    """Verify the PIN and show the first page of results"""
+    try:
+        user_id = message.from_user.id
+        pin_hash = await UserOperations.get_user_pin_hash(user_id)
+        data = await state.get_data()
+
+        if not pin_hash or not PINManager.verify_pin((message.text or "").strip(), pin_hash):
+            await message.answer("❌ Incorrect PIN! Run /search again to retry.", parse_mode=None)
+            await state.clear()
+            return
+
+        # Keep the query for the page buttons, but leave the PIN state
+        await state.set_state(None)
+        await state.set_data({'search_query': data['pending_search_query']})
+        await show_search_results(message, user_id, data['pending_search_query'])
+
+    except DatabaseUnavailableError:
+        raise
+    except Exception as e:
+        logger.error(f"Error verifying search PIN: {e}")
+        await message.answer("❌ Search failed. Please try again.", parse_mode=None)
+        await state.clear()
+
+@search_router.callback_query(lambda c: c.data.startswith("search_page_"))
+async def search_page(callback_query: types.CallbackQuery, state: FSMContext):
+    """Show another page of the current search"""
+    try:
+        data = await state.get_data()
+        query = data.get('search_query')
+        if not query:
+            await callback_query.answer("Search expired. Run /search again.", show_alert=True)
+            return
+
+        offset = max(0, int(callback_query.data.rsplit("_", 1)[1]))
+        await show_search_results(callback_query.message, callback_query.from_user.id, query,
+                                  offset=offset, edit=True)
+        await callback_query.answer()
+
+    except DatabaseUnavailableError:
+        raise
+    except Exception as e:
+        logger.error(f"Error paging search results: {e}")
+        await callback_query.answer("❌ Failed to load results", show_alert=True)
+
+async def show_search_results(message: types.Message, user_id: int, query: str,
+                              offset: int = 0, edit: bool = False):
+    """Render one page of search results with file and page buttons"""
+    page_size = config.SEARCH_PAGE_SIZE
+
+    # One extra row tells whether there is a next page
+    items = await InboxOperations.search_inbox(user_id, query, limit=page_size + 1, offset=offset)
+    has_next = len(items) > page_size
+    items = items[:page_size]
+
+    if not items:
+        text = (
+            f"🔎 No results for <b>{html.escape(query)}</b>"
+            if offset == 0 else f"🔎 No more results for <b>{html.escape(query)}</b>"
+        )
+        if edit:
+            await message.edit_text(text, parse_mode="HTML")
+        else:
+            await message.answer(text, parse_mode="HTML")
+        return
+
+    lines = [f"🔎 <b>Results for</b> {html.escape(query)} ({offset + 1}-{offset + len(items)})\n"]
+    buttons = []
+    for item in items:
+        date_str = item.created_at.strftime("%b %d, %H:%M")
+        drop = html.escape(item.drop_id)
+        if item.file_id:
+            file_icon = FileTypeDetector.get_file_icon(item.file_type)
+            file_name = item.file_name or f"{item.file_type or 'file'}_{item.id}"
+            lines.append(f"• <b>{date_str}</b> → <code>{drop}</code>: {file_icon} {html.escape(file_name)}")
+            if item.message_text:
+                lines.append(f"  📝 {html.escape(safe_truncate(item.message_text, 50))}")
+            buttons.append([InlineKeyboardButton(
+                text=f"{file_icon} {safe_truncate(file_name, 30)}",
+                callback_data=f"view_file_{item.id}"
+            )])
+        else:
+            lines.append(
+                f"• <b>{date_str}</b> → <code>{drop}</code>: 💬 "
+                f"{html.escape(safe_truncate(item.message_text or '', 80))}"
+            )
+
+    nav_buttons = []
+    if offset > 0:
+        nav_buttons.append(InlineKeyboardButton(
+            text="⬅️ Previous", callback_data=f"search_page_{max(0, offset - page_size)}"
+        ))
+    if has_next:
+        nav_buttons.append(InlineKeyboardButton(
+            text="Next ➡️", callback_data=f"search_page_{offset + page_size}"
+        ))
+    if nav_buttons:
+        buttons.append(nav_buttons)
+
+    text = "\n".join(lines)
+    keyboard = InlineKeyboardMarkup(inline_keyboard=buttons) if buttons else None
+    if edit:
+        await message.edit_text(text, reply_markup=keyboard, parse_mode="HTML")
+    else:
+        await message.answer(text, reply_markup=keyboard, parse_mode="HTML")
@@ -6,8 +6,15 @@ from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 
 from database.operations import DropIDOperations, InboxOperations
-from utils.file_handlers import FileTypeDetector, FileValidator
+from database.errors import DatabaseUnavailableError
+from utils.file_handlers import FileClassification, FileTypeDetector, FileValidator
+from utils.media_group import MediaGroupCollector
+from utils.notifications import DropNotifier
+from utils.send_session import SendSession, SendSessionManager
 from config import config
+import hashlib
+import hmac
+import html
 import logging
 import secrets
 import string
@@ -16,10 +23,69 @@ logger = logging.getLogger(__name__)
 
 send_router = Router()
 
+# Album items arrive as separate updates; collect them into one batch
+media_groups = MediaGroupCollector(window=config.MEDIA_GROUP_WINDOW)
+
+# Files sent after /send DROP_ID are buffered and stored together when the session ends
+send_sessions = SendSessionManager(
+    max_files=config.SEND_SESSION_MAX_FILES,
+    timeout=config.SEND_SESSION_TIMEOUT
+)
+
+# Owners get one "new items" digest per window instead of one message per item
+drop_notifier = DropNotifier(window=config.DROP_NOTIFICATION_WINDOW)
+
 class SendStates(StatesGroup):
     """States for file sending process"""
     waiting_for_file = State()
 
+def session_key(message: types.Message) -> tuple:
+    """Key of the sender's send session"""
+    return (message.chat.id, message.from_user.id)
+
+def session_keyboard() -> InlineKeyboardMarkup:
+    return InlineKeyboardMarkup(
+        inline_keyboard=[
+            [
+                InlineKeyboardButton(text="✅ Done", callback_data="finish_send"),
+                InlineKeyboardButton(text="❌ Cancel", callback_data="cancel_send")
+            ]
+        ]
+    )
+
+def message_idempotency_key(message: types.Message) -> str:
+    """Key that identifies a sent item across retries and redelivered updates
+
+    The chat id is the sender's Telegram id, so only a keyed digest is stored
+    on the recipient's row.
+    """
+    return hmac.new(
+        (config.IDEMPOTENCY_SECRET or "").encode(),
+        f"{message.chat.id}:{message.message_id}".encode(),
+        hashlib.sha256
+    ).hexdigest()
+
+def notify_owner(message: types.Message, target_drop, count: int):
+    """Queue a new-item notification for the Drop ID owner"""
+    if not config.DROP_NOTIFICATIONS_ENABLED:
+        return
+
+    async def send_digest(owner_id: int, counts: dict):
+        total = sum(counts.values())
+        lines = [
+            f"• {n} item{'s' if n > 1 else ''} to <code>{drop_id}</code>"
+            for drop_id, n in counts.items()
+        ]
+        await message.bot.send_message(
+            owner_id,
+            f"📬 <b>You have {total} new item{'s' if total > 1 else ''}</b>\n\n"
+            + "\n".join(lines) + "\n\n"
+            "Use /inbox to view them.",
+            parse_mode="HTML"
+        )
+
+    drop_notifier.add(target_drop.owner_id, target_drop.id, count, send_digest)
+
 def generate_anonymous_id(length: int = 6) -> str:
     """Generate anonymous sender ID"""
     alphabet = string.ascii_lowercase + string.digits
@@ -98,28 +164,32 @@ async def send_message_command(message: types.Message, command: CommandObject, s
             )
             return
 
-        # If only Drop ID provided, wait for file
+        # If only Drop ID provided, open a send session and wait for files
         if not message_text:
+            key = session_key(message)
+            # Deliver whatever an earlier session still holds before starting over
+            await send_sessions.close(key, "replaced")
+
             await state.set_state(SendStates.waiting_for_file)
             await state.update_data(drop_id=drop_id)
-            
-            keyboard = InlineKeyboardMarkup(
-                inline_keyboard=[
-                    [InlineKeyboardButton(text="❌ Cancel", callback_data="cancel_send")]
-                ]
+            send_sessions.open(
+                key, drop_id, target_drop,
+                lambda session, reason: finish_send_session(message, state, session, reason)
             )
             
+            timeout_minutes = max(1, int(config.SEND_SESSION_TIMEOUT // 60))
             await message.answer(
-                f"📎 <b>Ready to send file to Drop ID: <code>{drop_id}</code></b>\n\n"
-                f"Please send the file now (photo, document, audio, video).\n"
-                f"Max size: 50MB\n\n"
+                f"📎 <b>Ready to send files to Drop ID: <code>{drop_id}</code></b>\n\n"
+                f"Send up to {config.SEND_SESSION_MAX_FILES} files within {timeout_minutes} min "
+                f"(photo, document, audio, video), then tap ✅ Done.\n"
+                f"Max size: 50MB per file\n\n"
                 f"<b>Supported files:</b>\n"
                 f"• 🖼️ Images (JPEG, PNG, GIF)\n"
                 f"• 📄 Documents (PDF, TXT, DOC)\n"
                 f"• 🎵 Audio (MP3, OGG)\n"
                 f"• 🎬 Video (MP4)\n\n"
                 f"Or send /send {drop_id} your_message to send text only.",
-                reply_markup=keyboard,
+                reply_markup=session_keyboard(),
                 parse_mode="HTML"
             )
             return
@@ -127,6 +197,8 @@ async def send_message_command(message: types.Message, command: CommandObject, s
         # If message text provided, send as text message
         await process_text_message(message, drop_id, message_text, target_drop)
         
+    except DatabaseUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error in send command: {e}")
         await message.answer(
@@ -138,19 +210,33 @@ async def send_message_command(message: types.Message, command: CommandObject, s
 async def process_text_message(message: types.Message, drop_id: str, message_text: str, target_drop):
     """Process and send a text message"""
     try:
+        # Claim a single-use Drop ID before storing, so only one concurrent send gets it
+        if target_drop.is_single_use and not await DropIDOperations.claim_single_use_drop_id(drop_id):
+            await message.answer(
+                f"❌ <b>Drop ID already used!</b>\n\n"
+                f"The single-use Drop ID {drop_id} has just received another message.",
+                parse_mode="HTML"
+            )
+            return
+
         # Generate anonymous sender ID
         sender_anon_id = generate_anonymous_id()
 
         # Add message to inbox
-        inbox_item = await InboxOperations.add_inbox_item(
-            drop_id=drop_id,
-            sender_anon_id=sender_anon_id,
-            message_text=message_text
-        )
+        try:
+            inbox_item = await InboxOperations.add_inbox_item(
+                drop_id=drop_id,
+                sender_anon_id=sender_anon_id,
+                message_text=message_text,
+                idempotency_key=message_idempotency_key(message)
+            )
+        except Exception:
+            if target_drop.is_single_use:
+                await DropIDOperations.release_single_use_drop_id(drop_id)
+            raise
+        notify_owner(message, target_drop, 1)
 
-        # Handle single-use Drop IDs
         if target_drop.is_single_use:
-            await disable_single_use_drop_id(drop_id)
             usage_note = "⚠️ This was a single-use Drop ID and has been automatically disabled."
         else:
             usage_note = "🔄 This Drop ID is still active and can receive more messages."
@@ -168,21 +254,12 @@ async def process_text_message(message: types.Message, drop_id: str, message_tex
         await message.answer(confirmation_text, parse_mode="HTML")
         logger.info(f"Text message sent to Drop ID {drop_id} from anonymous sender {sender_anon_id}")
 
+    except DatabaseUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error processing text message: {e}")
         await message.answer("❌ Failed to send message. Please try again.", parse_mode=None)
 
-async def disable_single_use_drop_id(drop_id: str):
-    """Disable a single-use Drop ID after use"""
-    try:
-        from database.connection import db
-        await db.table('drop_ids')\
-            .update({'is_active': False})\
-            .eq('id', drop_id)\
-            .execute()
-    except Exception as e:
-        logger.error(f"Error disabling single-use Drop ID: {e}")
-
 # Add this debug function to bot/handlers/send.py
 
 async def debug_file_info(file_info: dict):
@@ -196,20 +273,22 @@ async def debug_file_info(file_info: dict):
 # Then update the handle_file_message function to call this:
 @send_router.message(SendStates.waiting_for_file)
 async def handle_file_message(message: types.Message, state: FSMContext):
-    """Handle file messages when waiting for file"""
+    """Handle file messages while a send session is open"""
     try:
-        data = await state.get_data()
-        drop_id = data.get('drop_id')
-        
-        if not drop_id:
-            await message.answer("❌ Session expired. Please start over with /send DROP_ID")
-            await state.clear()
+        if message.media_group_id:
+            # Albums are validated and buffered together once all items arrived
+            media_groups.add(
+                (message.chat.id, message.media_group_id),
+                message,
+                lambda messages: process_media_group(messages, state)
+            )
             return
 
-        # Get fresh Drop ID info
-        target_drop = await DropIDOperations.get_drop_id(drop_id)
-        if not target_drop or not target_drop.is_active or target_drop.is_expired():
-            await message.answer("❌ Drop ID is no longer valid. Please check with the recipient.")
+        key = session_key(message)
+        session = send_sessions.get(key)
+        
+        if not session:
+            await message.answer("❌ Session expired. Please start over with /send DROP_ID")
             await state.clear()
             return
 
@@ -217,7 +296,8 @@ async def handle_file_message(message: types.Message, state: FSMContext):
         file_info = await extract_file_info(message)
         
         # Debug logging
-        await debug_file_info(file_info)
+        if file_info:
+            await debug_file_info(file_info)
         
         if not file_info:
             await message.answer(
@@ -228,8 +308,9 @@ async def handle_file_message(message: types.Message, state: FSMContext):
             )
             return
 
-        # Validate file safety and size
-        if not FileValidator.is_file_safe(file_info['file_name'], file_info['mime_type']):
+        # Validate file safety and size (one classification pass, as for albums)
+        classification = classify_files([file_info])[0]
+        if classification.is_dangerous:
             await message.answer(
                 "❌ <b>File type not allowed for security reasons.</b>\n\n"
                 "Please send a different file type.",
@@ -246,16 +327,26 @@ async def handle_file_message(message: types.Message, state: FSMContext):
             )
             return
 
-        # Send the file
-        await process_file_message(message, drop_id, file_info, target_drop)
-        await state.clear()
+        file_info['message_text'] = message.caption
+        await add_files_to_session(message, key, session, [file_info])
 
+    except DatabaseUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error handling file message: {e}")
         logger.error(f"Full error details:", exc_info=True)  # This will print full traceback
         await message.answer("❌ Failed to send file. Please try again.", parse_mode=None)
+        send_sessions.discard(session_key(message))
         await state.clear()
         
+def classify_files(files: list[dict]) -> list[FileClassification]:
+    """Classify files in one pass and fill in file_type where the message kind didn't decide it"""
+    classifications = FileTypeDetector.classify_batch(files)
+    for file_info, classification in zip(files, classifications):
+        if file_info['file_type'] is None:
+            file_info['file_type'] = classification.category
+    return classifications
+
 async def extract_file_info(message: types.Message) -> dict:
     """Extract file information from different message types"""
     file_info = {}
@@ -276,7 +367,7 @@ async def extract_file_info(message: types.Message) -> dict:
         doc = message.document
         file_info.update({
             'file_id': doc.file_id,
-            'file_type': FileTypeDetector.categorize_file(doc.mime_type, doc.file_name),
+            'file_type': None,  # decided by classify_files from the MIME type and name
             'file_size': doc.file_size,
             'mime_type': doc.mime_type,
             'file_name': doc.file_name
@@ -315,62 +406,174 @@ async def extract_file_info(message: types.Message) -> dict:
             'file_name': f'voice_{message.message_id}.ogg'
         })
     
-    return file_info if file_info else None
+    if not file_info:
+        return None
+    
+    file_info['idempotency_key'] = message_idempotency_key(message)
+    return file_info
 
 
-async def process_file_message(message: types.Message, drop_id: str, file_info: dict, target_drop):
-    """Process and send a file message"""
+async def process_media_group(messages: list[types.Message], state: FSMContext):
+    """Validate all files of an album and add them to the send session at once"""
+    message = min(messages, key=lambda m: m.message_id)
     try:
-        # Generate anonymous sender ID
-        sender_anon_id = generate_anonymous_id()
+        key = session_key(message)
+        session = send_sessions.get(key)
+        
+        if not session:
+            await message.answer("❌ Session expired. Please start over with /send DROP_ID")
+            await state.clear()
+            return
 
-        inbox_item = await InboxOperations.add_file_item(
-            drop_id=drop_id,
-            sender_anon_id=sender_anon_id,
-            file_id=file_info['file_id'],
-            file_type=file_info['file_type'],
-            file_name=file_info['file_name'],
-            file_size=file_info['file_size'],
-            mime_type=file_info['mime_type'],
-            message_text=message.caption  
+        accepted = []
+        album = []
+        for album_message in sorted(messages, key=lambda m: m.message_id):
+            file_info = await extract_file_info(album_message)
+            if file_info:
+                file_info['message_text'] = album_message.caption
+                album.append(file_info)
+            else:
+                session.rejected.append(("file", "unsupported type"))
+
+        # Classify the whole album in one pass instead of re-parsing names per check
+        for file_info, classification in zip(album, classify_files(album)):
+            if classification.is_dangerous:
+                session.rejected.append((file_info['file_name'], "not allowed"))
+            elif not FileValidator.is_size_within_limit(file_info['file_size']):
+                session.rejected.append((file_info['file_name'], "too large"))
+            else:
+                accepted.append(file_info)
+
+        if not accepted:
+            await message.answer(
+                "❌ <b>None of the album files could be added.</b>\n\n"
+                "Please send photos, documents, audio or video up to 50MB.",
+                parse_mode="HTML"
+            )
+            return
+
+        await add_files_to_session(message, key, session, accepted)
+
+    except Exception as e:
+        logger.error(f"Error handling media group: {e}", exc_info=True)
+        await message.answer("❌ Failed to send files. Please try again.", parse_mode=None)
+        send_sessions.discard(session_key(message))
+        await state.clear()
+
+async def add_files_to_session(message: types.Message, key: tuple, session: SendSession, files: list[dict]):
+    """Buffer validated files; the session is flushed once it is full"""
+    added = session.add_files(files)
+
+    if session.is_full:
+        await send_sessions.close(key, "full")
+        return
+
+    await message.answer(
+        f"📎 {added} file{'s' if added != 1 else ''} added "
+        f"({len(session.files)}/{session.max_files}).\n\n"
+        f"Send more files or tap ✅ Done to deliver them.",
+        reply_markup=session_keyboard(),
+        parse_mode=None
+    )
+
+async def finish_send_session(message: types.Message, state: FSMContext, session: SendSession, reason: str):
+    """Store a finished session's files with one insert and leave the send state"""
+    try:
+        if session.files:
+            await process_file_batch(message, session.drop_id, session.files, session.rejected)
+        elif reason == "timeout":
+            await message.answer(
+                "⌛ Send session expired.\n\n"
+                "No files were sent. Start again with /send DROP_ID",
+                parse_mode=None
+            )
+        elif reason == "done":
+            await message.answer("📭 No files were added, nothing was sent.", parse_mode=None)
+    except Exception as e:
+        logger.error(f"Error finishing send session: {e}", exc_info=True)
+        await message.answer("❌ Failed to send files. Please try again.", parse_mode=None)
+    finally:
+        # Only leave the state if the sender hasn't moved on to another flow
+        if reason != "replaced" and await state.get_state() == SendStates.waiting_for_file.state:
+            data = await state.get_data()
+            if data.get('drop_id') == session.drop_id:
+                await state.clear()
+
+async def process_file_batch(message: types.Message, drop_id: str, files: list[dict],
+                             rejected: list[tuple] = None):
+    """Store several files for a Drop ID at once and confirm them to the sender"""
+    # The session may have been open for minutes: check the Drop ID again, not the copy it opened with
+    target_drop = await DropIDOperations.get_drop_id(drop_id)
+    usable = target_drop is not None and target_drop.is_active and not target_drop.is_expired()
+
+    # A batch counts as one use; claiming first keeps a second batch from getting in
+    if usable and target_drop.is_single_use:
+        usable = await DropIDOperations.claim_single_use_drop_id(drop_id)
+
+    if not usable:
+        await message.answer(
+            f"❌ <b>Files not sent.</b>\n\n"
+            f"The Drop ID <code>{html.escape(drop_id)}</code> was disabled, deleted, expired "
+            f"or already used while you were adding files.",
+            parse_mode="HTML"
         )
+        logger.info(f"Dropped a batch of {len(files)} files for unusable Drop ID {drop_id}")
+        return
+
+    sender_anon_id = generate_anonymous_id()
 
-        # Handle single-use Drop IDs
+    try:
+        await InboxOperations.add_file_items(drop_id, sender_anon_id, files)
+    except Exception:
         if target_drop.is_single_use:
-            await disable_single_use_drop_id(drop_id)
-            usage_note = "⚠️ This was a single-use Drop ID and has been automatically disabled."
-        else:
-            usage_note = "🔄 This Drop ID is still active and can receive more messages."
+            await DropIDOperations.release_single_use_drop_id(drop_id)
+        raise
+    notify_owner(message, target_drop, len(files))
+
+    if target_drop.is_single_use:
+        usage_note = "⚠️ This was a single-use Drop ID and has been automatically disabled."
+    else:
+        usage_note = "🔄 This Drop ID is still active and can receive more messages."
 
-        # Prepare confirmation message
+    file_lines = []
+    for file_info in files:
         file_icon = FileTypeDetector.get_file_icon(file_info['file_type'])
-        file_size_str = FileValidator.format_file_size(file_info['file_size'])
-        
-        # Build file description
-        file_description = f"{file_icon} {file_info['file_name'] or 'Unnamed file'}"
+        file_name = html.escape(file_info['file_name'] or 'Unnamed file')
+        line = f"• {file_icon} {file_name}"
         if file_info['file_size']:
-            file_description += f" ({file_size_str})"
-        
-        confirmation_text = (
-            f"✅ <b>File sent successfully!</b>\n\n"
-            f"To Drop ID: <code>{drop_id}</code>\n"
-            f"Your Anonymous ID: <code>{sender_anon_id}</code>\n"
-            f"File: {file_description}\n"
-            f"Type: {file_info['file_type'].title()}\n\n"
-            f"<i>{usage_note}</i>\n\n"
-            f"🔒 <b>Privacy Note:</b> Your identity is completely hidden from the recipient."
-        )
+            line += f" ({FileValidator.format_file_size(file_info['file_size'])})"
+        file_lines.append(line)
+
+    confirmation_text = (
+        f"✅ <b>{len(files)} file{'s' if len(files) > 1 else ''} sent successfully!</b>\n\n"
+        f"To Drop ID: <code>{drop_id}</code>\n"
+        f"Your Anonymous ID: <code>{sender_anon_id}</code>\n"
+        + "\n".join(file_lines) + "\n\n"
+    )
+    if rejected:
+        skipped = ", ".join(f"{html.escape(str(name))} ({reason})" for name, reason in rejected)
+        confirmation_text += f"⚠️ Skipped: {skipped}\n\n"
+    confirmation_text += (
+        f"<i>{usage_note}</i>\n\n"
+        f"🔒 <b>Privacy Note:</b> Your identity is completely hidden from the recipient."
+    )
 
-        await message.answer(confirmation_text, parse_mode="HTML")
-        logger.info(f"File sent to Drop ID {drop_id} from anonymous sender {sender_anon_id}")
+    await message.answer(confirmation_text, parse_mode="HTML")
+    logger.info(f"{len(files)} files sent to Drop ID {drop_id} from anonymous sender {sender_anon_id}")
 
-    except Exception as e:
-        logger.error(f"Error processing file message: {e}")
-        await message.answer("❌ Failed to send file. Please try again.", parse_mode=None)
+@send_router.callback_query(lambda c: c.data == "finish_send")
+async def finish_send_files(callback_query: types.CallbackQuery):
+    """Deliver the files buffered in the send session"""
+    key = (callback_query.message.chat.id, callback_query.from_user.id)
+    if not await send_sessions.close(key, "done"):
+        await callback_query.answer("Session already finished", show_alert=True)
+        return
+    await callback_query.answer("Sending...")
 
 @send_router.callback_query(lambda c: c.data == "cancel_send")
 async def cancel_send_file(callback_query: types.CallbackQuery, state: FSMContext):
     """Cancel file sending process"""
+    send_sessions.discard((callback_query.message.chat.id, callback_query.from_user.id))
     await state.clear()
     await callback_query.message.edit_text(
         "❌ File sending cancelled.\n\n"
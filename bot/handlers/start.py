@@ -7,7 +7,7 @@ start_router = Router()
 
 @start_router.message(Command("start"))
 async def start_command(message: types.Message):
-    await UserOperations.get_or_create_user(message.from_user.id)
+    await UserOperations.ensure_user(message.from_user.id)
 
     welcome_text = (
     "<b>🤖 Welcome to DropKey</b>\n\n"
@@ -0,0 +1,3 @@
+from .throttling import ThrottlingMiddleware, MemoryThrottleStorage, RedisThrottleStorage
+from .service_busy import ServiceBusyMiddleware
+from .in_flight import InFlightMiddleware
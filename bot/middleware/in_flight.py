@@ -0,0 +1,42 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware, types
+
+logger = logging.getLogger(__name__)
+
+class InFlightMiddleware(BaseMiddleware):
+    """Tracks updates being handled so shutdown can wait for them"""
+
+    def __init__(self):
+        self.in_flight = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    async def __call__(
+        self,
+        handler: Callable[[types.TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: types.TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        self.in_flight += 1
+        self._idle.clear()
+        try:
+            return await handler(event, data)
+        finally:
+            self.in_flight -= 1
+            if self.in_flight == 0:
+                self._idle.set()
+
+    async def drain(self):
+        """Wait until no update is being handled
+
+        Polling has stopped by then, so no new updates arrive. aiogram only
+        confirms an offset with the next getUpdates, so Telegram redelivers
+        the last fetched batch after a restart even if it was handled here;
+        the idempotency keys keep those from being stored twice.
+        """
+        # Let update tasks that were just created reach the middleware
+        await asyncio.sleep(0)
+        await self._idle.wait()
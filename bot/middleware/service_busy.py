@@ -0,0 +1,60 @@
+import logging
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware, types
+
+from database.circuit_breaker import CircuitBreaker
+from database.errors import DatabaseUnavailableError
+from utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+class ServiceBusyMiddleware(BaseMiddleware):
+    """Reply "service busy" right away while the database circuit breaker is open
+
+    Handlers are not run at all while the breaker rejects calls, so updates
+    don't queue up behind a backend that is known to be down.
+    """
+
+    def __init__(self, breaker: CircuitBreaker, notice_interval: float = 10.0):
+        self.breaker = breaker
+        self._notified = TTLCache(maxsize=10_000, ttl=notice_interval)
+
+    async def __call__(
+        self,
+        handler: Callable[[types.TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: types.TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        if self.breaker.is_open:
+            await self._notify_busy(event, data, self.breaker.retry_after())
+            return None
+
+        try:
+            return await handler(event, data)
+        except DatabaseUnavailableError as e:
+            await self._notify_busy(event, data, e.retry_after)
+            return None
+
+    async def _notify_busy(self, event: types.TelegramObject, data: Dict[str, Any], retry_after: float):
+        """Tell the user to come back later, at most once per notice interval"""
+        seconds = max(1, round(retry_after))
+        try:
+            if isinstance(event, types.CallbackQuery):
+                # Callbacks must always be answered or the button keeps spinning
+                await event.answer(f"⏳ Service busy. Try again in {seconds}s.")
+                return
+
+            user = data.get("event_from_user")
+            user_id = user.id if user else None
+            if user_id in self._notified:
+                return
+            self._notified.set(user_id)
+
+            if isinstance(event, types.Message):
+                await event.answer(
+                    f"⏳ DropKey is temporarily unavailable. Please try again in {seconds}s.",
+                    parse_mode=None
+                )
+        except Exception as e:
+            logger.error(f"Error sending service busy notice: {e}")
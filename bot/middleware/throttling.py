@@ -0,0 +1,209 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from aiogram import BaseMiddleware, types
+
+from utils.cache import TTLCache
+
+try:
+    from redis.asyncio import Redis
+except ImportError:  # Redis is only needed for multi-node deployments
+    Redis = None
+
+logger = logging.getLogger(__name__)
+
+class MemoryThrottleStorage:
+    """In-process token buckets (single bot instance)"""
+
+    def __init__(self, max_keys: int = 100_000, clock: Callable[[], float] = time.monotonic):
+        # key -> [tokens, last update, seconds until completely refilled]
+        self._buckets: Dict[str, list] = {}
+        self._max_keys = max_keys
+        self._clock = clock
+
+    async def consume(self, key: str, rate: float, capacity: float, cost: float = 1) -> float:
+        """Take `cost` tokens from a bucket; return 0 if allowed, else seconds to wait"""
+        now = self._clock()
+        bucket = self._buckets.get(key)
+
+        if bucket is None:
+            if len(self._buckets) >= self._max_keys:
+                self._prune(now)
+            tokens = capacity
+        else:
+            tokens = min(capacity, bucket[0] + (now - bucket[1]) * rate)
+
+        # A negative cost (refund) never fills the bucket past its capacity
+        if tokens >= cost:
+            self._buckets[key] = [min(capacity, tokens - cost), now, capacity / rate]
+            return 0.0
+
+        self._buckets[key] = [tokens, now, capacity / rate]
+        return (cost - tokens) / rate
+
+    async def refund(self, key: str, rate: float, capacity: float, cost: float = 1):
+        """Give back tokens taken by consume() for a request that was refused elsewhere"""
+        await self.consume(key, rate, capacity, -cost)
+
+    def _prune(self, now: float):
+        """Forget buckets that have refilled completely (each at its own rate)"""
+        stale = [key for key, (_, ts, full_after) in self._buckets.items() if now - ts >= full_after]
+        for key in stale:
+            del self._buckets[key]
+
+class RedisThrottleStorage:
+    """Token buckets shared between bot instances through Redis"""
+
+    # Refill, take tokens and store the bucket atomically on the Redis side
+    SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= cost then
+    tokens = math.min(capacity, tokens - cost)
+else
+    wait = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return tostring(wait)
+"""
+
+    def __init__(self, redis, prefix: str = "throttle"):
+        self.redis = redis
+        self.prefix = prefix
+        self._script = redis.register_script(self.SCRIPT)
+
+    @classmethod
+    def from_url(cls, url: str, prefix: str = "throttle") -> "RedisThrottleStorage":
+        if Redis is None:
+            raise RuntimeError("redis package is required for REDIS_URL throttling")
+        return cls(Redis.from_url(url), prefix=prefix)
+
+    async def consume(self, key: str, rate: float, capacity: float, cost: float = 1) -> float:
+        """Take `cost` tokens from a shared bucket; return 0 if allowed, else seconds to wait"""
+        wait = await self._script(
+            keys=[f"{self.prefix}:{key}"],
+            args=[rate, capacity, time.time(), cost]
+        )
+        return float(wait)
+
+    async def refund(self, key: str, rate: float, capacity: float, cost: float = 1):
+        """Give back tokens taken by consume() for a request that was refused elsewhere"""
+        await self.consume(key, rate, capacity, -cost)
+
+class ThrottlingMiddleware(BaseMiddleware):
+    """Per-user and per-command token-bucket throttling for messages and callbacks"""
+
+    def __init__(self, storage=None, rate: float = 2.0, burst: float = 10,
+                 command_limits: Dict[str, Tuple[float, float]] = None,
+                 mode: str = "drop", max_delay: float = 3.0, notice_interval: float = 10.0):
+        if mode not in ("drop", "defer"):
+            raise ValueError("Throttling mode must be 'drop' or 'defer'")
+
+        self.storage = storage or MemoryThrottleStorage()
+        self.rate = rate
+        self.burst = burst
+        self.command_limits = command_limits or {}
+        self.mode = mode
+        self.max_delay = max_delay
+        self.notice_interval = notice_interval
+        self._last_notice: Dict[int, float] = {}
+        self._seen_media_groups = TTLCache(maxsize=10_000, ttl=60)
+
+    async def __call__(
+        self,
+        handler: Callable[[types.TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: types.TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        user = data.get("event_from_user")
+        if user is None:
+            return await handler(event, data)
+
+        if isinstance(event, types.Message) and event.media_group_id:
+            # An album is one user action; only its first item is charged
+            group_key = (event.chat.id, event.media_group_id)
+            if group_key in self._seen_media_groups:
+                return await handler(event, data)
+            self._seen_media_groups.set(group_key)
+
+        command = self.get_command(event)
+        waited = 0.0
+
+        while True:
+            wait = await self._consume(user.id, command)
+            if wait <= 0:
+                return await handler(event, data)
+
+            if self.mode == "defer" and waited + wait <= self.max_delay:
+                waited += wait
+                await asyncio.sleep(wait)
+                continue
+
+            logger.debug(f"Throttled user {user.id} ({command or 'update'}), retry in {wait:.1f}s")
+            await self._notify_throttled(event, user.id, wait)
+            return None
+
+    @staticmethod
+    def get_command(event: types.TelegramObject) -> Optional[str]:
+        """Name of the bucket an event is charged to besides the user bucket"""
+        if isinstance(event, types.CallbackQuery):
+            return "callback"
+
+        if isinstance(event, types.Message) and event.text and event.text.startswith("/"):
+            # "/send@DropKeyBot abc" -> "send"
+            return event.text[1:].split(maxsplit=1)[0].split("@", 1)[0].lower() or None
+
+        return None
+
+    async def _consume(self, user_id: int, command: Optional[str]) -> float:
+        user_key = f"user:{user_id}"
+        wait = await self.storage.consume(user_key, self.rate, self.burst)
+        if wait > 0:
+            return wait
+
+        limits = self.command_limits.get(command)
+        if limits:
+            rate, burst = limits
+            wait = await self.storage.consume(f"cmd:{command}:{user_id}", rate, burst)
+            if wait > 0:
+                # Refused: the request must not cost a user token (defer mode retries it)
+                await self.storage.refund(user_key, self.rate, self.burst)
+            return wait
+
+        return 0.0
+
+    async def _notify_throttled(self, event: types.TelegramObject, user_id: int, wait: float):
+        """Tell the user to slow down, at most once per notice interval"""
+        try:
+            if isinstance(event, types.CallbackQuery):
+                # Callbacks must always be answered or the button keeps spinning
+                await event.answer(f"⏳ Too many requests. Try again in {wait:.0f}s.")
+                return
+
+            now = time.monotonic()
+            if now - self._last_notice.get(user_id, 0.0) < self.notice_interval:
+                return
+            if len(self._last_notice) > 10_000:
+                self._last_notice = {
+                    uid: ts for uid, ts in self._last_notice.items()
+                    if now - ts < self.notice_interval
+                }
+            self._last_notice[user_id] = now
+
+            if isinstance(event, types.Message):
+                await event.answer(
+                    f"⏳ You're sending requests too fast. Please wait {max(1, round(wait))}s and try again.",
+                    parse_mode=None
+                )
+        except Exception as e:
+            logger.error(f"Error sending throttle notice: {e}")
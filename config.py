@@ -7,7 +7,10 @@ class Config:
     BOT_TOKEN = os.getenv("BOT_TOKEN")
     SUPABASE_URL = os.getenv("SUPABASE_URL")
     SUPABASE_KEY = os.getenv("SUPABASE_KEY")
+    DATABASE_URL = os.getenv("DATABASE_URL", os.getenv("DB_URI"))  # direct Postgres URI, used by migrations
     ENCRYPTION_KEY = os.getenv("ENCRYPTION_KEY")
+    # HMAC key for inbox idempotency keys; must be the same on every instance
+    IDEMPOTENCY_SECRET = os.getenv("IDEMPOTENCY_SECRET", ENCRYPTION_KEY)
     
     # Validate critical environment variables
     @classmethod
@@ -24,5 +27,67 @@ class Config:
     # Bot settings
     MAX_FILE_SIZE = 50 * 1024 * 1024  # 50MB
     DROP_ID_LENGTH = 8
+    BOT_COMMANDS_CACHE_FILE = os.getenv("BOT_COMMANDS_CACHE_FILE", ".bot_commands.hash")  # skip unchanged set_my_commands
+    MEDIA_GROUP_WINDOW = float(os.getenv("MEDIA_GROUP_WINDOW", "1.0"))  # seconds to wait for album items
+    SEND_SESSION_MAX_FILES = int(os.getenv("SEND_SESSION_MAX_FILES", "10"))
+    SEND_SESSION_TIMEOUT = float(os.getenv("SEND_SESSION_TIMEOUT", "120"))  # seconds
+    DOWNLOAD_ALL_PAGE_SIZE = int(os.getenv("DOWNLOAD_ALL_PAGE_SIZE", "30"))  # files per "Download All" tap
+    DOWNLOAD_BATCH_PAUSE = float(os.getenv("DOWNLOAD_BATCH_PAUSE", "1.0"))  # seconds between media groups
+    SEARCH_PAGE_SIZE = int(os.getenv("SEARCH_PAGE_SIZE", "10"))  # results per /search page
+    INBOX_FILTER_MAX_DROP_IDS = int(os.getenv("INBOX_FILTER_MAX_DROP_IDS", "12"))  # Drop ID buttons in the filter menu
+    EXPORT_PAGE_SIZE = int(os.getenv("EXPORT_PAGE_SIZE", "500"))  # inbox rows fetched per page by /export
+    DROP_NOTIFICATIONS_ENABLED = os.getenv("DROP_NOTIFICATIONS_ENABLED", "true").lower() == "true"
+    DROP_NOTIFICATION_WINDOW = float(os.getenv("DROP_NOTIFICATION_WINDOW", "10"))  # seconds per owner digest
+    SHUTDOWN_TIMEOUT = float(os.getenv("SHUTDOWN_TIMEOUT", "25"))  # seconds to drain work on shutdown; keep below the deploy's kill timeout
+
+    # Database fast-fail
+    DB_QUERY_TIMEOUT = float(os.getenv("DB_QUERY_TIMEOUT", "10"))  # seconds per query
+    DB_BREAKER_FAILURES = int(os.getenv("DB_BREAKER_FAILURES", "5"))  # consecutive failures before opening
+    DB_BREAKER_RESET_TIMEOUT = float(os.getenv("DB_BREAKER_RESET_TIMEOUT", "30"))  # seconds before probing again
+    DB_RETRY_ATTEMPTS = int(os.getenv("DB_RETRY_ATTEMPTS", "3"))  # tries for idempotent inserts
+    DB_RETRY_BASE_DELAY = float(os.getenv("DB_RETRY_BASE_DELAY", "0.2"))  # first backoff, doubled per retry
+    INBOX_WRITE_BUFFER_ENABLED = os.getenv("INBOX_WRITE_BUFFER_ENABLED", "false").lower() == "true"
+    INBOX_WRITE_BUFFER_WINDOW_MS = float(os.getenv("INBOX_WRITE_BUFFER_WINDOW_MS", "5"))  # coalescing window
+    INBOX_WRITE_BUFFER_MAX_BATCH = int(os.getenv("INBOX_WRITE_BUFFER_MAX_BATCH", "100"))  # rows per insert
+
+    # Throttling (token buckets: refill rate per second, burst size)
+    REDIS_URL = os.getenv("REDIS_URL")  # shared buckets when running several instances
+    THROTTLE_MODE = os.getenv("THROTTLE_MODE", "drop")  # "drop" or "defer"
+    THROTTLE_RATE = float(os.getenv("THROTTLE_RATE", "2"))
+    THROTTLE_BURST = float(os.getenv("THROTTLE_BURST", "10"))
+    THROTTLE_MAX_DELAY = float(os.getenv("THROTTLE_MAX_DELAY", "3"))
+    THROTTLE_COMMAND_LIMITS = {
+        "send": (0.5, 5),
+        "create_id": (0.2, 3),
+        "inbox": (0.5, 3),
+        "callback": (2, 10),
+    }
+
+    # Inbox retention (days; 0 keeps items forever). Users and Drop IDs can override it with /retention
+    INBOX_RETENTION_DAYS = int(os.getenv("INBOX_RETENTION_DAYS", "0"))
+    PURGE_INTERVAL = float(os.getenv("PURGE_INTERVAL", "3600"))  # seconds between purge runs
+    PURGE_BATCH_SIZE = int(os.getenv("PURGE_BATCH_SIZE", "500"))  # items deleted per transaction
+    PURGE_BATCH_PAUSE = float(os.getenv("PURGE_BATCH_PAUSE", "0.5"))  # seconds between batches
+    PURGE_MAX_BATCHES = int(os.getenv("PURGE_MAX_BATCHES", "200"))  # per run
+    MAX_RETENTION_DAYS = 3650
+    # Soft-deleted items and Drop IDs are hard-deleted in batches after this many days
+    TOMBSTONE_GRACE_DAYS = int(os.getenv("TOMBSTONE_GRACE_DAYS", "7"))
+    COMPACTION_INTERVAL = float(os.getenv("COMPACTION_INTERVAL", "21600"))  # seconds between runs
+    
+    # Per-process user cache (skip the users table for users seen recently)
+    KNOWN_USER_CACHE_TTL = float(os.getenv("KNOWN_USER_CACHE_TTL", "3600"))
+    KNOWN_USER_CACHE_SIZE = int(os.getenv("KNOWN_USER_CACHE_SIZE", "100000"))
+    # A PIN changed through another bot instance is seen here after at most this long
+    PIN_CACHE_TTL = float(os.getenv("PIN_CACHE_TTL", "300"))
+    PIN_CACHE_SIZE = int(os.getenv("PIN_CACHE_SIZE", "10000"))
+
+    # Unknown Drop ID rejection (see database/drop_id_cache.py)
+    DROP_ID_MISS_CACHE_TTL = float(os.getenv("DROP_ID_MISS_CACHE_TTL", "300"))
+    DROP_ID_MISS_CACHE_SIZE = int(os.getenv("DROP_ID_MISS_CACHE_SIZE", "50000"))
+    # Only safe with a single bot instance: IDs created elsewhere are unknown until the next rebuild
+    DROP_ID_BLOOM_ENABLED = os.getenv("DROP_ID_BLOOM_ENABLED", "false").lower() == "true"
+    DROP_ID_BLOOM_CAPACITY = int(os.getenv("DROP_ID_BLOOM_CAPACITY", "1000000"))
+    DROP_ID_BLOOM_ERROR_RATE = float(os.getenv("DROP_ID_BLOOM_ERROR_RATE", "0.001"))
+    DROP_ID_BLOOM_REBUILD_INTERVAL = int(os.getenv("DROP_ID_BLOOM_REBUILD_INTERVAL", "600"))  # seconds
 
 config = Config()
\ No newline at end of file
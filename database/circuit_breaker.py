@@ -0,0 +1,80 @@
+import logging
+import time
+from typing import Callable
+
+from .errors import CircuitOpenError
+
+logger = logging.getLogger(__name__)
+
+class CircuitBreaker:
+    """Fail fast while a backend keeps failing
+
+    closed: calls go through; `failure_threshold` consecutive failures open it.
+    open: calls fail immediately with CircuitOpenError for `reset_timeout` seconds.
+    half-open: a single probe call is let through; success closes the
+    breaker, failure opens it for another `reset_timeout`.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    def retry_after(self) -> float:
+        """Seconds until a probe call will be allowed (0 when not open)"""
+        if self.state != self.OPEN:
+            return 0.0
+        return max(0.0, self._opened_at + self.reset_timeout - self._clock())
+
+    @property
+    def is_open(self) -> bool:
+        """True while calls are being rejected without a probe"""
+        if self.state == self.HALF_OPEN:
+            return self._probe_in_flight
+        return self.state == self.OPEN and self.retry_after() > 0
+
+    def before_call(self):
+        """Reserve a call slot or raise CircuitOpenError"""
+        if self.state == self.CLOSED:
+            return
+
+        if self.state == self.OPEN:
+            wait = self.retry_after()
+            if wait > 0:
+                raise CircuitOpenError("Database circuit breaker is open", retry_after=wait)
+            self.state = self.HALF_OPEN
+            logger.info("Database circuit breaker half-open - probing")
+
+        if self._probe_in_flight:
+            raise CircuitOpenError("Database circuit breaker is probing", retry_after=1.0)
+        self._probe_in_flight = True
+
+    def record_success(self):
+        if self.state != self.CLOSED:
+            logger.info("Database circuit breaker closed")
+        self.state = self.CLOSED
+        self.failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._probe_in_flight = False
+
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                logger.warning(f"Database circuit breaker opened after {self.failures} failure(s)")
+            self.state = self.OPEN
+            self._opened_at = self._clock()
+
+    def release(self):
+        """Give back a probe slot without a verdict (the call was cancelled)"""
+        self._probe_in_flight = False
@@ -1,6 +1,9 @@
+import asyncio
 import os
+from postgrest.exceptions import APIError
 from supabase import create_client, Client
 from config import config
+from .circuit_breaker import CircuitBreaker
 import logging
 
 logger = logging.getLogger(__name__)
@@ -9,6 +12,10 @@ class SupabaseDatabase:
     def __init__(self):
         self.client: Client = None
         self.is_connected = False
+        self.breaker = CircuitBreaker(
+            failure_threshold=config.DB_BREAKER_FAILURES,
+            reset_timeout=config.DB_BREAKER_RESET_TIMEOUT
+        )
     
     async def connect(self):
         """Connect to Supabase"""
@@ -17,10 +24,9 @@ class SupabaseDatabase:
                 logger.warning("Supabase credentials not configured")
                 return
             
-            self.client = create_client(config.SUPABASE_URL, config.SUPABASE_KEY)
-            
-            # Test connection with a simple query
-            test_response = self.client.table('users').select('count', count='exact').limit(1).execute()
+            # The client is synchronous; keep the event loop free for other startup work
+            self.client = await asyncio.to_thread(create_client, config.SUPABASE_URL, config.SUPABASE_KEY)
+            await asyncio.to_thread(self.ping)
             logger.info("✅ Connected to Supabase successfully")
             self.is_connected = True
             
@@ -28,16 +34,81 @@ class SupabaseDatabase:
             logger.error(f"❌ Failed to connect to Supabase: {e}")
             raise
     
+    def ping(self):
+        """Cheap connectivity probe: fetch at most one key instead of counting rows"""
+        self.client.table('users').select('telegram_id').limit(1).execute()
+    
     async def disconnect(self):
         """Supabase client doesn't need explicit disconnection"""
         self.client = None
         self.is_connected = False
     
-    def table(self, table_name: str):
-        """Access a Supabase table"""
+    def table(self, table_name: str) -> "GuardedQuery":
+        """Access a Supabase table; `await ....execute()` runs through the circuit breaker"""
+        if not self.is_connected:
+            raise ConnectionError("Not connected to Supabase")
+        return GuardedQuery(self, self.client.table(table_name))
+    
+    def rpc(self, function_name: str, params: dict = None) -> "GuardedQuery":
+        """Call a Postgres function; `await ....execute()` runs through the circuit breaker"""
         if not self.is_connected:
             raise ConnectionError("Not connected to Supabase")
-        return self.client.table(table_name)
+        return GuardedQuery(self, self.client.rpc(function_name, params or {}))
+    
+    async def execute(self, query):
+        """Run a query builder off the event loop with a deadline
+        
+        Fails immediately with CircuitOpenError while the breaker is open.
+        A timed-out call keeps its worker thread until the HTTP client gives
+        up, which is what the breaker protects the thread pool from.
+        """
+        self.breaker.before_call()
+        try:
+            response = await asyncio.wait_for(
+                asyncio.to_thread(query.execute),
+                timeout=config.DB_QUERY_TIMEOUT
+            )
+        except APIError:
+            # PostgREST answered - the backend is up even if it rejected the query
+            self.breaker.record_success()
+            raise
+        except asyncio.TimeoutError:
+            logger.warning(f"Database query timed out after {config.DB_QUERY_TIMEOUT}s")
+            self.breaker.record_failure()
+            raise
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        except BaseException:
+            self.breaker.release()
+            raise
+        
+        self.breaker.record_success()
+        return response
+
+class GuardedQuery:
+    """Query builder proxy whose execute() is awaited through SupabaseDatabase.execute"""
+    
+    def __init__(self, database: SupabaseDatabase, builder):
+        self._database = database
+        self._builder = builder
+    
+    def __getattr__(self, name: str):
+        attr = getattr(self._builder, name)
+        if not callable(attr):
+            return self._wrap(attr)
+        
+        def method(*args, **kwargs):
+            return self._wrap(attr(*args, **kwargs))
+        return method
+    
+    def _wrap(self, result):
+        if hasattr(result, 'execute'):
+            return GuardedQuery(self._database, result)
+        return result
+    
+    async def execute(self):
+        return await self._database.execute(self._builder)
 
 # Global database instance
 db = SupabaseDatabase()
\ No newline at end of file
@@ -0,0 +1,42 @@
+from collections import deque
+import secrets
+import string
+import threading
+
+ALPHABET = string.ascii_lowercase + string.digits
+
+# Bytes 0..251 map evenly onto the 36-char alphabet (7 * 36 = 252); the
+# remaining four values are dropped so every character stays uniform.
+_ACCEPTED_BYTES = 252
+_BYTE_TO_CHAR = bytes(ord(ALPHABET[b % len(ALPHABET)]) for b in range(256))
+_REJECTED_BYTES = bytes(range(_ACCEPTED_BYTES, 256))
+
+def generate_drop_ids(count: int, length: int = 8) -> list[str]:
+    """Generate `count` random Drop IDs from one bulk draw of random bytes"""
+    needed = count * length
+    chars = b''
+    
+    while len(chars) < needed:
+        missing = needed - len(chars)
+        # ~1.6% of bytes get rejected, over-draw a little to avoid a second round
+        raw = secrets.token_bytes(missing + (missing >> 5) + 8)
+        chars += raw.translate(_BYTE_TO_CHAR, _REJECTED_BYTES)
+    
+    text = chars[:needed].decode('ascii')
+    return [text[i:i + length] for i in range(0, needed, length)]
+
+class DropIDAllocator:
+    """Hands out Drop ID candidates from a per-process pre-generated batch"""
+    
+    def __init__(self, length: int = 8, batch_size: int = 32):
+        self.length = length
+        self.batch_size = batch_size
+        self._pool = deque()
+        self._lock = threading.Lock()
+    
+    def next_id(self) -> str:
+        """Take the next candidate Drop ID, refilling the batch when empty"""
+        with self._lock:
+            if not self._pool:
+                self._pool.extend(generate_drop_ids(self.batch_size, self.length))
+            return self._pool.popleft()
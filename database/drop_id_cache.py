@@ -0,0 +1,57 @@
+import logging
+from utils.bloom import BloomFilter
+from utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+class DropIDLookupCache:
+    """Rejects unknown Drop IDs in memory before they cost a database query"""
+    
+    def __init__(self, miss_ttl: float = 300, miss_maxsize: int = 50_000,
+                 bloom_capacity: int = 1_000_000, bloom_error_rate: float = 0.001):
+        self.misses = TTLCache(maxsize=miss_maxsize, ttl=miss_ttl)
+        self.bloom_capacity = bloom_capacity
+        self.bloom_error_rate = bloom_error_rate
+        self.bloom: BloomFilter = None
+        self._created_during_rebuild: set = None
+    
+    def is_known_missing(self, drop_id: str) -> bool:
+        """True when the Drop ID surely doesn't exist (recent miss or not in the Bloom filter)"""
+        if drop_id in self.misses:
+            return True
+        return self.bloom is not None and drop_id not in self.bloom
+    
+    def record_miss(self, drop_id: str):
+        self.misses.set(drop_id)
+    
+    def record_created(self, drop_id: str):
+        self.misses.discard(drop_id)
+        if self.bloom is not None:
+            self.bloom.add(drop_id)
+        if self._created_during_rebuild is not None:
+            self._created_during_rebuild.add(drop_id)
+    
+    def record_deleted(self, drop_id: str):
+        # Bloom filters can't remove items; the next rebuild drops it
+        self.misses.set(drop_id)
+    
+    def start_rebuild(self) -> BloomFilter:
+        """Begin building a fresh filter; IDs created meanwhile are carried over"""
+        self._created_during_rebuild = set()
+        return BloomFilter(self.bloom_capacity, self.bloom_error_rate)
+    
+    def finish_rebuild(self, bloom: BloomFilter):
+        """Swap in a filter returned by start_rebuild and filled with all existing IDs"""
+        for drop_id in self._created_during_rebuild or ():
+            bloom.add(drop_id)
+        self._created_during_rebuild = None
+        
+        if bloom.count > bloom.capacity:
+            logger.warning(
+                f"Drop ID Bloom filter holds {bloom.count} IDs, above its capacity of "
+                f"{bloom.capacity}; raise DROP_ID_BLOOM_CAPACITY"
+            )
+        self.bloom = bloom
+    
+    def abort_rebuild(self):
+        self._created_during_rebuild = None
@@ -0,0 +1,24 @@
+# Postgres SQLSTATE for unique_violation
+UNIQUE_VIOLATION = '23505'
+
+def is_unique_violation(error: Exception, constraint: str = None) -> bool:
+    """Check if a database error was raised by a unique/primary key constraint"""
+    code = getattr(error, 'code', None)
+    text = str(error)
+    
+    if code != UNIQUE_VIOLATION and 'duplicate key' not in text:
+        return False
+    
+    if constraint:
+        return constraint in text or constraint in str(getattr(error, 'details', '') or '')
+    return True
+
+class DatabaseUnavailableError(Exception):
+    """The database is known to be down; the call was not attempted"""
+    
+    def __init__(self, message: str, retry_after: float = 0.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class CircuitOpenError(DatabaseUnavailableError):
+    """Raised instead of querying while the circuit breaker is open"""
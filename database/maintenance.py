@@ -0,0 +1,52 @@
+import asyncio
+import logging
+
+from .connection import db
+from config import config
+
+logger = logging.getLogger(__name__)
+
+async def run_in_batches(function_name: str, params: dict, batch_size: int = None,
+                         pause: float = None, max_batches: int = None) -> int:
+    """Call a batch-deleting database function until it runs dry; returns rows deleted
+    
+    The function gets `p_batch_size` and must return how many rows it
+    deleted. Each call is one short transaction in the database. Between
+    calls we sleep for `pause` seconds so the job never monopolizes the
+    table, and a run stops after `max_batches` calls; the next run picks up
+    the rest.
+    """
+    batch_size = batch_size or config.PURGE_BATCH_SIZE
+    pause = config.PURGE_BATCH_PAUSE if pause is None else pause
+    max_batches = max_batches or config.PURGE_MAX_BATCHES
+    
+    total = 0
+    for batch in range(max_batches):
+        response = await db.rpc(function_name, {**params, 'p_batch_size': batch_size}).execute()
+        deleted = response.data or 0
+        total += deleted
+        
+        if deleted < batch_size:
+            break
+        await asyncio.sleep(pause)
+    else:
+        logger.info(f"{function_name} stopped after {max_batches} batches, continuing next run")
+    return total
+
+async def purge_expired_inbox_items(default_days: int = None, **batching) -> int:
+    """Delete inbox items past their retention period; returns how many"""
+    default_days = config.INBOX_RETENTION_DAYS if default_days is None else default_days
+    total = await run_in_batches('purge_expired_inbox_items', {'p_default_days': default_days}, **batching)
+    
+    if total:
+        logger.info(f"Retention purge deleted {total} expired inbox item(s)")
+    return total
+
+async def compact_tombstones(grace_days: int = None, **batching) -> int:
+    """Hard-delete soft-deleted items and Drop IDs older than the grace period; returns how many"""
+    grace_days = config.TOMBSTONE_GRACE_DAYS if grace_days is None else grace_days
+    total = await run_in_batches('compact_tombstones', {'p_grace_days': grace_days}, **batching)
+    
+    if total:
+        logger.info(f"Compaction removed {total} soft-deleted row(s)")
+    return total
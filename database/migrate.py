@@ -0,0 +1,199 @@
+"""Apply the SQL migrations in database/migrations to Postgres.
+
+Migrations are files named NNNN_description.sql, applied in order, each in
+its own transaction, and recorded in the schema_migrations table. A file
+whose first line is `-- migrate:no-transaction` runs statement by statement
+outside a transaction instead, so it can use CREATE INDEX CONCURRENTLY. They are
+written to be safe on databases that were set up by hand from the old
+schema.sql, so the first `up` on such a database just fills in what is
+missing.
+
+Run from the repository root (DATABASE_URL is the Postgres connection
+string, e.g. Supabase's direct connection URI):
+    python -m database.migrate up        # apply pending migrations
+    python -m database.migrate status    # list applied and pending migrations
+    python -m database.migrate check     # report indexes the migrations expect but the database lacks
+"""
+import argparse
+import asyncio
+import hashlib
+import re
+import sys
+from pathlib import Path
+from typing import Dict, List, NamedTuple
+
+from config import config
+
+MIGRATIONS_DIR = Path(__file__).with_name("migrations")
+MIGRATION_FILE = re.compile(r"^(\d{4})_(\w+)\.sql$")
+INDEX_STATEMENT = re.compile(
+    r"\b(CREATE\s+(?:UNIQUE\s+)?INDEX|DROP\s+INDEX)\s+(?:CONCURRENTLY\s+)?(?:IF\s+(?:NOT\s+)?EXISTS\s+)?(\w+)",
+    re.IGNORECASE
+)
+NO_TRANSACTION_MARKER = "-- migrate:no-transaction"
+# Serializes concurrent `up` runs (e.g. two instances deploying at once)
+MIGRATION_LOCK_ID = 4_120_046
+
+CREATE_MIGRATIONS_TABLE = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    checksum TEXT NOT NULL,
+    applied_at TIMESTAMP WITH TIME ZONE DEFAULT TIMEZONE('utc'::text, NOW())
+)
+"""
+
+class Migration(NamedTuple):
+    """One migration file"""
+    version: int
+    name: str
+    sql: str
+
+    @property
+    def checksum(self) -> str:
+        return hashlib.sha256(self.sql.encode()).hexdigest()
+
+    @property
+    def transactional(self) -> bool:
+        return not self.sql.lstrip().startswith(NO_TRANSACTION_MARKER)
+
+def split_statements(sql: str) -> List[str]:
+    """Statements of a no-transaction migration (plain statements ending in ';', no function bodies)"""
+    statements = []
+    for chunk in re.split(r";\s*(?:\n|$)", sql):
+        code = "\n".join(line for line in chunk.splitlines() if not line.strip().startswith("--")).strip()
+        if code:
+            statements.append(code)
+    return statements
+
+def load_migrations(directory: Path = MIGRATIONS_DIR) -> List[Migration]:
+    """Migration files sorted by version"""
+    migrations = {}
+    for path in sorted(directory.glob("*.sql")):
+        match = MIGRATION_FILE.match(path.name)
+        if not match:
+            raise ValueError(f"Migration file name must look like 0001_description.sql: {path.name}")
+
+        version = int(match.group(1))
+        if version in migrations:
+            raise ValueError(f"Duplicate migration version {version}: {path.name}")
+        migrations[version] = Migration(version, match.group(2), path.read_text())
+
+    return [migrations[version] for version in sorted(migrations)]
+
+def pending_migrations(migrations: List[Migration], applied: Dict[int, str]) -> List[Migration]:
+    """Migrations not yet applied; raises if an applied file was edited afterwards"""
+    changed = [m for m in migrations if m.version in applied and applied[m.version] != m.checksum]
+    if changed:
+        names = ", ".join(f"{m.version:04d}_{m.name}" for m in changed)
+        raise ValueError(f"Applied migrations were modified: {names} - add a new migration instead")
+    return [m for m in migrations if m.version not in applied]
+
+def expected_indexes(migrations: List[Migration]) -> List[str]:
+    """Names of the indexes that exist after applying every migration"""
+    indexes = {}
+    for migration in migrations:
+        for statement, name in INDEX_STATEMENT.findall(migration.sql):
+            if statement.upper().startswith("DROP"):
+                indexes.pop(name.lower(), None)
+            else:
+                indexes[name.lower()] = True
+    return list(indexes)
+
+async def connect(database_url: str = None):
+    """Open a Postgres connection (asyncpg is only needed for migrations)"""
+    database_url = database_url or config.DATABASE_URL
+    if not database_url:
+        raise ValueError("DATABASE_URL is not set")
+
+    import asyncpg
+    return await asyncpg.connect(database_url)
+
+async def applied_migrations(conn) -> Dict[int, str]:
+    await conn.execute(CREATE_MIGRATIONS_TABLE)
+    rows = await conn.fetch("SELECT version, checksum FROM schema_migrations")
+    return {row['version']: row['checksum'] for row in rows}
+
+async def migrate_up(conn, migrations: List[Migration]) -> List[Migration]:
+    """Apply pending migrations in order; returns the ones applied"""
+    await conn.execute("SELECT pg_advisory_lock($1)", MIGRATION_LOCK_ID)
+    try:
+        pending = pending_migrations(migrations, await applied_migrations(conn))
+        for migration in pending:
+            if migration.transactional:
+                async with conn.transaction():
+                    await conn.execute(migration.sql)
+                    await record_migration(conn, migration)
+            else:
+                # Each statement commits on its own; they must be safe to run again
+                # (IF [NOT] EXISTS) in case the migration stops halfway
+                for statement in split_statements(migration.sql):
+                    await conn.execute(statement)
+                await record_migration(conn, migration)
+            print(f"Applied {migration.version:04d}_{migration.name}")
+        return pending
+    finally:
+        await conn.execute("SELECT pg_advisory_unlock($1)", MIGRATION_LOCK_ID)
+
+async def record_migration(conn, migration: Migration):
+    await conn.execute(
+        "INSERT INTO schema_migrations (version, name, checksum) VALUES ($1, $2, $3)",
+        migration.version, migration.name, migration.checksum
+    )
+
+async def missing_indexes(conn, migrations: List[Migration]) -> List[str]:
+    """Expected indexes that don't exist or are invalid (a CREATE INDEX CONCURRENTLY that failed)"""
+    rows = await conn.fetch("""
+        SELECT c.relname AS indexname, i.indisvalid
+        FROM pg_index i
+        JOIN pg_class c ON c.oid = i.indexrelid
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = 'public'
+    """)
+    valid = {row['indexname'] for row in rows if row['indisvalid']}
+    return [name for name in expected_indexes(migrations) if name not in valid]
+
+async def run(command: str) -> int:
+    migrations = load_migrations()
+    conn = await connect()
+    try:
+        if command == "up":
+            applied = await migrate_up(conn, migrations)
+            print(f"{len(applied)} migration(s) applied" if applied else "Database is up to date")
+            return 0
+
+        if command == "status":
+            applied = await applied_migrations(conn)
+            for migration in migrations:
+                state = "applied" if migration.version in applied else "pending"
+                print(f"{migration.version:04d}_{migration.name:<30}{state}")
+            pending_migrations(migrations, applied)
+            return 0
+
+        missing = await missing_indexes(conn, migrations)
+        for name in missing:
+            print(f"Missing or invalid index: {name}")
+        if missing:
+            print(
+                f"\n{len(missing)} index(es) missing - drop any invalid ones, then run "
+                f"`python -m database.migrate up`"
+            )
+            return 1
+        print("All expected indexes exist")
+        return 0
+    finally:
+        await conn.close()
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("command", choices=["up", "status", "check"])
+    args = parser.parse_args()
+
+    try:
+        return asyncio.run(run(args.command))
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -30,6 +30,13 @@ CREATE TABLE IF NOT EXISTS inbox_items (
     created_at TIMESTAMP WITH TIME ZONE DEFAULT TIMEZONE('utc'::text, NOW())
 );
 
+-- Columns added after the first release
+ALTER TABLE drop_ids ADD COLUMN IF NOT EXISTS deleted_at TIMESTAMP WITH TIME ZONE;
+ALTER TABLE inbox_items ADD COLUMN IF NOT EXISTS file_name TEXT;
+ALTER TABLE inbox_items ADD COLUMN IF NOT EXISTS file_size BIGINT;
+ALTER TABLE inbox_items ADD COLUMN IF NOT EXISTS mime_type TEXT;
+ALTER TABLE inbox_items ADD COLUMN IF NOT EXISTS deleted_at TIMESTAMP WITH TIME ZONE;
+
 -- Indexes for better performance
 CREATE INDEX IF NOT EXISTS idx_drop_ids_owner ON drop_ids(owner_id);
 CREATE INDEX IF NOT EXISTS idx_drop_ids_active ON drop_ids(is_active);
@@ -39,4 +46,4 @@ CREATE INDEX IF NOT EXISTS idx_inbox_items_created_at ON inbox_items(created_at)
 -- Enable Row Level Security (optional but recommended)
 ALTER TABLE users ENABLE ROW LEVEL SECURITY;
 ALTER TABLE drop_ids ENABLE ROW LEVEL SECURITY;
-ALTER TABLE inbox_items ENABLE ROW LEVEL SECURITY;
\ No newline at end of file
+ALTER TABLE inbox_items ENABLE ROW LEVEL SECURITY;
@@ -0,0 +1,4 @@
+-- Identifies the sender's message (see message_idempotency_key), so a
+-- retried insert can't store the same item twice. The unique index is
+-- built concurrently in 0009_idempotency_key_index.
+ALTER TABLE inbox_items ADD COLUMN IF NOT EXISTS idempotency_key TEXT;
@@ -0,0 +1,106 @@
+-- Inbox counters per Drop ID and per owner, maintained incrementally by the
+-- triggers below so inbox summaries don't have to scan inbox_items.
+-- Soft-deleted items (deleted_at set) are not counted.
+CREATE TABLE IF NOT EXISTS drop_id_stats (
+    drop_id VARCHAR(10) PRIMARY KEY,
+    owner_id BIGINT NOT NULL,
+    item_count INTEGER NOT NULL DEFAULT 0,
+    file_count INTEGER NOT NULL DEFAULT 0,
+    total_bytes BIGINT NOT NULL DEFAULT 0,
+    last_received_at TIMESTAMP WITH TIME ZONE
+);
+
+CREATE TABLE IF NOT EXISTS owner_inbox_stats (
+    owner_id BIGINT PRIMARY KEY REFERENCES users(telegram_id) ON DELETE CASCADE,
+    item_count INTEGER NOT NULL DEFAULT 0,
+    file_count INTEGER NOT NULL DEFAULT 0,
+    total_bytes BIGINT NOT NULL DEFAULT 0,
+    last_received_at TIMESTAMP WITH TIME ZONE
+);
+
+CREATE INDEX IF NOT EXISTS idx_drop_id_stats_owner ON drop_id_stats(owner_id);
+
+-- Add (p_sign = 1) or remove (p_sign = -1) one inbox item from the counters
+CREATE OR REPLACE FUNCTION apply_inbox_stats(p_drop_id VARCHAR, p_sign INTEGER, p_is_file BOOLEAN,
+                                             p_bytes BIGINT, p_received_at TIMESTAMP WITH TIME ZONE)
+RETURNS VOID AS $$
+DECLARE
+    v_owner_id BIGINT;
+    v_files INTEGER := CASE WHEN p_is_file THEN p_sign ELSE 0 END;
+    v_bytes BIGINT := p_sign * COALESCE(p_bytes, 0);
+    v_received TIMESTAMP WITH TIME ZONE := CASE WHEN p_sign > 0 THEN p_received_at END;
+BEGIN
+    -- Missing when the Drop ID itself is being deleted (its counters are
+    -- removed by drop_ids_stats_cleanup before the cascade reaches here)
+    SELECT owner_id INTO v_owner_id FROM drop_ids WHERE id = p_drop_id;
+    IF v_owner_id IS NULL THEN
+        RETURN;
+    END IF;
+
+    INSERT INTO drop_id_stats AS s (drop_id, owner_id, item_count, file_count, total_bytes, last_received_at)
+    VALUES (p_drop_id, v_owner_id, GREATEST(p_sign, 0), GREATEST(v_files, 0), GREATEST(v_bytes, 0), v_received)
+    ON CONFLICT (drop_id) DO UPDATE SET
+        item_count = GREATEST(s.item_count + p_sign, 0),
+        file_count = GREATEST(s.file_count + v_files, 0),
+        total_bytes = GREATEST(s.total_bytes + v_bytes, 0),
+        last_received_at = GREATEST(s.last_received_at, v_received);
+
+    INSERT INTO owner_inbox_stats AS s (owner_id, item_count, file_count, total_bytes, last_received_at)
+    VALUES (v_owner_id, GREATEST(p_sign, 0), GREATEST(v_files, 0), GREATEST(v_bytes, 0), v_received)
+    ON CONFLICT (owner_id) DO UPDATE SET
+        item_count = GREATEST(s.item_count + p_sign, 0),
+        file_count = GREATEST(s.file_count + v_files, 0),
+        total_bytes = GREATEST(s.total_bytes + v_bytes, 0),
+        last_received_at = GREATEST(s.last_received_at, v_received);
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION inbox_items_stats_trigger() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.deleted_at IS NULL THEN
+        PERFORM apply_inbox_stats(OLD.drop_id, -1, OLD.file_id IS NOT NULL, OLD.file_size, OLD.created_at);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.deleted_at IS NULL THEN
+        PERFORM apply_inbox_stats(NEW.drop_id, 1, NEW.file_id IS NOT NULL, NEW.file_size, NEW.created_at);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS inbox_items_stats ON inbox_items;
+CREATE TRIGGER inbox_items_stats
+    AFTER INSERT OR DELETE OR UPDATE OF deleted_at, drop_id, file_id, file_size ON inbox_items
+    FOR EACH ROW EXECUTE FUNCTION inbox_items_stats_trigger();
+
+-- Runs before the cascade deletes the Drop ID's items
+CREATE OR REPLACE FUNCTION drop_ids_stats_cleanup() RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE owner_inbox_stats o SET
+        item_count = GREATEST(o.item_count - s.item_count, 0),
+        file_count = GREATEST(o.file_count - s.file_count, 0),
+        total_bytes = GREATEST(o.total_bytes - s.total_bytes, 0)
+    FROM drop_id_stats s
+    WHERE s.drop_id = OLD.id AND o.owner_id = s.owner_id;
+
+    DELETE FROM drop_id_stats WHERE drop_id = OLD.id;
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS drop_ids_stats_cleanup ON drop_ids;
+CREATE TRIGGER drop_ids_stats_cleanup
+    BEFORE DELETE ON drop_ids
+    FOR EACH ROW EXECUTE FUNCTION drop_ids_stats_cleanup();
+
+-- Backfill counters for items stored before the triggers existed
+INSERT INTO drop_id_stats (drop_id, owner_id, item_count, file_count, total_bytes, last_received_at)
+SELECT d.id, d.owner_id, COUNT(i.id), COUNT(i.file_id), COALESCE(SUM(i.file_size), 0), MAX(i.created_at)
+FROM drop_ids d JOIN inbox_items i ON i.drop_id = d.id AND i.deleted_at IS NULL
+GROUP BY d.id, d.owner_id
+ON CONFLICT (drop_id) DO NOTHING;
+
+INSERT INTO owner_inbox_stats (owner_id, item_count, file_count, total_bytes, last_received_at)
+SELECT owner_id, SUM(item_count), SUM(file_count), SUM(total_bytes), MAX(last_received_at)
+FROM drop_id_stats
+GROUP BY owner_id
+ON CONFLICT (owner_id) DO NOTHING;
@@ -0,0 +1,39 @@
+-- Inbox search: word index over message text and file name, trigram index for substrings
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+ALTER TABLE inbox_items ADD COLUMN IF NOT EXISTS search_text TEXT
+    GENERATED ALWAYS AS (COALESCE(message_text, '') || ' ' || COALESCE(file_name, '')) STORED;
+ALTER TABLE inbox_items ADD COLUMN IF NOT EXISTS search_vector TSVECTOR
+    GENERATED ALWAYS AS (to_tsvector('simple', COALESCE(message_text, '') || ' ' || COALESCE(file_name, ''))) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_inbox_items_search_vector ON inbox_items USING GIN (search_vector);
+CREATE INDEX IF NOT EXISTS idx_inbox_items_search_trgm ON inbox_items USING GIN (search_text gin_trgm_ops);
+
+-- One page of an owner's matching items, newest first. Uses the word index
+-- when the query matches whole words, otherwise falls back to a substring
+-- match served by the trigram index.
+CREATE OR REPLACE FUNCTION search_inbox(p_owner_id BIGINT, p_query TEXT, p_limit INT DEFAULT 10, p_offset INT DEFAULT 0)
+RETURNS SETOF inbox_items AS $$
+DECLARE
+    v_tsquery TSQUERY := plainto_tsquery('simple', p_query);
+    v_pattern TEXT := '%' || replace(replace(replace(p_query, '\', '\\'), '%', '\%'), '_', '\_') || '%';
+BEGIN
+    IF numnode(v_tsquery) > 0 AND EXISTS (
+        SELECT 1 FROM inbox_items i JOIN drop_ids d ON d.id = i.drop_id
+        WHERE d.owner_id = p_owner_id AND i.deleted_at IS NULL AND i.search_vector @@ v_tsquery
+    ) THEN
+        RETURN QUERY
+            SELECT i.* FROM inbox_items i JOIN drop_ids d ON d.id = i.drop_id
+            WHERE d.owner_id = p_owner_id AND i.deleted_at IS NULL AND i.search_vector @@ v_tsquery
+            ORDER BY i.created_at DESC, i.id DESC
+            LIMIT p_limit OFFSET p_offset;
+        RETURN;
+    END IF;
+
+    RETURN QUERY
+        SELECT i.* FROM inbox_items i JOIN drop_ids d ON d.id = i.drop_id
+        WHERE d.owner_id = p_owner_id AND i.deleted_at IS NULL AND i.search_text ILIKE v_pattern
+        ORDER BY i.created_at DESC, i.id DESC
+        LIMIT p_limit OFFSET p_offset;
+END;
+$$ LANGUAGE plpgsql STABLE;
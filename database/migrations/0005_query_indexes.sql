@@ -0,0 +1,30 @@
+-- migrate:no-transaction
+-- Indexes matching the bot's hot queries. Most reads only look at rows that
+-- are not soft-deleted, so those indexes are partial and stay small.
+-- Built CONCURRENTLY (outside a transaction) so inserts keep working meanwhile.
+
+-- Replace the earlier full-table versions of the two inbox indexes
+DROP INDEX CONCURRENTLY IF EXISTS idx_inbox_items_drop_id_created_at;
+DROP INDEX CONCURRENTLY IF EXISTS idx_inbox_items_drop_id_file_type;
+
+-- Inbox pages: items of a set of Drop IDs, newest first
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_inbox_items_drop_id_created_at
+    ON inbox_items(drop_id, created_at DESC) WHERE deleted_at IS NULL;
+
+-- Inbox filter by type, and the file list behind "Download All"
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_inbox_items_drop_id_file_type
+    ON inbox_items(drop_id, file_type, created_at DESC) WHERE deleted_at IS NULL;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_inbox_items_files
+    ON inbox_items(drop_id, created_at DESC, id DESC) WHERE file_id IS NOT NULL AND deleted_at IS NULL;
+
+-- /my_ids and every per-owner lookup, newest first
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_drop_ids_owner_created_at ON drop_ids(owner_id, created_at DESC);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_drop_ids_owner_live
+    ON drop_ids(owner_id, created_at DESC) WHERE deleted_at IS NULL;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_drop_ids_owner_active
+    ON drop_ids(owner_id) WHERE is_active AND deleted_at IS NULL;
+
+-- Covered by the composite indexes above
+DROP INDEX CONCURRENTLY IF EXISTS idx_drop_ids_owner;
+DROP INDEX CONCURRENTLY IF EXISTS idx_drop_ids_active;
+DROP INDEX CONCURRENTLY IF EXISTS idx_inbox_items_drop_id;
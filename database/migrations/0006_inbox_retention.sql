@@ -0,0 +1,29 @@
+-- Retention in days: NULL inherits (Drop ID -> user -> server default), 0 keeps items forever
+ALTER TABLE users ADD COLUMN IF NOT EXISTS retention_days INTEGER CHECK (retention_days >= 0);
+ALTER TABLE drop_ids ADD COLUMN IF NOT EXISTS retention_days INTEGER CHECK (retention_days >= 0);
+
+-- Delete at most p_batch_size expired items, oldest first, and return how
+-- many were deleted. Small batches keep each transaction and its row locks
+-- short; rows locked by other transactions are skipped until the next run.
+CREATE OR REPLACE FUNCTION purge_expired_inbox_items(p_default_days INTEGER, p_batch_size INTEGER)
+RETURNS INTEGER AS $$
+DECLARE
+    v_deleted INTEGER;
+BEGIN
+    WITH expired AS (
+        SELECT i.id
+        FROM inbox_items i
+        JOIN drop_ids d ON d.id = i.drop_id
+        JOIN users u ON u.telegram_id = d.owner_id
+        WHERE COALESCE(d.retention_days, u.retention_days, p_default_days, 0) > 0
+          AND i.created_at < NOW() - make_interval(days => COALESCE(d.retention_days, u.retention_days, p_default_days))
+        ORDER BY i.created_at
+        LIMIT p_batch_size
+        FOR UPDATE OF i SKIP LOCKED
+    )
+    DELETE FROM inbox_items WHERE id IN (SELECT id FROM expired);
+
+    GET DIAGNOSTICS v_deleted = ROW_COUNT;
+    RETURN v_deleted;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,40 @@
+-- Soft-deleted rows ("tombstones") are hidden from every read but still sit
+-- in the table and its indexes until compaction removes them. The indexes
+-- compaction scans are built concurrently in 0010_tombstone_indexes.
+
+-- Hard-delete at most p_batch_size tombstones older than p_grace_days and
+-- return how many rows were removed. Items go first; a deleted Drop ID is
+-- removed once none of its items are left, so no batch cascades further.
+CREATE OR REPLACE FUNCTION compact_tombstones(p_grace_days INTEGER, p_batch_size INTEGER)
+RETURNS INTEGER AS $$
+DECLARE
+    v_cutoff TIMESTAMP WITH TIME ZONE := NOW() - make_interval(days => p_grace_days);
+    v_items INTEGER;
+    v_drop_ids INTEGER := 0;
+BEGIN
+    WITH tombstones AS (
+        SELECT id FROM inbox_items
+        WHERE deleted_at < v_cutoff
+        ORDER BY deleted_at
+        LIMIT p_batch_size
+        FOR UPDATE SKIP LOCKED
+    )
+    DELETE FROM inbox_items WHERE id IN (SELECT id FROM tombstones);
+    GET DIAGNOSTICS v_items = ROW_COUNT;
+
+    IF v_items < p_batch_size THEN
+        WITH tombstones AS (
+            SELECT d.id FROM drop_ids d
+            WHERE d.deleted_at < v_cutoff
+              AND NOT EXISTS (SELECT 1 FROM inbox_items i WHERE i.drop_id = d.id)
+            ORDER BY d.deleted_at
+            LIMIT p_batch_size - v_items
+            FOR UPDATE SKIP LOCKED
+        )
+        DELETE FROM drop_ids WHERE id IN (SELECT id FROM tombstones);
+        GET DIAGNOSTICS v_drop_ids = ROW_COUNT;
+    END IF;
+
+    RETURN v_items + v_drop_ids;
+END;
+$$ LANGUAGE plpgsql;
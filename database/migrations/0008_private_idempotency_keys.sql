@@ -0,0 +1,51 @@
+-- Idempotency keys are now an HMAC of the sender's chat and message id, so
+-- the sender can't be read back from the recipient's row. Plain
+-- "chat_id:message_id" keys written before this are cleared; they only
+-- guard against retries within seconds of the insert.
+UPDATE inbox_items SET idempotency_key = NULL WHERE idempotency_key LIKE '%:%';
+
+-- search_inbox returned whole rows (idempotency_key included); return only
+-- the columns the bot shows. The return type changes, so drop it first.
+DROP FUNCTION IF EXISTS search_inbox(BIGINT, TEXT, INT, INT);
+
+CREATE FUNCTION search_inbox(p_owner_id BIGINT, p_query TEXT, p_limit INT DEFAULT 10, p_offset INT DEFAULT 0)
+RETURNS TABLE (
+    id BIGINT,
+    drop_id VARCHAR(10),
+    sender_anon_id VARCHAR(20),
+    file_id TEXT,
+    file_type VARCHAR(50),
+    message_text TEXT,
+    file_name TEXT,
+    file_size BIGINT,
+    mime_type TEXT,
+    created_at TIMESTAMP WITH TIME ZONE
+) AS $$
+#variable_conflict use_column
+DECLARE
+    v_tsquery TSQUERY := plainto_tsquery('simple', p_query);
+    v_pattern TEXT := '%' || replace(replace(replace(p_query, '\', '\\'), '%', '\%'), '_', '\_') || '%';
+BEGIN
+    IF numnode(v_tsquery) > 0 AND EXISTS (
+        SELECT 1 FROM inbox_items i JOIN drop_ids d ON d.id = i.drop_id
+        WHERE d.owner_id = p_owner_id AND i.deleted_at IS NULL AND i.search_vector @@ v_tsquery
+    ) THEN
+        RETURN QUERY
+            SELECT i.id, i.drop_id, i.sender_anon_id, i.file_id, i.file_type, i.message_text,
+                   i.file_name, i.file_size, i.mime_type, i.created_at
+            FROM inbox_items i JOIN drop_ids d ON d.id = i.drop_id
+            WHERE d.owner_id = p_owner_id AND i.deleted_at IS NULL AND i.search_vector @@ v_tsquery
+            ORDER BY i.created_at DESC, i.id DESC
+            LIMIT p_limit OFFSET p_offset;
+        RETURN;
+    END IF;
+
+    RETURN QUERY
+        SELECT i.id, i.drop_id, i.sender_anon_id, i.file_id, i.file_type, i.message_text,
+               i.file_name, i.file_size, i.mime_type, i.created_at
+        FROM inbox_items i JOIN drop_ids d ON d.id = i.drop_id
+        WHERE d.owner_id = p_owner_id AND i.deleted_at IS NULL AND i.search_text ILIKE v_pattern
+        ORDER BY i.created_at DESC, i.id DESC
+        LIMIT p_limit OFFSET p_offset;
+END;
+$$ LANGUAGE plpgsql STABLE;
@@ -0,0 +1,4 @@
+-- migrate:no-transaction
+-- Unique idempotency keys (column added in 0002). Built CONCURRENTLY so
+-- inserts into inbox_items keep working meanwhile.
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS idx_inbox_items_idempotency_key ON inbox_items(idempotency_key);
@@ -0,0 +1,5 @@
+-- migrate:no-transaction
+-- Tombstones by age, for compact_tombstones (0007). Built CONCURRENTLY so
+-- writes to inbox_items and drop_ids keep working meanwhile.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_inbox_items_deleted_at ON inbox_items(deleted_at) WHERE deleted_at IS NOT NULL;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_drop_ids_deleted_at ON drop_ids(deleted_at) WHERE deleted_at IS NOT NULL;
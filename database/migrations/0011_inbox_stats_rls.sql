@@ -0,0 +1,5 @@
+-- The counter tables from 0003 hold each Drop ID's owner telegram_id.
+-- Like the tables in 0001, they get row level security with no policies,
+-- so only the service key the bot uses can read them through PostgREST.
+ALTER TABLE drop_id_stats ENABLE ROW LEVEL SECURITY;
+ALTER TABLE owner_inbox_stats ENABLE ROW LEVEL SECURITY;
@@ -1,15 +1,18 @@
 from datetime import datetime, timedelta
 
 class User:
-    def __init__(self, telegram_id: int, pin_hash: str = None, created_at: datetime = None):
+    def __init__(self, telegram_id: int, pin_hash: str = None, created_at: datetime = None,
+                 retention_days: int = None):
         self.telegram_id = telegram_id
         self.pin_hash = pin_hash
         self.created_at = created_at or datetime.utcnow()
+        self.retention_days = retention_days
 
 class DropID:
     def __init__(self, id: str, owner_id: int, is_active: bool = True, 
                  is_single_use: bool = False, expires_at: datetime = None,
-                 created_at: datetime = None, deleted_at: datetime = None):
+                 created_at: datetime = None, deleted_at: datetime = None,
+                 retention_days: int = None):
         self.id = id
         self.owner_id = owner_id
         self.is_active = is_active
@@ -17,6 +20,7 @@ class DropID:
         self.expires_at = expires_at
         self.created_at = created_at or datetime.utcnow()
         self.deleted_at = deleted_at
+        self.retention_days = retention_days
     
     def is_expired(self) -> bool:
         if self.expires_at:
@@ -46,4 +50,23 @@ class InboxItem:
         self.deleted_at = deleted_at
     
     def is_deleted(self) -> bool:
-        return self.deleted_at is not None
\ No newline at end of file
+        return self.deleted_at is not None
+
+class InboxStats:
+    """Counters of non-deleted inbox items (per Drop ID or per owner)"""
+    def __init__(self, item_count: int = 0, file_count: int = 0, total_bytes: int = 0,
+                 last_received_at: datetime = None):
+        self.item_count = item_count
+        self.file_count = file_count
+        self.total_bytes = total_bytes
+        self.last_received_at = last_received_at
+    
+    @classmethod
+    def from_row(cls, row: dict) -> "InboxStats":
+        last_received_at = row.get('last_received_at')
+        return cls(
+            item_count=row.get('item_count') or 0,
+            file_count=row.get('file_count') or 0,
+            total_bytes=row.get('total_bytes') or 0,
+            last_received_at=datetime.fromisoformat(last_received_at.replace('Z', '+00:00')) if last_received_at else None
+        )
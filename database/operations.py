@@ -1,59 +1,81 @@
 from .connection import db
-from .models import User, DropID, InboxItem
+from .models import User, DropID, InboxItem, InboxStats
+from .drop_id_allocator import DropIDAllocator, generate_drop_ids
+from .drop_id_cache import DropIDLookupCache
+from .errors import DatabaseUnavailableError, is_unique_violation
+from .retry import retry_with_backoff
+from .write_buffer import InboxWriteBuffer
+from utils.cache import TTLCache
+from config import config
 from datetime import datetime, timedelta
-import secrets
-import string
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Per-process pool of pre-generated Drop ID candidates
+drop_id_allocator = DropIDAllocator(length=config.DROP_ID_LENGTH)
+
+# In-memory rejection of unknown Drop IDs in front of get_drop_id
+drop_id_lookup_cache = DropIDLookupCache(
+    miss_ttl=config.DROP_ID_MISS_CACHE_TTL,
+    miss_maxsize=config.DROP_ID_MISS_CACHE_SIZE,
+    bloom_capacity=config.DROP_ID_BLOOM_CAPACITY,
+    bloom_error_rate=config.DROP_ID_BLOOM_ERROR_RATE
+)
+
+# Users this process has already created or fetched
+known_users = TTLCache(maxsize=config.KNOWN_USER_CACHE_SIZE, ttl=config.KNOWN_USER_CACHE_TTL)
+
+# PIN hash (or None for "no PIN") per user, kept in sync by set_user_pin
+pin_hash_cache = TTLCache(maxsize=config.PIN_CACHE_SIZE, ttl=config.PIN_CACHE_TTL)
+_NOT_CACHED = object()
+
 class UserOperations:
     @staticmethod
     async def get_or_create_user(telegram_id: int) -> User:
-        """Get user or create if doesn't exist"""
+        """Get user or create if doesn't exist (one upsert, safe under concurrency)"""
         try:
-            # Try to get existing user
-            response = db.table('users').select('*').eq('telegram_id', telegram_id).execute()
+            # Only the key is sent, so an existing row keeps its PIN and created_at
+            response = await db.table('users')\
+                .upsert({'telegram_id': telegram_id}, on_conflict='telegram_id')\
+                .execute()
             
-            if response.data and len(response.data) > 0:
-                # User exists
-                user_data = response.data[0]
-                return User(
-                    telegram_id=user_data['telegram_id'],
-                    pin_hash=user_data['pin_hash'],
-                    created_at=datetime.fromisoformat(user_data['created_at'].replace('Z', '+00:00'))
-                )
-            else:
-                # Create new user
-                user_data = {
-                    'telegram_id': telegram_id,
-                    'created_at': datetime.utcnow().isoformat()
-                }
-                
-                response = db.table('users').insert(user_data).execute()
-                
-                if response.data and len(response.data) > 0:
-                    new_user = response.data[0]
-                    return User(
-                        telegram_id=new_user['telegram_id'],
-                        pin_hash=new_user['pin_hash'],
-                        created_at=datetime.fromisoformat(new_user['created_at'].replace('Z', '+00:00'))
-                    )
-                else:
-                    raise Exception("Failed to create user")
+            if not response.data:
+                raise Exception("Failed to create user")
+            
+            user_data = response.data[0]
+            known_users.set(telegram_id)
+            pin_hash_cache.set(telegram_id, user_data.get('pin_hash'))
+            return User(
+                telegram_id=user_data['telegram_id'],
+                pin_hash=user_data.get('pin_hash'),
+                created_at=datetime.fromisoformat(user_data['created_at'].replace('Z', '+00:00')),
+                retention_days=user_data.get('retention_days')
+            )
                     
         except Exception as e:
             logger.error(f"Error in get_or_create_user: {e}")
             raise
     
+    @staticmethod
+    async def ensure_user(telegram_id: int):
+        """Make sure a users row exists, skipping the database for users seen recently"""
+        if telegram_id in known_users:
+            return
+        await UserOperations.get_or_create_user(telegram_id)
+    
     @staticmethod
     async def set_user_pin(telegram_id: int, pin_hash: str):
         """Set user PIN hash"""
         try:
-            response = db.table('users').update({'pin_hash': pin_hash}).eq('telegram_id', telegram_id).execute()
+            # Forget the old hash first: it must not outlive a failed update
+            pin_hash_cache.discard(telegram_id)
+            response = await db.table('users').update({'pin_hash': pin_hash}).eq('telegram_id', telegram_id).execute()
             
             if not response.data:
                 raise Exception("User not found")
+            
+            pin_hash_cache.set(telegram_id, pin_hash)
                 
         except Exception as e:
             logger.error(f"Error setting user PIN: {e}")
@@ -62,13 +84,21 @@ class UserOperations:
     @staticmethod
     async def get_user_pin_hash(telegram_id: int) -> str:
         """Get user's PIN hash"""
+        cached = pin_hash_cache.get(telegram_id, _NOT_CACHED)
+        if cached is not _NOT_CACHED:
+            return cached
+        
         try:
-            response = db.table('users').select('pin_hash').eq('telegram_id', telegram_id).execute()
+            response = await db.table('users').select('pin_hash').eq('telegram_id', telegram_id).execute()
             
-            if response.data and len(response.data) > 0:
-                return response.data[0]['pin_hash']
-            return None
+            pin_hash = response.data[0]['pin_hash'] if response.data else None
+            # set_user_pin may have stored a newer hash while this read was in flight
+            if telegram_id not in pin_hash_cache:
+                pin_hash_cache.set(telegram_id, pin_hash)
+            return pin_hash
             
+        except DatabaseUnavailableError:
+            raise
         except Exception as e:
             logger.error(f"Error getting user PIN hash: {e}")
             return None
@@ -79,37 +109,59 @@ class UserOperations:
         pin_hash = await UserOperations.get_user_pin_hash(telegram_id)
         return pin_hash is not None
 
+    @staticmethod
+    async def set_retention_days(telegram_id: int, days: int = None):
+        """Set how long the user's items are kept (None = server default, 0 = forever)"""
+        try:
+            response = await db.table('users').update({'retention_days': days}).eq('telegram_id', telegram_id).execute()
+            
+            if not response.data:
+                raise Exception("User not found")
+                
+        except Exception as e:
+            logger.error(f"Error setting user retention: {e}")
+            raise
+
 class DropIDOperations:
+    # Attempts before giving up when generated IDs keep hitting existing ones
+    MAX_ALLOCATION_ATTEMPTS = 5
+    
     @staticmethod
     def generate_drop_id(length: int = 8) -> str:
         """Generate a random Drop ID"""
-        alphabet = string.ascii_lowercase + string.digits
-        return ''.join(secrets.choice(alphabet) for _ in range(length))
+        return generate_drop_ids(1, length)[0]
     
     @staticmethod
     async def create_drop_id(owner_id: int, is_single_use: bool = False, 
                            expires_hours: int = None) -> DropID:
         """Create a new Drop ID"""
         try:
-            drop_id = DropIDOperations.generate_drop_id()
             expires_at = None
             
             if expires_hours:
                 expires_at = datetime.utcnow() + timedelta(hours=expires_hours)
             
-            drop_data = {
-                'id': drop_id,
-                'owner_id': owner_id,
-                'is_single_use': is_single_use,
-                'is_active': True,
-                'expires_at': expires_at.isoformat() if expires_at else None,
-                'created_at': datetime.utcnow().isoformat()
-            }
-            
-            response = db.table('drop_ids').insert(drop_data).execute()
+            for attempt in range(1, DropIDOperations.MAX_ALLOCATION_ATTEMPTS + 1):
+                drop_data = {
+                    'id': drop_id_allocator.next_id(),
+                    'owner_id': owner_id,
+                    'is_single_use': is_single_use,
+                    'is_active': True,
+                    'expires_at': expires_at.isoformat() if expires_at else None,
+                    'created_at': datetime.utcnow().isoformat()
+                }
+                
+                try:
+                    response = await db.table('drop_ids').insert(drop_data).execute()
+                    break
+                except Exception as e:
+                    if not is_unique_violation(e, 'drop_ids_pkey') or attempt == DropIDOperations.MAX_ALLOCATION_ATTEMPTS:
+                        raise
+                    logger.warning(f"Drop ID collision on {drop_data['id']}, retrying (attempt {attempt})")
             
             if response.data and len(response.data) > 0:
                 drop_data = response.data[0]
+                drop_id_lookup_cache.record_created(drop_data['id'])
                 return DropID(
                     id=drop_data['id'],
                     owner_id=drop_data['owner_id'],
@@ -127,9 +179,16 @@ class DropIDOperations:
     
     @staticmethod
     async def get_drop_id(drop_id: str) -> DropID:
-        """Get Drop ID by ID"""
+        """Get Drop ID by ID (soft-deleted Drop IDs count as missing)"""
+        if drop_id_lookup_cache.is_known_missing(drop_id):
+            return None
+        
         try:
-            response = db.table('drop_ids').select('*').eq('id', drop_id).execute()
+            response = await db.table('drop_ids')\
+                .select('*')\
+                .eq('id', drop_id)\
+                .is_('deleted_at', 'null')\
+                .execute()
             
             if response.data and len(response.data) > 0:
                 drop_data = response.data[0]
@@ -139,57 +198,72 @@ class DropIDOperations:
                     is_active=drop_data['is_active'],
                     is_single_use=drop_data['is_single_use'],
                     expires_at=datetime.fromisoformat(drop_data['expires_at'].replace('Z', '+00:00')) if drop_data['expires_at'] else None,
-                    created_at=datetime.fromisoformat(drop_data['created_at'].replace('Z', '+00:00'))
+                    created_at=datetime.fromisoformat(drop_data['created_at'].replace('Z', '+00:00')),
+                    retention_days=drop_data.get('retention_days')
                 )
+            
+            drop_id_lookup_cache.record_miss(drop_id)
             return None
             
+        except DatabaseUnavailableError:
+            # Not "not found": let the handler answer that the service is busy
+            raise
         except Exception as e:
             logger.error(f"Error getting Drop ID: {e}")
             return None
     
     @staticmethod
-    async def get_user_drop_ids(owner_id: int) -> list[DropID]:
-        """Get all Drop IDs for a user"""
+    async def iter_drop_id_pages(page_size: int = 1000):
+        """Yield all existing Drop ID strings page by page (keyset pagination)"""
+        last_id = None
+        while True:
+            query = db.table('drop_ids').select('id').order('id').limit(page_size)
+            if last_id is not None:
+                query = query.gt('id', last_id)
+            
+            response = await query.execute()
+            ids = [row['id'] for row in response.data or []]
+            if not ids:
+                return
+            
+            yield ids
+            if len(ids) < page_size:
+                return
+            last_id = ids[-1]
+    
+    @staticmethod
+    async def rebuild_drop_id_filter():
+        """Reload the Bloom filter of existing Drop IDs used by get_drop_id"""
+        bloom = drop_id_lookup_cache.start_rebuild()
         try:
-            response = db.table('drop_ids')\
-                .select('*')\
-                .eq('owner_id', owner_id)\
-                .order('created_at', desc=True)\
-                .execute()
-            
-            drop_ids = []
-            for drop_data in response.data:
-                drop_ids.append(DropID(
-                    id=drop_data['id'],
-                    owner_id=drop_data['owner_id'],
-                    is_active=drop_data['is_active'],
-                    is_single_use=drop_data['is_single_use'],
-                    expires_at=datetime.fromisoformat(drop_data['expires_at'].replace('Z', '+00:00')) if drop_data['expires_at'] else None,
-                    created_at=datetime.fromisoformat(drop_data['created_at'].replace('Z', '+00:00'))
-                ))
-            
-            return drop_ids
-            
+            async for ids in DropIDOperations.iter_drop_id_pages():
+                for drop_id in ids:
+                    bloom.add(drop_id)
         except Exception as e:
-            logger.error(f"Error getting user Drop IDs: {e}")
-            return []
-
+            drop_id_lookup_cache.abort_rebuild()
+            logger.error(f"Error rebuilding Drop ID filter: {e}")
+            return
+        
+        drop_id_lookup_cache.finish_rebuild(bloom)
+        logger.info(f"Drop ID filter rebuilt with {bloom.count} IDs")
+    
     @staticmethod
     async def disable_drop_id(drop_id: str, owner_id: int) -> bool:
         """Disable a Drop ID (verify ownership)"""
         try:
             # First verify ownership
-            response = db.table('drop_ids')\
+            response = await db.table('drop_ids')\
                 .select('*')\
                 .eq('id', drop_id)\
                 .eq('owner_id', owner_id)\
+                .is_('deleted_at', 'null')\
                 .execute()
             
             if not response.data or len(response.data) == 0:
                 return False
             
             # Disable the Drop ID
-            update_response = db.table('drop_ids')\
+            update_response = await db.table('drop_ids')\
                 .update({'is_active': False})\
                 .eq('id', drop_id)\
                 .eq('owner_id', owner_id)\
@@ -197,6 +271,8 @@ class DropIDOperations:
             
             return update_response.data is not None
             
+        except DatabaseUnavailableError:
+            raise
         except Exception as e:
             logger.error(f"Error disabling Drop ID: {e}")
             return False
@@ -206,10 +282,11 @@ class DropIDOperations:
         """Enable a Drop ID (verify ownership and check expiration)"""
         try:
             # First verify ownership and check if expired
-            response = db.table('drop_ids')\
+            response = await db.table('drop_ids')\
                 .select('*')\
                 .eq('id', drop_id)\
                 .eq('owner_id', owner_id)\
+                .is_('deleted_at', 'null')\
                 .execute()
             
             if not response.data or len(response.data) == 0:
@@ -225,7 +302,7 @@ class DropIDOperations:
                     return False  # Cannot enable expired Drop IDs
             
             # Enable the Drop ID
-            update_response = db.table('drop_ids')\
+            update_response = await db.table('drop_ids')\
                 .update({'is_active': True})\
                 .eq('id', drop_id)\
                 .eq('owner_id', owner_id)\
@@ -233,6 +310,8 @@ class DropIDOperations:
             
             return update_response.data is not None
             
+        except DatabaseUnavailableError:
+            raise
         except Exception as e:
             logger.error(f"Error enabling Drop ID: {e}")
             return False
@@ -241,32 +320,41 @@ class DropIDOperations:
     async def delete_drop_id(drop_id: str, owner_id: int) -> bool:
         """Delete a Drop ID and its associated inbox items (soft delete)"""
         try:
-            # First verify ownership
-            response = db.table('drop_ids')\
+            # First verify ownership. Deleting again must not reset deleted_at,
+            # which would keep pushing back tombstone compaction
+            response = await db.table('drop_ids')\
                 .select('*')\
                 .eq('id', drop_id)\
                 .eq('owner_id', owner_id)\
+                .is_('deleted_at', 'null')\
                 .execute()
             
             if not response.data or len(response.data) == 0:
                 return False
             
             # Soft delete the Drop ID
-            update_response = db.table('drop_ids')\
-                .update({'deleted_at': datetime.utcnow().isoformat()})\
+            deleted_at = datetime.utcnow().isoformat()
+            update_response = await db.table('drop_ids')\
+                .update({'deleted_at': deleted_at})\
                 .eq('id', drop_id)\
                 .eq('owner_id', owner_id)\
+                .is_('deleted_at', 'null')\
                 .execute()
             
-            # Also soft delete associated inbox items
+            drop_id_lookup_cache.record_deleted(drop_id)
+            
+            # Also soft delete associated inbox items (items deleted earlier keep their time)
             if update_response.data:
                 await db.table('inbox_items')\
-                    .update({'deleted_at': datetime.utcnow().isoformat()})\
+                    .update({'deleted_at': deleted_at})\
                     .eq('drop_id', drop_id)\
+                    .is_('deleted_at', 'null')\
                     .execute()
             
             return update_response.data is not None
             
+        except DatabaseUnavailableError:
+            raise
         except Exception as e:
             logger.error(f"Error deleting Drop ID: {e}")
             return False
@@ -276,7 +364,7 @@ class DropIDOperations:
         """Permanently delete a Drop ID and its associated inbox items"""
         try:
             # First verify ownership
-            response = db.table('drop_ids')\
+            response = await db.table('drop_ids')\
                 .select('*')\
                 .eq('id', drop_id)\
                 .eq('owner_id', owner_id)\
@@ -286,20 +374,23 @@ class DropIDOperations:
                 return False
             
             # Delete associated inbox items first (due to foreign key constraint)
-            delete_inbox_response = db.table('inbox_items')\
+            delete_inbox_response = await db.table('inbox_items')\
                 .delete()\
                 .eq('drop_id', drop_id)\
                 .execute()
             
             # Then delete the Drop ID
-            delete_response = db.table('drop_ids')\
+            delete_response = await db.table('drop_ids')\
                 .delete()\
                 .eq('id', drop_id)\
                 .eq('owner_id', owner_id)\
                 .execute()
             
+            drop_id_lookup_cache.record_deleted(drop_id)
             return delete_response.data is not None
             
+        except DatabaseUnavailableError:
+            raise
         except Exception as e:
             logger.error(f"Error permanently deleting Drop ID: {e}")
             return False
@@ -316,7 +407,7 @@ class DropIDOperations:
             if not include_deleted:
                 query = query.is_('deleted_at', 'null')
             
-            response = query.execute()
+            response = await query.execute()
             
             drop_ids = []
             for drop_data in response.data:
@@ -327,19 +418,107 @@ class DropIDOperations:
                     is_single_use=drop_data['is_single_use'],
                     expires_at=datetime.fromisoformat(drop_data['expires_at'].replace('Z', '+00:00')) if drop_data['expires_at'] else None,
                     created_at=datetime.fromisoformat(drop_data['created_at'].replace('Z', '+00:00')),
-                    deleted_at=datetime.fromisoformat(drop_data['deleted_at'].replace('Z', '+00:00')) if drop_data['deleted_at'] else None
+                    deleted_at=datetime.fromisoformat(drop_data['deleted_at'].replace('Z', '+00:00')) if drop_data['deleted_at'] else None,
+                    retention_days=drop_data.get('retention_days')
                 ))
             
             return drop_ids
             
+        except DatabaseUnavailableError:
+            raise
         except Exception as e:
             logger.error(f"Error getting user Drop IDs: {e}")
             return []
 
+    @staticmethod
+    async def set_retention_days(drop_id: str, owner_id: int, days: int = None) -> bool:
+        """Set how long a Drop ID's items are kept (None = owner's setting, 0 = forever)"""
+        try:
+            response = await db.table('drop_ids')\
+                .update({'retention_days': days})\
+                .eq('id', drop_id)\
+                .eq('owner_id', owner_id)\
+                .is_('deleted_at', 'null')\
+                .execute()
+            
+            return bool(response.data)
+            
+        except DatabaseUnavailableError:
+            raise
+        except Exception as e:
+            logger.error(f"Error setting Drop ID retention: {e}")
+            return False
+
+    @staticmethod
+    async def claim_single_use_drop_id(drop_id: str) -> bool:
+        """Disable a single-use Drop ID if it is still active; False if another send got it first"""
+        response = await db.table('drop_ids')\
+            .update({'is_active': False})\
+            .eq('id', drop_id)\
+            .eq('is_active', True)\
+            .is_('deleted_at', 'null')\
+            .execute()
+        return bool(response.data)
+
+    @staticmethod
+    async def release_single_use_drop_id(drop_id: str):
+        """Re-enable a claimed single-use Drop ID whose items could not be stored"""
+        await db.table('drop_ids')\
+            .update({'is_active': True})\
+            .eq('id', drop_id)\
+            .is_('deleted_at', 'null')\
+            .execute()
+
 class InboxOperations:
+    @staticmethod
+    async def insert_items(rows: list[dict]) -> list[dict]:
+        """Insert inbox rows, retrying transient failures without duplicating them
+        
+        Rows carrying an idempotency_key (unique in the table) that were already
+        stored, e.g. by an attempt whose response was lost, are fetched instead
+        of inserted again. Returns the stored rows in input order.
+        """
+        async def attempt() -> list[dict]:
+            try:
+                response = await db.table('inbox_items').insert(rows).execute()
+                return response.data or []
+            except Exception as e:
+                if not is_unique_violation(e, 'idempotency_key'):
+                    raise
+            
+            # Only keyed rows can have been stored already; rows without a key are always new
+            keys = [row['idempotency_key'] for row in rows if row.get('idempotency_key')]
+            response = await db.table('inbox_items').select('*').in_('idempotency_key', keys).execute()
+            stored = {row['idempotency_key']: row for row in response.data or []}
+            
+            missing = [row for row in rows if row.get('idempotency_key') not in stored]
+            inserted = []
+            if missing:
+                response = await db.table('inbox_items').insert(missing).execute()
+                inserted = response.data or []
+            
+            logger.info(f"Skipped {len(rows) - len(missing)} already stored inbox item(s)")
+            # Back in input order: existing rows by key, new rows in insert order
+            new_rows = iter(inserted)
+            result = [stored.get(row.get('idempotency_key')) or next(new_rows, None) for row in rows]
+            return [row for row in result if row is not None]
+        
+        if all(row.get('idempotency_key') for row in rows):
+            return await retry_with_backoff(attempt)
+        # Without keys a retry could store the same item twice
+        return await attempt()
+    
+    @staticmethod
+    async def insert_item(row: dict) -> list[dict]:
+        """Insert one inbox row, batched with concurrent inserts when the write buffer is enabled"""
+        if inbox_write_buffer is not None:
+            return [await inbox_write_buffer.submit(row)]
+        return await InboxOperations.insert_items([row])
+    
     @staticmethod
     async def add_inbox_item(drop_id: str, sender_anon_id: str, file_id: str = None, 
-                           file_type: str = None, message_text: str = None) -> InboxItem:
+                           file_type: str = None, message_text: str = None,
+                           idempotency_key: str = None) -> InboxItem:
         """Add an item to inbox"""
         try:
             item_data = {
@@ -348,13 +527,14 @@ class InboxOperations:
                 'file_id': file_id,
                 'file_type': file_type,
                 'message_text': message_text,
+                'idempotency_key': idempotency_key,
                 'created_at': datetime.utcnow().isoformat()
             }
             
-            response = db.table('inbox_items').insert(item_data).execute()
+            rows = await InboxOperations.insert_item(item_data)
             
-            if response.data and len(response.data) > 0:
-                item_data = response.data[0]
+            if rows:
+                item_data = rows[0]
                 return InboxItem(
                     id=item_data['id'],
                     drop_id=item_data['drop_id'],
@@ -372,22 +552,50 @@ class InboxOperations:
             raise
     
     @staticmethod
-    async def get_user_inbox(owner_id: int) -> list[InboxItem]:
-        """Get all inbox items for a user"""
+    async def _filtered_items_query(owner_id: int, drop_id: str = None, file_type: str = None,
+                                    since: datetime = None, until: datetime = None):
+        """Query over a user's non-deleted items matching the inbox filters (None if nothing can match)"""
+        # First get user's active Drop IDs
+        user_drop_ids = await DropIDOperations.get_user_drop_ids(owner_id)
+        drop_id_list = [drop.id for drop in user_drop_ids]
+        
+        if drop_id is not None:
+            # Only the owner's own Drop IDs can be filtered on
+            drop_id_list = [drop_id] if drop_id in drop_id_list else []
+        
+        if not drop_id_list:
+            return None
+        
+        # Filtered in the database
+        query = db.table('inbox_items').select('*').is_('deleted_at', 'null')
+        if len(drop_id_list) == 1:
+            query = query.eq('drop_id', drop_id_list[0])
+        else:
+            query = query.in_('drop_id', drop_id_list)
+        
+        if file_type == 'text':
+            query = query.is_('file_id', 'null')
+        elif file_type:
+            query = query.eq('file_type', file_type)
+        if since:
+            query = query.gte('created_at', since.isoformat())
+        if until:
+            query = query.lt('created_at', until.isoformat())
+        return query
+    
+    @staticmethod
+    async def get_user_inbox(owner_id: int, drop_id: str = None, file_type: str = None,
+                             since: datetime = None, until: datetime = None) -> list[InboxItem]:
+        """Get inbox items for a user, optionally only those matching the given filters
+        
+        `file_type` is a FileTypeDetector category, or 'text' for items without a file.
+        """
         try:
-            # First get user's active Drop IDs
-            user_drop_ids = await DropIDOperations.get_user_drop_ids(owner_id)
-            drop_id_list = [drop.id for drop in user_drop_ids]
-            
-            if not drop_id_list:
+            query = await InboxOperations._filtered_items_query(owner_id, drop_id, file_type, since, until)
+            if query is None:
                 return []
             
-            # Get inbox items for these Drop IDs
-            response = db.table('inbox_items')\
-                .select('*')\
-                .in_('drop_id', drop_id_list)\
-                .order('created_at', desc=True)\
-                .execute()
+            response = await query.order('created_at', desc=True).execute()
             
             inbox_items = []
             for item_data in response.data:
@@ -403,10 +611,154 @@ class InboxOperations:
             
             return inbox_items
             
+        except DatabaseUnavailableError:
+            raise
         except Exception as e:
             logger.error(f"Error getting user inbox: {e}")
             return []
     
+    @staticmethod
+    async def get_user_file_items(owner_id: int, limit: int = None, offset: int = 0,
+                                  drop_id: str = None, file_type: str = None,
+                                  since: datetime = None, until: datetime = None) -> list[InboxItem]:
+        """Get a user's file items (newest first), optionally one page of them and filtered like get_user_inbox"""
+        try:
+            query = await InboxOperations._filtered_items_query(owner_id, drop_id, file_type, since, until)
+            if query is None:
+                return []
+            
+            query = query\
+                .not_.is_('file_id', 'null')\
+                .order('created_at', desc=True)\
+                .order('id', desc=True)
+            
+            if limit:
+                query = query.range(offset, offset + limit - 1)
+            
+            response = await query.execute()
+            
+            return [
+                InboxItem(
+                    id=item_data['id'],
+                    drop_id=item_data['drop_id'],
+                    sender_anon_id=item_data['sender_anon_id'],
+                    file_id=item_data['file_id'],
+                    file_type=item_data['file_type'],
+                    message_text=item_data['message_text'],
+                    file_name=item_data.get('file_name'),
+                    file_size=item_data.get('file_size'),
+                    mime_type=item_data.get('mime_type'),
+                    created_at=datetime.fromisoformat(item_data['created_at'].replace('Z', '+00:00'))
+                )
+                for item_data in response.data
+            ]
+            
+        except DatabaseUnavailableError:
+            raise
+        except Exception as e:
+            logger.error(f"Error getting user file items: {e}")
+            return []
+    
+    @staticmethod
+    async def iter_inbox_pages(owner_id: int, page_size: int = 500):
+        """Yield all of a user's live inbox items page by page, oldest first (keyset pagination)"""
+        user_drop_ids = await DropIDOperations.get_user_drop_ids(owner_id)
+        drop_id_list = [drop.id for drop in user_drop_ids]
+        if not drop_id_list:
+            return
+        
+        last_id = None
+        while True:
+            query = db.table('inbox_items')\
+                .select('*')\
+                .in_('drop_id', drop_id_list)\
+                .is_('deleted_at', 'null')\
+                .order('id')\
+                .limit(page_size)
+            if last_id is not None:
+                query = query.gt('id', last_id)
+            
+            response = await query.execute()
+            rows = response.data or []
+            if not rows:
+                return
+            
+            yield [
+                InboxItem(
+                    id=item_data['id'],
+                    drop_id=item_data['drop_id'],
+                    sender_anon_id=item_data['sender_anon_id'],
+                    file_id=item_data['file_id'],
+                    file_type=item_data['file_type'],
+                    message_text=item_data['message_text'],
+                    file_name=item_data.get('file_name'),
+                    file_size=item_data.get('file_size'),
+                    mime_type=item_data.get('mime_type'),
+                    created_at=datetime.fromisoformat(item_data['created_at'].replace('Z', '+00:00'))
+                )
+                for item_data in rows
+            ]
+            if len(rows) < page_size:
+                return
+            last_id = rows[-1]['id']
+    
+    @staticmethod
+    async def search_inbox(owner_id: int, query: str, limit: int = 10, offset: int = 0) -> list[InboxItem]:
+        """One page of a user's items whose text or file name matches `query` (newest first)"""
+        try:
+            response = await db.rpc('search_inbox', {
+                'p_owner_id': owner_id,
+                'p_query': query,
+                'p_limit': limit,
+                'p_offset': offset
+            }).execute()
+            
+            return [
+                InboxItem(
+                    id=item_data['id'],
+                    drop_id=item_data['drop_id'],
+                    sender_anon_id=item_data['sender_anon_id'],
+                    file_id=item_data['file_id'],
+                    file_type=item_data['file_type'],
+                    message_text=item_data['message_text'],
+                    file_name=item_data.get('file_name'),
+                    file_size=item_data.get('file_size'),
+                    mime_type=item_data.get('mime_type'),
+                    created_at=datetime.fromisoformat(item_data['created_at'].replace('Z', '+00:00'))
+                )
+                for item_data in response.data or []
+            ]
+            
+        except Exception as e:
+            logger.error(f"Error searching inbox: {e}")
+            raise
+    
+    @staticmethod
+    async def get_owner_stats(owner_id: int) -> InboxStats:
+        """Inbox counters of a user (one row, maintained by database triggers)"""
+        try:
+            response = await db.table('owner_inbox_stats').select('*').eq('owner_id', owner_id).execute()
+            return InboxStats.from_row(response.data[0]) if response.data else InboxStats()
+            
+        except DatabaseUnavailableError:
+            raise
+        except Exception as e:
+            logger.error(f"Error getting inbox stats: {e}")
+            return None
+    
+    @staticmethod
+    async def get_drop_id_stats(owner_id: int) -> dict[str, InboxStats]:
+        """Inbox counters of each of a user's Drop IDs (Drop IDs without items are omitted)"""
+        try:
+            response = await db.table('drop_id_stats').select('*').eq('owner_id', owner_id).execute()
+            return {row['drop_id']: InboxStats.from_row(row) for row in response.data or []}
+            
+        except DatabaseUnavailableError:
+            raise
+        except Exception as e:
+            logger.error(f"Error getting Drop ID stats: {e}")
+            return {}
+    
     @staticmethod
     async def clear_user_inbox(owner_id: int):
         """Clear all inbox items for a user"""
@@ -430,7 +782,7 @@ class InboxOperations:
     async def add_file_item(drop_id: str, sender_anon_id: str, file_id: str, 
                         file_type: str, file_name: str = None, 
                         file_size: int = None, mime_type: str = None,
-                        message_text: str = None) -> InboxItem:
+                        message_text: str = None, idempotency_key: str = None) -> InboxItem:
         """Add a file item to inbox with metadata"""
         try:
             item_data = {
@@ -442,13 +794,14 @@ class InboxOperations:
                 'file_size': file_size,
                 'mime_type': mime_type,
                 'message_text': message_text,
+                'idempotency_key': idempotency_key,
                 'created_at': datetime.utcnow().isoformat()
             }
             
-            response = db.table('inbox_items').insert(item_data).execute()
+            rows = await InboxOperations.insert_item(item_data)
             
-            if response.data and len(response.data) > 0:
-                item_data = response.data[0]
+            if rows:
+                item_data = rows[0]
                 return InboxItem(
                     id=item_data['id'],
                     drop_id=item_data['drop_id'],
@@ -466,4 +819,60 @@ class InboxOperations:
                 
         except Exception as e:
             logger.error(f"Error adding file item: {e}")
-            raise
\ No newline at end of file
+            raise
+
+    @staticmethod
+    async def add_file_items(drop_id: str, sender_anon_id: str, files: list[dict]) -> list[InboxItem]:
+        """Add several file items to inbox with a single insert"""
+        try:
+            if not files:
+                return []
+            
+            created_at = datetime.utcnow().isoformat()
+            rows = [
+                {
+                    'drop_id': drop_id,
+                    'sender_anon_id': sender_anon_id,
+                    'file_id': file_info['file_id'],
+                    'file_type': file_info['file_type'],
+                    'file_name': file_info.get('file_name'),
+                    'file_size': file_info.get('file_size'),
+                    'mime_type': file_info.get('mime_type'),
+                    'message_text': file_info.get('message_text'),
+                    'idempotency_key': file_info.get('idempotency_key'),
+                    'created_at': created_at
+                }
+                for file_info in files
+            ]
+            
+            inserted = await InboxOperations.insert_items(rows)
+            
+            if len(inserted) != len(rows):
+                raise Exception("Failed to add file items")
+            
+            return [
+                InboxItem(
+                    id=item_data['id'],
+                    drop_id=item_data['drop_id'],
+                    sender_anon_id=item_data['sender_anon_id'],
+                    file_id=item_data['file_id'],
+                    file_type=item_data['file_type'],
+                    message_text=item_data['message_text'],
+                    file_name=item_data['file_name'],
+                    file_size=item_data['file_size'],
+                    mime_type=item_data['mime_type'],
+                    created_at=datetime.fromisoformat(item_data['created_at'].replace('Z', '+00:00'))
+                )
+                for item_data in inserted
+            ]
+                
+        except Exception as e:
+            logger.error(f"Error adding file items: {e}")
+            raise
+
+# Optional write-behind batching of single inbox inserts (flushed on shutdown)
+inbox_write_buffer = InboxWriteBuffer(
+    InboxOperations.insert_items,
+    window=config.INBOX_WRITE_BUFFER_WINDOW_MS / 1000,
+    max_batch=config.INBOX_WRITE_BUFFER_MAX_BATCH
+) if config.INBOX_WRITE_BUFFER_ENABLED else None
@@ -0,0 +1,47 @@
+import asyncio
+import logging
+import random
+from typing import Awaitable, Callable, TypeVar
+
+import httpx
+from postgrest.exceptions import APIError
+
+from config import config
+from .errors import DatabaseUnavailableError
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# SQLSTATEs worth retrying: serialization failure, deadlock, too many
+# connections, admin shutdown / crash recovery, cannot connect now
+TRANSIENT_SQLSTATES = {'40001', '40P01', '53300', '57P01', '57P02', '57P03'}
+
+def is_transient_error(error: Exception) -> bool:
+    """Check if an error may succeed when the same call is repeated"""
+    if isinstance(error, DatabaseUnavailableError):
+        # The circuit breaker already decided; retrying would only add load
+        return False
+    if isinstance(error, APIError):
+        return getattr(error, 'code', None) in TRANSIENT_SQLSTATES
+    return isinstance(error, (asyncio.TimeoutError, ConnectionError, httpx.TransportError))
+
+async def retry_with_backoff(operation: Callable[[], Awaitable[T]], attempts: int = None,
+                             base_delay: float = None, max_delay: float = 2.0,
+                             retry_on: Callable[[Exception], bool] = is_transient_error) -> T:
+    """Run `operation`, retrying transient failures with exponential backoff and full jitter
+
+    Only use this for idempotent operations (e.g. inserts guarded by a unique key).
+    """
+    attempts = attempts or config.DB_RETRY_ATTEMPTS
+    base_delay = config.DB_RETRY_BASE_DELAY if base_delay is None else base_delay
+
+    for attempt in range(1, attempts + 1):
+        try:
+            return await operation()
+        except Exception as e:
+            if attempt == attempts or not retry_on(e):
+                raise
+            delay = random.uniform(0, min(max_delay, base_delay * 2 ** (attempt - 1)))
+            logger.warning(f"Transient database error (attempt {attempt}/{attempts}), retrying in {delay:.2f}s: {e}")
+            await asyncio.sleep(delay)
@@ -0,0 +1,111 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class InboxWriteBuffer:
+    """Write-behind buffer that coalesces single-row inserts into multi-row inserts
+
+    Rows submitted within `window` seconds of the first pending row (or until
+    `max_batch` rows are pending) are written with one `insert_rows` call.
+    Each submitter gets its own stored row back. If the batch insert fails,
+    the rows are retried one by one so a bad row only fails its own caller.
+    """
+
+    def __init__(self, insert_rows: Callable[[List[dict]], Awaitable[List[dict]]],
+                 window: float = 0.005, max_batch: int = 100):
+        self.insert_rows = insert_rows
+        self.window = window
+        self.max_batch = max_batch
+        self._pending: List[Tuple[dict, asyncio.Future]] = []
+        self._timer: Optional[asyncio.Task] = None
+        self._flushes: set = set()
+        self._closed = False
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    async def submit(self, row: dict) -> dict:
+        """Queue a row and wait until it is stored; returns the stored row"""
+        if self._closed:
+            rows = await self.insert_rows([row])
+            return rows[0]
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((row, future))
+
+        if len(self._pending) >= self.max_batch:
+            self._start_flush()
+        elif self._timer is None:
+            self._timer = asyncio.create_task(self._flush_later())
+
+        return await future
+
+    async def flush(self):
+        """Write everything pending now and wait for in-flight batches"""
+        self._start_flush()
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+
+    async def close(self):
+        """Flush and write any later rows directly (used on shutdown)"""
+        self._closed = True
+        await self.flush()
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.window)
+        self._timer = None
+        self._start_flush()
+
+    def _start_flush(self):
+        if self._timer and self._timer is not asyncio.current_task():
+            self._timer.cancel()
+        self._timer = None
+
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        task = asyncio.create_task(self._write(batch))
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _write(self, batch: List[Tuple[dict, asyncio.Future]]):
+        # A multi-row insert needs the same columns in every row
+        columns = {}
+        for row, _ in batch:
+            columns.update(dict.fromkeys(row))
+        rows = [{column: row.get(column) for column in columns} for row, _ in batch]
+
+        try:
+            stored = await self.insert_rows(rows)
+            if len(stored) != len(rows):
+                raise Exception(f"Batch insert returned {len(stored)} of {len(rows)} rows")
+        except Exception as e:
+            if len(batch) == 1:
+                self._resolve(batch[0][1], error=e)
+                return
+            logger.warning(f"Batch insert of {len(batch)} inbox rows failed, writing them one by one: {e}")
+            await asyncio.gather(*(self._write_one(row, future) for row, future in batch))
+            return
+
+        logger.debug(f"Wrote {len(rows)} inbox row(s) in one insert")
+        for (_, future), stored_row in zip(batch, stored):
+            self._resolve(future, result=stored_row)
+
+    async def _write_one(self, row: dict, future: asyncio.Future):
+        try:
+            stored = await self.insert_rows([row])
+            self._resolve(future, result=stored[0])
+        except Exception as e:
+            self._resolve(future, error=e)
+
+    @staticmethod
+    def _resolve(future: asyncio.Future, result: dict = None, error: Exception = None):
+        # The submitter may have been cancelled while its row was being written
+        if future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
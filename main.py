@@ -1,73 +1,222 @@
 import asyncio
+import hashlib
+import json
 import logging
+import time
+from pathlib import Path
 from aiogram import Bot, Dispatcher
 from aiogram.types import BotCommand
 from config import config
 from database.connection import db
+from database.maintenance import compact_tombstones, purge_expired_inbox_items
+from database.operations import DropIDOperations, inbox_write_buffer
 from bot.handlers.start import start_router
 from bot.handlers.dropid import dropid_router
 from bot.handlers.inbox import inbox_router
-from bot.handlers.send import send_router
+from bot.handlers.send import send_router, drop_notifier, media_groups, send_sessions
 from bot.handlers.management import management_router
+from bot.handlers.search import search_router
+from bot.handlers.export import export_router
 from bot.handlers.fallback import fallback_router
+from bot.middleware import (
+    ThrottlingMiddleware, MemoryThrottleStorage, RedisThrottleStorage, ServiceBusyMiddleware, InFlightMiddleware
+)
+from utils.shutdown import ShutdownCoordinator
+from utils.tasks import run_periodically
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
-async def setup_bot_commands(bot: Bot):
-    """Set up bot commands menu"""
-    commands = [
-        BotCommand(command="start", description="Start the bot"),
-        BotCommand(command="create_id", description="Create a new Drop ID"),
-        BotCommand(command="send", description="Send message to Drop ID"),
-        BotCommand(command="inbox", description="Check your inbox"),
-        BotCommand(command="disable_id", description="Disable your Drop ID"),
-        BotCommand(command="enable_id", description="Enable your Drop ID"),
-        BotCommand(command="delete_id", description="Delete Drop ID permanently"),
-        BotCommand(command="my_ids", description="View all your Drop IDs"), 
-    ]
-    await bot.set_my_commands(commands)
+BOT_COMMANDS = [
+    BotCommand(command="start", description="Start the bot"),
+    BotCommand(command="create_id", description="Create a new Drop ID"),
+    BotCommand(command="send", description="Send message to Drop ID"),
+    BotCommand(command="inbox", description="Check your inbox"),
+    BotCommand(command="search", description="Search your inbox"),
+    BotCommand(command="export", description="Download your inbox as a ZIP"),
+    BotCommand(command="disable_id", description="Disable your Drop ID"),
+    BotCommand(command="enable_id", description="Enable your Drop ID"),
+    BotCommand(command="delete_id", description="Delete Drop ID permanently"),
+    BotCommand(command="my_ids", description="View all your Drop IDs"), 
+    BotCommand(command="retention", description="Set how long items are kept"),
+]
 
-async def main():
-    """Main function to start the bot"""
+def commands_hash(bot: Bot, commands: list[BotCommand]) -> str:
+    """Fingerprint of the command menu for this bot"""
+    payload = json.dumps([command.model_dump() for command in commands], sort_keys=True)
+    return hashlib.sha256(f"{bot.id}:{payload}".encode()).hexdigest()
+
+async def setup_bot_commands(bot: Bot, cache_file: str = None) -> bool:
+    """Set up bot commands menu; skipped when unchanged since the last run"""
+    cache_path = Path(cache_file or config.BOT_COMMANDS_CACHE_FILE)
+    digest = commands_hash(bot, BOT_COMMANDS)
+    
     try:
-        # Validate environment variables
-        config.validate()
-        logger.info("✅ Environment variables validated")
-    except ValueError as e:
-        logger.error(f"❌ Configuration error: {e}")
-        return
+        if cache_path.read_text().strip() == digest:
+            logger.info("Bot commands unchanged - skipping set_my_commands")
+            return False
+    except OSError:
+        pass
     
-    # Initialize bot and dispatcher
-    bot = Bot(token=config.BOT_TOKEN)
+    await bot.set_my_commands(BOT_COMMANDS)
+    
+    try:
+        cache_path.write_text(digest)
+    except OSError as e:
+        logger.warning(f"Could not cache bot commands hash: {e}")
+    return True
+
+async def connect_database():
+    """Connect to Supabase if configured"""
+    if config.SUPABASE_URL and config.SUPABASE_KEY:
+        await db.connect()
+    else:
+        logger.warning("⚠️  Supabase credentials not configured - database features disabled")
+
+async def timed(name: str, coro, timings: dict):
+    """Await `coro`, recording its duration in `timings`"""
+    start = time.perf_counter()
+    try:
+        return await coro
+    finally:
+        timings[name] = time.perf_counter() - start
+
+def create_throttling_middleware() -> ThrottlingMiddleware:
+    """Build the throttling middleware, sharing buckets through Redis when configured"""
+    if config.REDIS_URL:
+        storage = RedisThrottleStorage.from_url(config.REDIS_URL)
+    else:
+        storage = MemoryThrottleStorage()
+
+    return ThrottlingMiddleware(
+        storage=storage,
+        rate=config.THROTTLE_RATE,
+        burst=config.THROTTLE_BURST,
+        command_limits=config.THROTTLE_COMMAND_LIMITS,
+        mode=config.THROTTLE_MODE,
+        max_delay=config.THROTTLE_MAX_DELAY
+    )
+
+def create_dispatcher(throttling: ThrottlingMiddleware = None, in_flight: InFlightMiddleware = None) -> Dispatcher:
+    """Build the dispatcher with all routers (routers can only be attached once per process)"""
     dp = Dispatcher()
+
+    # Outermost, so shutdown waits for every update that got past polling
+    if in_flight:
+        dp.update.outer_middleware(in_flight)
+
+    # Throttle floods before they reach handlers (and the database)
+    if throttling:
+        dp.message.outer_middleware(throttling)
+        dp.callback_query.outer_middleware(throttling)
+    
+    # Answer "busy" immediately instead of waiting on a database that is down
+    service_busy = ServiceBusyMiddleware(db.breaker)
+    dp.message.outer_middleware(service_busy)
+    dp.callback_query.outer_middleware(service_busy)
     
     # Include routers
     dp.include_router(start_router)
     dp.include_router(inbox_router)
     dp.include_router(dropid_router)
     dp.include_router(management_router)
+    dp.include_router(search_router)
+    dp.include_router(export_router)
     dp.include_router(send_router)
     dp.include_router(fallback_router)
+    return dp
 
-    # Set up bot commands
-    await setup_bot_commands(bot)
+def create_shutdown_coordinator(in_flight: InFlightMiddleware) -> ShutdownCoordinator:
+    """Shutdown steps in dependency order: handlers queue work that the later steps flush"""
+    shutdown = ShutdownCoordinator(timeout=config.SHUTDOWN_TIMEOUT)
+    shutdown.add_step("handlers", in_flight.drain, pending=lambda: in_flight.in_flight)
+    # Albums and open /send sessions turn into inbox inserts and notifications
+    shutdown.add_step("media_groups", media_groups.flush_all, pending=lambda: len(media_groups))
+    shutdown.add_step("send_sessions", send_sessions.close_all, pending=lambda: len(send_sessions))
+    if inbox_write_buffer is not None:
+        shutdown.add_step("inbox_writes", inbox_write_buffer.close, pending=lambda: len(inbox_write_buffer))
+    # Deliver pending digests while the bot session is still open
+    shutdown.add_step("notifications", drop_notifier.flush_all, pending=lambda: len(drop_notifier))
+    return shutdown
+
+async def main():
+    """Main function to start the bot"""
+    startup_started = time.perf_counter()
+    timings = {}
+    
+    try:
+        # Validate environment variables
+        config.validate()
+        logger.info("✅ Environment variables validated")
+    except ValueError as e:
+        logger.error(f"❌ Configuration error: {e}")
+        return
+    
+    # Initialize bot and dispatcher
+    bot = Bot(token=config.BOT_TOKEN)
+    in_flight = InFlightMiddleware()
+    dp = create_dispatcher(throttling=create_throttling_middleware(), in_flight=in_flight)
+    timings["setup"] = time.perf_counter() - startup_started
     
+    background_tasks = []
     try:
-        # Connect to Supabase
-        if config.SUPABASE_URL and config.SUPABASE_KEY:
-            await db.connect()
-        else:
-            logger.warning("⚠️  Supabase credentials not configured - database features disabled")
+        # Command menu and database are independent - run them concurrently
+        commands_result, database_result = await asyncio.gather(
+            timed("commands", setup_bot_commands(bot), timings),
+            timed("database", connect_database(), timings),
+            return_exceptions=True
+        )
+        # A stale command menu is not worth refusing to start over
+        if isinstance(commands_result, Exception):
+            logger.warning(f"⚠️  Failed to set bot commands: {commands_result}")
+        if isinstance(database_result, Exception):
+            raise database_result
+        
+        if db.is_connected and config.DROP_ID_BLOOM_ENABLED:
+            background_tasks.append(run_periodically(
+                DropIDOperations.rebuild_drop_id_filter,
+                config.DROP_ID_BLOOM_REBUILD_INTERVAL,
+                name="drop_id_filter_rebuild"
+            ))
+        
+        if db.is_connected:
+            background_tasks.append(run_periodically(
+                purge_expired_inbox_items,
+                config.PURGE_INTERVAL,
+                name="inbox_retention_purge",
+                run_immediately=False
+            ))
+            background_tasks.append(run_periodically(
+                compact_tombstones,
+                config.COMPACTION_INTERVAL,
+                name="tombstone_compaction",
+                run_immediately=False
+            ))
+        
+        breakdown = ", ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in timings.items())
+        logger.info(f"🚀 Startup took {(time.perf_counter() - startup_started) * 1000:.0f} ms ({breakdown})")
         
-        # Start polling
+        # Start polling; returns on SIGTERM/SIGINT once no new updates are fetched.
+        # The session stays open so in-flight handlers can still reply
         logger.info("🤖 Bot is starting...")
-        await dp.start_polling(bot)
+        await dp.start_polling(bot, close_bot_session=False)
     except Exception as e:
         logger.error(f"❌ Bot stopped with error: {e}")
     finally:
-        await bot.session.close()
+        logger.info(
+            f"🛑 Shutting down: {in_flight.in_flight} handler(s) running, "
+            f"{len(send_sessions)} send session(s) open"
+        )
+        for task in background_tasks:
+            task.cancel()
+        try:
+            await create_shutdown_coordinator(in_flight).shutdown()
+        finally:
+            # A cancelled purge may still be finishing its current batch
+            await asyncio.gather(*background_tasks, return_exceptions=True)
+            await bot.session.close()
+            await db.disconnect()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,48 @@
+import asyncio
+import inspect
+
+import pytest
+from aiogram import Bot
+
+import bot.handlers.send as send
+import database.operations as operations
+from database.connection import db
+from database.drop_id_cache import DropIDLookupCache
+from tests.fakes import FakeSupabaseClient, MockedSession
+from utils.cache import TTLCache
+from utils.notifications import DropNotifier
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_pyfunc_call(pyfuncitem):
+    """Run `async def` tests in a fresh event loop (no pytest-asyncio needed)"""
+    if not inspect.iscoroutinefunction(pyfuncitem.obj):
+        return None
+
+    arguments = {name: pyfuncitem.funcargs[name] for name in pyfuncitem._fixtureinfo.argnames}
+    asyncio.run(pyfuncitem.obj(**arguments))
+    return True
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    """Point the global database at an empty in-memory Supabase fake"""
+    client = FakeSupabaseClient()
+    monkeypatch.setattr(db, "client", client)
+    monkeypatch.setattr(db, "is_connected", True)
+
+    # Per-process caches must not leak between tests
+    monkeypatch.setattr(operations, "drop_id_lookup_cache", DropIDLookupCache())
+    monkeypatch.setattr(operations, "known_users", TTLCache(maxsize=1000, ttl=3600))
+    monkeypatch.setattr(operations, "pin_hash_cache", TTLCache(maxsize=1000, ttl=3600))
+    monkeypatch.setattr(send, "drop_notifier", DropNotifier(window=60))
+    return client
+
+@pytest.fixture
+def bot():
+    """Bot whose API calls are recorded by a MockedSession"""
+    return Bot(token="123456:TEST-token", session=MockedSession())
+
+@pytest.fixture(scope="session")
+def dispatcher():
+    """The bot's dispatcher with every router, as built by main.py"""
+    from main import create_dispatcher
+    return create_dispatcher()
@@ -0,0 +1,501 @@
+"""In-memory stand-ins for Supabase and the Telegram Bot API.
+
+FakeSupabaseClient implements the part of the supabase-py query builder
+used by database/operations.py, so the operations and handlers can run
+without a network connection.
+"""
+import copy
+import itertools
+import re
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List
+
+from aiogram.client.session.base import BaseSession
+from aiogram.methods import GetMe, SendMediaGroup, SendMessage, TelegramMethod
+from aiogram.types import CallbackQuery, Chat, Message, Update, User
+from postgrest.exceptions import APIError
+
+# Columns returned by the search_inbox function
+SEARCH_INBOX_COLUMNS = (
+    'id', 'drop_id', 'sender_anon_id', 'file_id', 'file_type', 'message_text',
+    'file_name', 'file_size', 'mime_type', 'created_at',
+)
+
+# Primary key and column defaults of the tables in database/migrations
+TABLES = {
+    'users': {
+        'primary_key': 'telegram_id',
+        'defaults': {'pin_hash': None, 'retention_days': None},
+    },
+    'drop_ids': {
+        'primary_key': 'id',
+        'defaults': {
+            'is_active': True, 'is_single_use': False,
+            'expires_at': None, 'deleted_at': None, 'retention_days': None,
+        },
+    },
+    'inbox_items': {
+        'primary_key': 'id',
+        'serial': True,
+        'unique': {'idempotency_key': 'idx_inbox_items_idempotency_key'},
+        'defaults': {
+            'file_id': None, 'file_type': None, 'message_text': None,
+            'is_encrypted': False, 'file_name': None, 'file_size': None,
+            'mime_type': None, 'deleted_at': None, 'idempotency_key': None,
+        },
+    },
+    'drop_id_stats': {
+        'primary_key': 'drop_id',
+        'defaults': {'item_count': 0, 'file_count': 0, 'total_bytes': 0, 'last_received_at': None},
+    },
+    'owner_inbox_stats': {
+        'primary_key': 'owner_id',
+        'defaults': {'item_count': 0, 'file_count': 0, 'total_bytes': 0, 'last_received_at': None},
+    },
+}
+
+class FakeResponse:
+    def __init__(self, data: List[dict], count: int = None):
+        self.data = data
+        self.count = count
+
+class FakeQuery:
+    """Chainable query mirroring postgrest's request builders"""
+
+    def __init__(self, client: "FakeSupabaseClient", table: str):
+        self.client = client
+        self.table_name = table
+        self.action = 'select'
+        self.columns = '*'
+        self.count = None
+        self.payload = None
+        self.on_conflict = None
+        self.ignore_duplicates = False
+        self.filters: List[Callable[[dict], bool]] = []
+        self.orders: List[tuple] = []
+        self.row_limit = None
+        self.row_offset = 0
+        self._negate_next = False
+
+    # Actions
+
+    def select(self, columns: str = '*', count: str = None) -> "FakeQuery":
+        self.columns = columns
+        self.count = count
+        return self
+
+    def insert(self, data) -> "FakeQuery":
+        self.action = 'insert'
+        self.payload = data
+        return self
+
+    def upsert(self, data, on_conflict: str = None, ignore_duplicates: bool = False) -> "FakeQuery":
+        self.action = 'upsert'
+        self.payload = data
+        self.on_conflict = on_conflict
+        self.ignore_duplicates = ignore_duplicates
+        return self
+
+    def update(self, data: dict) -> "FakeQuery":
+        self.action = 'update'
+        self.payload = data
+        return self
+
+    def delete(self) -> "FakeQuery":
+        self.action = 'delete'
+        return self
+
+    # Filters
+
+    @property
+    def not_(self) -> "FakeQuery":
+        self._negate_next = True
+        return self
+
+    def _filter(self, predicate: Callable[[dict], bool]) -> "FakeQuery":
+        if self._negate_next:
+            self._negate_next = False
+            self.filters.append(lambda row: not predicate(row))
+        else:
+            self.filters.append(predicate)
+        return self
+
+    def eq(self, column: str, value: Any) -> "FakeQuery":
+        return self._filter(lambda row: row.get(column) == value)
+
+    def neq(self, column: str, value: Any) -> "FakeQuery":
+        return self._filter(lambda row: row.get(column) != value)
+
+    def gt(self, column: str, value: Any) -> "FakeQuery":
+        return self._filter(lambda row: row.get(column) is not None and row[column] > value)
+
+    def gte(self, column: str, value: Any) -> "FakeQuery":
+        return self._filter(lambda row: row.get(column) is not None and row[column] >= value)
+
+    def lt(self, column: str, value: Any) -> "FakeQuery":
+        return self._filter(lambda row: row.get(column) is not None and row[column] < value)
+
+    def lte(self, column: str, value: Any) -> "FakeQuery":
+        return self._filter(lambda row: row.get(column) is not None and row[column] <= value)
+
+    def in_(self, column: str, values) -> "FakeQuery":
+        values = list(values)
+        return self._filter(lambda row: row.get(column) in values)
+
+    def is_(self, column: str, value) -> "FakeQuery":
+        if value in ('null', None):
+            return self._filter(lambda row: row.get(column) is None)
+        expected = {'true': True, 'false': False}.get(str(value).lower(), value)
+        return self._filter(lambda row: row.get(column) is expected)
+
+    # Modifiers
+
+    def order(self, column: str, desc: bool = False) -> "FakeQuery":
+        self.orders.append((column, desc))
+        return self
+
+    def limit(self, size: int) -> "FakeQuery":
+        self.row_limit = size
+        return self
+
+    def range(self, start: int, end: int) -> "FakeQuery":
+        self.row_offset = start
+        self.row_limit = end - start + 1
+        return self
+
+    def execute(self) -> FakeResponse:
+        return self.client._execute(self)
+
+class FakeRpc:
+    """Pending call of a Postgres function emulated by the fake client"""
+
+    def __init__(self, client: "FakeSupabaseClient", function_name: str, params: dict):
+        self.client = client
+        self.function_name = function_name
+        self.params = params
+        self.action = 'rpc'
+
+    def execute(self) -> FakeResponse:
+        return self.client._execute(self)
+
+class FakeSupabaseClient:
+    """Minimal in-memory Supabase client
+
+    `latency` seconds are slept (blocking, like the real sync client) on
+    every execute() to simulate a remote database.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.tables: Dict[str, List[dict]] = {name: [] for name in TABLES}
+        self.queries: List[FakeQuery] = []
+        self._serials = {name: itertools.count(1) for name in TABLES}
+
+    def table(self, name: str) -> FakeQuery:
+        return FakeQuery(self, name)
+
+    def rpc(self, function_name: str, params: dict = None) -> FakeRpc:
+        return FakeRpc(self, function_name, params or {})
+
+    def rows(self, table: str) -> List[dict]:
+        """Direct access to stored rows (for assertions)"""
+        return self.tables.setdefault(table, [])
+
+    def _execute(self, query: FakeQuery) -> FakeResponse:
+        if self.latency:
+            time.sleep(self.latency)
+        self.queries.append(query)
+
+        handler = getattr(self, f"_run_{query.action}")
+        return handler(query)
+
+    def _run_rpc(self, call: FakeRpc) -> FakeResponse:
+        function = getattr(self, f"_function_{call.function_name}", None)
+        if function is None:
+            raise APIError({'code': '42883', 'message': f"function {call.function_name} does not exist"})
+        return FakeResponse(function(**call.params))
+
+    def _function_search_inbox(self, p_owner_id: int, p_query: str, p_limit: int = 10,
+                               p_offset: int = 0) -> List[dict]:
+        # Whole-word match first, substring fallback (the trigram path) if no word matches
+        owned = {row['id'] for row in self.rows('drop_ids') if row['owner_id'] == p_owner_id}
+        items = [
+            (row, f"{row.get('message_text') or ''} {row.get('file_name') or ''}".lower())
+            for row in self.rows('inbox_items')
+            if row['drop_id'] in owned and row.get('deleted_at') is None
+        ]
+        words = re.findall(r"\w+", p_query.lower())
+        matches = [row for row, text in items
+                   if words and set(words) <= set(re.findall(r"\w+", text))]
+        if not matches:
+            matches = [row for row, text in items if p_query.lower() in text]
+
+        matches.sort(key=lambda row: (row['created_at'], row['id']), reverse=True)
+        return [{column: row.get(column) for column in SEARCH_INBOX_COLUMNS}
+                for row in copy.deepcopy(matches[p_offset:p_offset + p_limit])]
+
+    def _function_purge_expired_inbox_items(self, p_default_days: int, p_batch_size: int) -> int:
+        users = {row['telegram_id']: row for row in self.rows('users')}
+        drops = {row['id']: row for row in self.rows('drop_ids')}
+        now = datetime.utcnow()
+
+        def expired(item: dict) -> bool:
+            drop = drops[item['drop_id']]
+            user = users.get(drop['owner_id'], {})
+            days = next((d for d in (drop.get('retention_days'), user.get('retention_days'), p_default_days)
+                         if d is not None), 0)
+            return days > 0 and datetime.fromisoformat(item['created_at']) < now - timedelta(days=days)
+
+        batch = sorted(filter(expired, self.rows('inbox_items')), key=lambda item: item['created_at'])
+        batch = batch[:p_batch_size]
+        self._remove_rows('inbox_items', batch)
+        return len(batch)
+
+    def _function_compact_tombstones(self, p_grace_days: int, p_batch_size: int) -> int:
+        cutoff = datetime.utcnow() - timedelta(days=p_grace_days)
+
+        def tombstone(row: dict) -> bool:
+            return row.get('deleted_at') is not None and datetime.fromisoformat(row['deleted_at']) < cutoff
+
+        items = sorted(filter(tombstone, self.rows('inbox_items')), key=lambda row: row['deleted_at'])
+        items = items[:p_batch_size]
+        self._remove_rows('inbox_items', items)
+
+        drop_ids = []
+        if len(items) < p_batch_size:
+            live_drop_ids = {row['drop_id'] for row in self.rows('inbox_items')}
+            drop_ids = sorted((row for row in self.rows('drop_ids')
+                               if tombstone(row) and row['id'] not in live_drop_ids),
+                              key=lambda row: row['deleted_at'])[:p_batch_size - len(items)]
+            self._remove_rows('drop_ids', drop_ids)
+        return len(items) + len(drop_ids)
+
+    def _remove_rows(self, table: str, rows: List[dict]):
+        ids = {id(row) for row in rows}
+        self.tables[table] = [row for row in self.rows(table) if id(row) not in ids]
+        for row in rows:
+            self._changed(table, row, None)
+
+    def _matching(self, query: FakeQuery) -> List[dict]:
+        return [row for row in self.rows(query.table_name) if all(f(row) for f in query.filters)]
+
+    def _run_select(self, query: FakeQuery) -> FakeResponse:
+        rows = self._matching(query)
+        total = len(rows)
+
+        for column, desc in reversed(query.orders):
+            rows.sort(key=lambda row: (row.get(column) is None, row.get(column)), reverse=desc)
+
+        rows = rows[query.row_offset:]
+        if query.row_limit is not None:
+            rows = rows[:query.row_limit]
+
+        return FakeResponse([self._project(row, query.columns) for row in rows],
+                            count=total if query.count else None)
+
+    @staticmethod
+    def _project(row: dict, columns: str) -> dict:
+        if columns.strip() == '*':
+            return copy.deepcopy(row)
+        names = [name.strip() for name in columns.split(',')]
+        return {name: copy.deepcopy(row.get(name)) for name in names if name in row}
+
+    def _new_row(self, table: str, data: dict) -> dict:
+        schema = TABLES.get(table, {})
+        row = dict(schema.get('defaults', {}))
+        row.setdefault('created_at', datetime.utcnow().isoformat())
+        row.update(data)
+
+        key = schema.get('primary_key')
+        if schema.get('serial') and row.get(key) is None:
+            row[key] = next(self._serials[table])
+        return row
+
+    def _check_unique(self, table: str, row: dict, staged: List[dict] = ()):
+        schema = TABLES.get(table, {})
+        constraints = dict(schema.get('unique', {}))
+        if schema.get('primary_key'):
+            constraints[schema['primary_key']] = f"{table}_pkey"
+
+        for column, constraint in constraints.items():
+            # NULLs never conflict, like in Postgres
+            if row.get(column) is None:
+                continue
+            if any(other.get(column) == row[column] for other in itertools.chain(self.rows(table), staged)):
+                raise APIError({
+                    'code': '23505',
+                    'message': f'duplicate key value violates unique constraint "{constraint}"',
+                    'details': f'Key ({column})=({row[column]}) already exists.',
+                })
+
+    def _run_insert(self, query: FakeQuery) -> FakeResponse:
+        payload = query.payload if isinstance(query.payload, list) else [query.payload]
+
+        # Validate the whole statement before storing anything, like one INSERT would
+        staged = []
+        for data in payload:
+            row = self._new_row(query.table_name, data)
+            self._check_unique(query.table_name, row, staged)
+            staged.append(row)
+
+        self.rows(query.table_name).extend(staged)
+        for row in staged:
+            self._changed(query.table_name, None, row)
+        return FakeResponse(copy.deepcopy(staged))
+
+    def _run_upsert(self, query: FakeQuery) -> FakeResponse:
+        payload = query.payload if isinstance(query.payload, list) else [query.payload]
+        conflict = query.on_conflict or TABLES.get(query.table_name, {}).get('primary_key')
+        result = []
+
+        for data in payload:
+            existing = next((row for row in self.rows(query.table_name)
+                             if row.get(conflict) == data.get(conflict)), None)
+            if existing is None:
+                row = self._new_row(query.table_name, data)
+                self.rows(query.table_name).append(row)
+                self._changed(query.table_name, None, row)
+                result.append(copy.deepcopy(row))
+            elif not query.ignore_duplicates:
+                old = dict(existing)
+                existing.update(data)
+                self._changed(query.table_name, old, existing)
+                result.append(copy.deepcopy(existing))
+
+        return FakeResponse(result)
+
+    def _run_update(self, query: FakeQuery) -> FakeResponse:
+        rows = self._matching(query)
+        for row in rows:
+            old = dict(row)
+            row.update(query.payload)
+            self._changed(query.table_name, old, row)
+        return FakeResponse(copy.deepcopy(rows))
+
+    def _run_delete(self, query: FakeQuery) -> FakeResponse:
+        rows = self._matching(query)
+        self._remove_rows(query.table_name, rows)
+        return FakeResponse(copy.deepcopy(rows))
+
+    # Trigger emulation (see database/migrations/0003_inbox_stats.sql)
+
+    def _changed(self, table: str, old: dict, new: dict):
+        if table == 'inbox_items':
+            if old is not None and old.get('deleted_at') is None:
+                self._apply_inbox_stats(old, -1)
+            if new is not None and new.get('deleted_at') is None:
+                self._apply_inbox_stats(new, 1)
+        elif table == 'drop_ids' and new is None:
+            self._remove_drop_id_stats(old['id'])
+
+    def _stats_row(self, table: str, key: str, value) -> dict:
+        row = next((row for row in self.rows(table) if row[key] == value), None)
+        if row is None:
+            row = dict(TABLES[table]['defaults'], **{key: value})
+            self.rows(table).append(row)
+        return row
+
+    def _apply_inbox_stats(self, item: dict, sign: int):
+        drop = next((row for row in self.rows('drop_ids') if row['id'] == item['drop_id']), None)
+        if drop is None:
+            return
+
+        drop_stats = self._stats_row('drop_id_stats', 'drop_id', drop['id'])
+        drop_stats['owner_id'] = drop['owner_id']
+        owner_stats = self._stats_row('owner_inbox_stats', 'owner_id', drop['owner_id'])
+
+        for stats in (drop_stats, owner_stats):
+            stats['item_count'] = max(0, stats['item_count'] + sign)
+            if item.get('file_id') is not None:
+                stats['file_count'] = max(0, stats['file_count'] + sign)
+            stats['total_bytes'] = max(0, stats['total_bytes'] + sign * (item.get('file_size') or 0))
+            if sign > 0:
+                stats['last_received_at'] = max(filter(None, [stats['last_received_at'], item['created_at']]))
+
+    def _remove_drop_id_stats(self, drop_id: str):
+        drop_stats = next((row for row in self.rows('drop_id_stats') if row['drop_id'] == drop_id), None)
+        if drop_stats is None:
+            return
+        owner_stats = self._stats_row('owner_inbox_stats', 'owner_id', drop_stats['owner_id'])
+        for column in ('item_count', 'file_count', 'total_bytes'):
+            owner_stats[column] = max(0, owner_stats[column] - drop_stats[column])
+        self.rows('drop_id_stats').remove(drop_stats)
+
+class MockedSession(BaseSession):
+    """Bot session that records API calls instead of sending them"""
+
+    def __init__(self):
+        super().__init__()
+        self.requests: List[TelegramMethod] = []
+        self._message_ids = itertools.count(1000)
+
+    async def make_request(self, bot, method: TelegramMethod, timeout: int = None):
+        self.requests.append(method)
+
+        if isinstance(method, GetMe):
+            return User(id=bot.id, is_bot=True, first_name="DropKey", username="dropkey_test_bot")
+        if isinstance(method, SendMessage):
+            return self._message(method.chat_id, text=method.text)
+        if isinstance(method, SendMediaGroup):
+            return [self._message(method.chat_id) for _ in method.media]
+        if method.__returning__ is Message:
+            return self._message(getattr(method, 'chat_id', 0))
+        return True
+
+    def _message(self, chat_id: int, text: str = None) -> Message:
+        return Message(
+            message_id=next(self._message_ids),
+            date=datetime.utcnow(),
+            chat=Chat(id=chat_id, type="private"),
+            text=text
+        )
+
+    def sent_texts(self) -> List[str]:
+        return [method.text for method in self.requests if isinstance(method, SendMessage)]
+
+    async def stream_content(self, url: str, headers: dict = None, timeout: int = 30,
+                             chunk_size: int = 65536, raise_for_status: bool = True):
+        yield b""
+
+    async def close(self):
+        pass
+
+_update_ids = itertools.count(1)
+
+def make_user(user_id: int) -> User:
+    return User(id=user_id, is_bot=False, first_name=f"User{user_id}")
+
+def make_message_update(user_id: int, text: str = None, message_id: int = None, **fields) -> Update:
+    """Update with a private-chat message from `user_id`"""
+    update_id = next(_update_ids)
+    return Update(
+        update_id=update_id,
+        message=Message(
+            message_id=message_id or update_id,
+            date=datetime.utcnow(),
+            chat=Chat(id=user_id, type="private"),
+            from_user=make_user(user_id),
+            text=text,
+            **fields
+        )
+    )
+
+def make_callback_update(user_id: int, data: str, message_id: int = 1) -> Update:
+    """Update with an inline button tap from `user_id`"""
+    update_id = next(_update_ids)
+    return Update(
+        update_id=update_id,
+        callback_query=CallbackQuery(
+            id=str(update_id),
+            from_user=make_user(user_id),
+            chat_instance="test",
+            data=data,
+            message=Message(
+                message_id=message_id,
+                date=datetime.utcnow(),
+                chat=Chat(id=user_id, type="private"),
+                text="previous message"
+            )
+        )
+    )
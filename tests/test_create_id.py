@@ -0,0 +1,70 @@
+from database.errors import is_unique_violation
+from database.operations import DropIDOperations, UserOperations
+import database.operations as operations
+from tests.fakes import make_message_update
+
+test_user_id = 987654321
+
+async def test_drop_id_creation(fake_db):
+    """Test Drop ID creation and listing"""
+    user = await UserOperations.get_or_create_user(test_user_id)
+    assert user.telegram_id == test_user_id
+
+    # Basic Drop ID
+    drop_id1 = await DropIDOperations.create_drop_id(test_user_id)
+    assert len(drop_id1.id) == 8
+    assert drop_id1.is_active
+    assert not drop_id1.is_single_use
+    assert drop_id1.expires_at is None
+
+    # Single-use Drop ID
+    drop_id2 = await DropIDOperations.create_drop_id(test_user_id, is_single_use=True)
+    assert drop_id2.is_single_use
+
+    # Expiring Drop ID
+    drop_id3 = await DropIDOperations.create_drop_id(test_user_id, expires_hours=1)
+    assert drop_id3.expires_at is not None
+    assert not drop_id3.is_expired()
+
+    user_drop_ids = await DropIDOperations.get_user_drop_ids(test_user_id)
+    assert {drop.id for drop in user_drop_ids} == {drop_id1.id, drop_id2.id, drop_id3.id}
+
+async def test_get_or_create_user_is_idempotent(fake_db):
+    await UserOperations.get_or_create_user(test_user_id)
+    await UserOperations.get_or_create_user(test_user_id)
+    assert len(fake_db.rows('users')) == 1
+
+async def test_create_drop_id_retries_on_collision(fake_db, monkeypatch):
+    await UserOperations.get_or_create_user(test_user_id)
+    existing = await DropIDOperations.create_drop_id(test_user_id)
+
+    # First candidate collides with the existing ID, the second one is free
+    candidates = iter([existing.id, "fresh123"])
+    monkeypatch.setattr(operations.drop_id_allocator, "next_id", lambda: next(candidates))
+
+    drop_id = await DropIDOperations.create_drop_id(test_user_id)
+    assert drop_id.id == "fresh123"
+
+async def test_duplicate_insert_is_a_unique_violation(fake_db):
+    fake_db.table('users').insert({'telegram_id': 1}).execute()
+    try:
+        fake_db.table('users').insert({'telegram_id': 1}).execute()
+    except Exception as e:
+        assert is_unique_violation(e, 'users_pkey')
+    else:
+        raise AssertionError("duplicate insert was accepted")
+
+async def test_get_or_create_user_keeps_existing_pin(fake_db):
+    await UserOperations.get_or_create_user(test_user_id)
+    await UserOperations.set_user_pin(test_user_id, "hash")
+
+    user = await UserOperations.get_or_create_user(test_user_id)
+    assert user.pin_hash == "hash"
+
+async def test_create_id_skips_users_table_for_known_users(fake_db, bot, dispatcher):
+    for _ in range(3):
+        await dispatcher.feed_update(bot, make_message_update(test_user_id, "/create_id"))
+
+    user_queries = [query for query in fake_db.queries if query.table_name == 'users']
+    assert len(user_queries) == 1
+    assert len(fake_db.rows('drop_ids')) == 3
@@ -0,0 +1,97 @@
+from datetime import datetime, timedelta
+
+from database.maintenance import compact_tombstones
+from database.operations import DropIDOperations, InboxOperations, UserOperations
+from tests.fakes import make_callback_update
+
+test_user_id = 666666666
+
+async def test_delete_functionality(fake_db):
+    """Test Drop ID deletion functionality"""
+    await UserOperations.get_or_create_user(test_user_id)
+    drop_id1 = await DropIDOperations.create_drop_id(test_user_id)
+    drop_id2 = await DropIDOperations.create_drop_id(test_user_id)
+
+    await InboxOperations.add_inbox_item(
+        drop_id=drop_id1.id,
+        sender_anon_id="test_sender",
+        message_text="Test message for deletion"
+    )
+    await InboxOperations.add_file_item(
+        drop_id=drop_id1.id,
+        sender_anon_id="test_sender",
+        file_id="test_file_id",
+        file_type="document",
+        file_name="test_document.pdf",
+        file_size=1024
+    )
+
+    assert await DropIDOperations.permanent_delete_drop_id(drop_id1.id, test_user_id)
+    assert [drop.id for drop in await DropIDOperations.get_user_drop_ids(test_user_id)] == [drop_id2.id]
+    assert fake_db.rows('inbox_items') == []
+    assert await DropIDOperations.get_drop_id(drop_id1.id) is None
+
+    # Only the owner can delete a Drop ID
+    assert not await DropIDOperations.permanent_delete_drop_id(drop_id2.id, 999999999)
+    assert await DropIDOperations.get_drop_id(drop_id2.id) is not None
+
+async def test_soft_delete_hides_drop_id(fake_db):
+    await UserOperations.get_or_create_user(test_user_id)
+    drop_id = await DropIDOperations.create_drop_id(test_user_id)
+    await InboxOperations.add_inbox_item(drop_id=drop_id.id, sender_anon_id="s", message_text="hi")
+
+    assert await DropIDOperations.delete_drop_id(drop_id.id, test_user_id)
+
+    assert await DropIDOperations.get_user_drop_ids(test_user_id) == []
+    assert len(await DropIDOperations.get_user_drop_ids(test_user_id, include_deleted=True)) == 1
+    assert all(row['deleted_at'] for row in fake_db.rows('inbox_items'))
+
+async def test_soft_deleted_rows_are_hidden_from_reads(fake_db, bot, dispatcher):
+    await UserOperations.get_or_create_user(test_user_id)
+    drop_id = await DropIDOperations.create_drop_id(test_user_id)
+    [file_item] = await InboxOperations.add_file_items(drop_id.id, "s", [
+        {'file_id': "f1", 'file_type': "document", 'file_name': "a.pdf"},
+    ])
+
+    # A single soft-deleted item under a live Drop ID
+    fake_db.rows('inbox_items')[0]['deleted_at'] = datetime.utcnow().isoformat()
+    assert await InboxOperations.get_user_inbox(test_user_id) == []
+    assert await InboxOperations.get_user_file_items(test_user_id) == []
+
+    await dispatcher.feed_update(bot, make_callback_update(test_user_id, f"view_file_{file_item.id}"))
+    assert bot.session.requests[-1].text == "❌ File not found"
+
+    assert await DropIDOperations.delete_drop_id(drop_id.id, test_user_id)
+    assert await DropIDOperations.get_drop_id(drop_id.id) is None
+    assert not await DropIDOperations.disable_drop_id(drop_id.id, test_user_id)
+
+async def test_compaction_removes_old_tombstones(fake_db):
+    await UserOperations.get_or_create_user(test_user_id)
+    old_drop = await DropIDOperations.create_drop_id(test_user_id)
+    recent_drop = await DropIDOperations.create_drop_id(test_user_id)
+    for drop in (old_drop, recent_drop):
+        for i in range(3):
+            await InboxOperations.add_inbox_item(drop_id=drop.id, sender_anon_id="s", message_text=f"{drop.id} {i}")
+        await DropIDOperations.delete_drop_id(drop.id, test_user_id)
+
+    long_ago = (datetime.utcnow() - timedelta(days=30)).isoformat()
+    for row in fake_db.rows('inbox_items') + fake_db.rows('drop_ids'):
+        if old_drop.id in (row.get('drop_id'), row.get('id')):
+            row['deleted_at'] = long_ago
+
+    # 3 items, then the Drop ID itself; recent tombstones stay
+    assert await compact_tombstones(grace_days=7, batch_size=2, pause=0) == 4
+    assert {row['id'] for row in fake_db.rows('drop_ids')} == {recent_drop.id}
+    assert len(fake_db.rows('inbox_items')) == 3
+
+async def test_deleting_twice_keeps_the_first_deleted_at(fake_db):
+    await UserOperations.get_or_create_user(test_user_id)
+    drop_id = await DropIDOperations.create_drop_id(test_user_id)
+    await InboxOperations.add_inbox_item(drop_id=drop_id.id, sender_anon_id="s", message_text="old")
+
+    assert await DropIDOperations.delete_drop_id(drop_id.id, test_user_id)
+    first = {row['id']: row['deleted_at'] for row in fake_db.rows('drop_ids') + fake_db.rows('inbox_items')}
+
+    assert not await DropIDOperations.delete_drop_id(drop_id.id, test_user_id)
+    again = {row['id']: row['deleted_at'] for row in fake_db.rows('drop_ids') + fake_db.rows('inbox_items')}
+    assert again == first
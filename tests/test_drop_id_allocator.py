@@ -0,0 +1,32 @@
+import math
+from collections import Counter
+
+from database.drop_id_allocator import ALPHABET, DropIDAllocator, generate_drop_ids
+
+def test_ids_have_requested_length_and_alphabet():
+    ids = generate_drop_ids(1000, 8)
+    assert len(ids) == 1000
+    assert all(len(drop_id) == 8 for drop_id in ids)
+    assert set("".join(ids)) <= set(ALPHABET)
+
+def test_characters_are_uniform():
+    chars = Counter("".join(generate_drop_ids(50_000, 8)))
+    expected = 50_000 * 8 / len(ALPHABET)
+    # A plain modulo mapping would over-pick the first 4 characters by ~12%
+    assert all(abs(chars[c] - expected) / expected < 0.05 for c in ALPHABET)
+
+def test_collision_rate_matches_random_expectation():
+    # Short IDs make collisions frequent enough to measure
+    space = len(ALPHABET) ** 3
+    n = 20_000
+    distinct = len(set(generate_drop_ids(n, 3)))
+    expected = space * (1 - math.exp(-n / space))
+    assert abs(distinct - expected) / expected < 0.02
+
+def test_full_length_ids_do_not_collide():
+    assert len(set(generate_drop_ids(100_000, 8))) == 100_000
+
+def test_allocator_refills_batches():
+    allocator = DropIDAllocator(length=8, batch_size=4)
+    ids = [allocator.next_id() for _ in range(10)]
+    assert len(set(ids)) == 10
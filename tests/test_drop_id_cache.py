@@ -0,0 +1,58 @@
+from database.drop_id_cache import DropIDLookupCache
+from utils.bloom import BloomFilter
+from utils.cache import TTLCache
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_ttl_cache_expires_entries():
+    clock = FakeClock()
+    cache = TTLCache(maxsize=10, ttl=5, clock=clock)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+
+    clock.now = 5
+    assert cache.get("a") is None
+    assert "a" not in cache
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60, clock=FakeClock())
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert "a" in cache and "c" in cache
+    assert "b" not in cache
+
+def test_bloom_filter_has_no_false_negatives_and_few_false_positives():
+    members = [f"id{i:06d}" for i in range(10_000)]
+    bloom = BloomFilter.from_iterable(members, capacity=10_000, error_rate=0.01)
+    assert all(member in bloom for member in members)
+
+    false_positives = sum(f"other{i:06d}" in bloom for i in range(10_000))
+    assert false_positives < 200
+
+def test_lookup_cache_remembers_misses_until_created():
+    cache = DropIDLookupCache()
+    assert not cache.is_known_missing("abcd1234")
+
+    cache.record_miss("abcd1234")
+    assert cache.is_known_missing("abcd1234")
+
+    cache.record_created("abcd1234")
+    assert not cache.is_known_missing("abcd1234")
+
+def test_lookup_cache_rebuild_keeps_ids_created_meanwhile():
+    cache = DropIDLookupCache(bloom_capacity=100)
+    bloom = cache.start_rebuild()
+    bloom.add("existing")
+    cache.record_created("newone12")
+    cache.finish_rebuild(bloom)
+
+    assert not cache.is_known_missing("existing")
+    assert not cache.is_known_missing("newone12")
+    assert cache.is_known_missing("unknown1")
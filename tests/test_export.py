@@ -0,0 +1,49 @@
+import json
+import zipfile
+
+from aiogram.methods import SendDocument
+
+from database.operations import DropIDOperations, InboxOperations, UserOperations
+from tests.fakes import make_message_update
+from utils.export import write_inbox_archive
+
+owner_id = 999999991
+
+async def seed_inbox():
+    await UserOperations.get_or_create_user(owner_id)
+    drop_id = await DropIDOperations.create_drop_id(owner_id)
+    for i in range(5):
+        await InboxOperations.add_inbox_item(drop_id=drop_id.id, sender_anon_id="a", message_text=f"message {i} ✉️")
+    await InboxOperations.add_file_items(drop_id.id, "b", [
+        {'file_id': "f1", 'file_type': "document", 'file_name': "a.pdf", 'file_size': 10, 'mime_type': "application/pdf"},
+    ])
+    return drop_id
+
+async def test_inbox_pages_are_streamed_into_the_archive(fake_db, tmp_path):
+    await seed_inbox()
+
+    pages = []
+    async def record_pages():
+        async for page in InboxOperations.iter_inbox_pages(owner_id, page_size=2):
+            pages.append(len(page))
+            yield page
+
+    path = tmp_path / "inbox.zip"
+    assert await write_inbox_archive(record_pages(), str(path)) == 6
+    assert pages == [2, 2, 2]
+
+    with zipfile.ZipFile(path) as archive:
+        manifest = json.loads(archive.read("manifest.json"))
+        items = manifest["items"]
+        assert [item["type"] for item in items] == ["text"] * 5 + ["document"]
+        assert archive.read(items[0]["text_file"]).decode() == "message 0 ✉️"
+        assert items[-1]["file_name"] == "a.pdf" and items[-1]["text_file"] is None
+
+async def test_export_command_sends_one_document(fake_db, bot, dispatcher):
+    await seed_inbox()
+
+    await dispatcher.feed_update(bot, make_message_update(owner_id, "/export"))
+    documents = [method for method in bot.session.requests if isinstance(method, SendDocument)]
+    assert len(documents) == 1
+    assert documents[0].caption.startswith("📦 6 items exported")
+    assert documents[0].document.filename.endswith(".zip")
@@ -0,0 +1,34 @@
+from utils.file_handlers import FileTypeDetector, FileValidator, get_extension
+
+def test_get_extension():
+    assert get_extension("Report.PDF") == "pdf"
+    assert get_extension("archive.tar.gz") == "gz"
+    assert get_extension("notes") == ""
+    assert get_extension("trailing.") == ""
+    assert get_extension(None) == ""
+
+def test_categorize_prefers_mime_type():
+    assert FileTypeDetector.categorize_file("image/png", "file.pdf") == "image"
+    assert FileTypeDetector.categorize_file("text/plain") == "document"
+    assert FileTypeDetector.categorize_file("text/csv") == "text"
+
+def test_categorize_falls_back_to_extension():
+    assert FileTypeDetector.categorize_file("application/octet-stream", "song.MP3") == "audio"
+    assert FileTypeDetector.categorize_file("application/octet-stream", "clip.mov") == "video"
+    assert FileTypeDetector.categorize_file("application/octet-stream", "setup.exe") == "unknown"
+    assert FileTypeDetector.categorize_file(None, "photo.jpg") == "image"
+
+def test_is_file_safe():
+    assert not FileValidator.is_file_safe("setup.EXE", "application/octet-stream")
+    assert not FileValidator.is_file_safe("run.sh", "text/x-sh")
+    assert FileValidator.is_file_safe("report.pdf", "application/pdf")
+    assert FileValidator.is_file_safe("", None)
+
+def test_classify_batch():
+    files = [
+        {'mime_type': 'image/jpeg', 'file_name': 'a.jpg'},
+        {'mime_type': 'application/octet-stream', 'file_name': 'b.bat'},
+    ]
+    first, second = FileTypeDetector.classify_batch(files)
+    assert (first.category, first.extension, first.is_dangerous) == ("image", "jpg", False)
+    assert (second.category, second.is_dangerous) == ("unknown", True)
@@ -0,0 +1,97 @@
+import asyncio
+
+import pytest
+
+from bot.handlers.send import message_idempotency_key
+from config import config
+from database.operations import DropIDOperations, InboxOperations, UserOperations
+from database.retry import is_transient_error, retry_with_backoff
+from tests.fakes import make_message_update
+
+owner_id = 777777777
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(config, "DB_RETRY_BASE_DELAY", 0)
+
+async def make_drop_id() -> str:
+    await UserOperations.get_or_create_user(owner_id)
+    return (await DropIDOperations.create_drop_id(owner_id)).id
+
+def lose_first_insert_response(fake_db, monkeypatch):
+    """The first insert is stored, but the caller only sees a timeout"""
+    real_execute = fake_db._execute
+    calls = {'lost': False}
+
+    def execute(query):
+        response = real_execute(query)
+        if query.action == 'insert' and not calls['lost']:
+            calls['lost'] = True
+            raise asyncio.TimeoutError()
+        return response
+    monkeypatch.setattr(fake_db, "_execute", execute)
+
+async def test_lost_response_is_not_stored_twice(fake_db, monkeypatch):
+    drop_id = await make_drop_id()
+    lose_first_insert_response(fake_db, monkeypatch)
+
+    item = await InboxOperations.add_inbox_item(
+        drop_id=drop_id, sender_anon_id="anon", message_text="hi", idempotency_key="1:10"
+    )
+
+    assert item.message_text == "hi"
+    assert len(fake_db.rows('inbox_items')) == 1
+
+async def test_batch_retry_returns_rows_in_order(fake_db, monkeypatch):
+    drop_id = await make_drop_id()
+    lose_first_insert_response(fake_db, monkeypatch)
+
+    files = [
+        {'file_id': f"f{i}", 'file_type': "image", 'idempotency_key': f"1:{i}"}
+        for i in range(3)
+    ]
+    items = await InboxOperations.add_file_items(drop_id, "anon", files)
+
+    assert [item.file_id for item in items] == ["f0", "f1", "f2"]
+    assert len(fake_db.rows('inbox_items')) == 3
+
+async def test_mixed_batch_with_duplicate_keeps_unkeyed_rows(fake_db):
+    drop_id = await make_drop_id()
+    await InboxOperations.insert_items([{'drop_id': drop_id, 'message_text': "first", 'idempotency_key': "k1"}])
+
+    rows = await InboxOperations.insert_items([
+        {'drop_id': drop_id, 'message_text': "a"},
+        {'drop_id': drop_id, 'message_text': "first", 'idempotency_key': "k1"},
+        {'drop_id': drop_id, 'message_text': "b"},
+    ])
+
+    # Every input row comes back once, in order, and nothing is stored twice
+    assert [row['message_text'] for row in rows] == ["a", "first", "b"]
+    assert len({row['id'] for row in rows}) == 3
+    assert len(fake_db.rows('inbox_items')) == 3
+
+async def test_redelivered_send_update_is_stored_once(fake_db, bot, dispatcher):
+    drop_id = await make_drop_id()
+    update = make_message_update(888, f"/send {drop_id} hello", message_id=42)
+
+    await dispatcher.feed_update(bot, update)
+    await dispatcher.feed_update(bot, update)
+
+    assert len(fake_db.rows('inbox_items')) == 1
+    # Stored as a digest: the sender's chat id must not be readable from the row
+    key = fake_db.rows('inbox_items')[0]['idempotency_key']
+    assert key == message_idempotency_key(update.message)
+    assert "888" not in key
+
+async def test_permanent_errors_are_not_retried():
+    calls = []
+
+    async def operation():
+        calls.append(1)
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        await retry_with_backoff(operation, attempts=3, base_delay=0)
+    assert len(calls) == 1
+    assert is_transient_error(ConnectionError())
+    assert not is_transient_error(ValueError())
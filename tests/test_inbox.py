@@ -0,0 +1,83 @@
+import database.operations as operations
+from database.operations import DropIDOperations, InboxOperations, UserOperations
+from security.pin import PINManager
+from tests.fakes import make_message_update
+
+test_user_id = 333333333
+
+def test_pin_hashing_and_format():
+    pin_hash = PINManager.hash_pin("1234")
+    assert PINManager.verify_pin("1234", pin_hash)
+    assert not PINManager.verify_pin("9999", pin_hash)
+
+    for pin in ["1234", "12345", "123456"]:
+        assert PINManager.validate_pin_format(pin)
+    for pin in ["123", "1234567", "abcd", "12a4"]:
+        assert not PINManager.validate_pin_format(pin)
+
+async def test_user_pin_storage(fake_db):
+    await UserOperations.get_or_create_user(test_user_id)
+    assert not await UserOperations.user_has_pin(test_user_id)
+
+    pin_hash = PINManager.hash_pin("1234")
+    await UserOperations.set_user_pin(test_user_id, pin_hash)
+
+    assert await UserOperations.user_has_pin(test_user_id)
+    assert await UserOperations.get_user_pin_hash(test_user_id) == pin_hash
+
+async def test_inbox_functionality(fake_db):
+    """Test inbox listing and clearing"""
+    await UserOperations.get_or_create_user(test_user_id)
+    drop_id = await DropIDOperations.create_drop_id(test_user_id)
+
+    test_messages = [
+        "Hello! This is the first test message.",
+        "Second message with some content.",
+        "Third message for testing inbox display."
+    ]
+    for i, msg in enumerate(test_messages):
+        await InboxOperations.add_inbox_item(
+            drop_id=drop_id.id,
+            sender_anon_id=f"test{i}",
+            message_text=msg
+        )
+
+    inbox_items = await InboxOperations.get_user_inbox(test_user_id)
+    assert sorted(item.message_text for item in inbox_items) == sorted(test_messages)
+
+    await InboxOperations.clear_user_inbox(test_user_id)
+    assert await InboxOperations.get_user_inbox(test_user_id) == []
+
+async def test_file_items_are_paged_newest_first(fake_db):
+    await UserOperations.get_or_create_user(test_user_id)
+    drop_id = await DropIDOperations.create_drop_id(test_user_id)
+
+    await InboxOperations.add_inbox_item(drop_id=drop_id.id, sender_anon_id="a", message_text="text only")
+    await InboxOperations.add_file_items(drop_id.id, "a", [
+        {'file_id': f"file{i}", 'file_type': "document", 'file_name': f"doc{i}.pdf"}
+        for i in range(5)
+    ])
+
+    first_page = await InboxOperations.get_user_file_items(test_user_id, limit=3)
+    second_page = await InboxOperations.get_user_file_items(test_user_id, limit=3, offset=3)
+    assert [item.file_id for item in first_page] == ["file4", "file3", "file2"]
+    assert [item.file_id for item in second_page] == ["file1", "file0"]
+
+async def test_pin_unlock_reads_users_table_once(fake_db, bot, dispatcher):
+    await UserOperations.get_or_create_user(test_user_id)
+    await UserOperations.set_user_pin(test_user_id, PINManager.hash_pin("1234"))
+    operations.pin_hash_cache.clear()
+    fake_db.queries.clear()
+
+    await dispatcher.feed_update(bot, make_message_update(test_user_id, "/inbox"))
+    await dispatcher.feed_update(bot, make_message_update(test_user_id, "1234"))
+
+    assert any("PIN verified" in text for text in bot.session.sent_texts())
+    assert len([query for query in fake_db.queries if query.table_name == 'users']) == 1
+
+async def test_set_user_pin_updates_cached_hash(fake_db):
+    await UserOperations.get_or_create_user(test_user_id)
+    assert await UserOperations.get_user_pin_hash(test_user_id) is None
+
+    await UserOperations.set_user_pin(test_user_id, "new-hash")
+    assert await UserOperations.get_user_pin_hash(test_user_id) == "new-hash"
@@ -0,0 +1,69 @@
+from datetime import datetime, timedelta
+
+from aiogram.methods import EditMessageText, SendDocument, SendMediaGroup, SendPhoto
+
+from database.operations import DropIDOperations, InboxOperations, UserOperations
+from tests.fakes import make_callback_update
+
+owner_id = 777777771
+other_id = 777777772
+
+async def seed_inbox(fake_db):
+    await UserOperations.get_or_create_user(owner_id)
+    await UserOperations.get_or_create_user(other_id)
+    first = await DropIDOperations.create_drop_id(owner_id)
+    second = await DropIDOperations.create_drop_id(owner_id)
+    other = await DropIDOperations.create_drop_id(other_id)
+
+    await InboxOperations.add_inbox_item(drop_id=first.id, sender_anon_id="a", message_text="old note")
+    await InboxOperations.add_file_items(first.id, "b", [{'file_id': "img", 'file_type': "image"}])
+    await InboxOperations.add_file_items(second.id, "c", [{'file_id': "doc", 'file_type': "document"}])
+    await InboxOperations.add_inbox_item(drop_id=other.id, sender_anon_id="d", message_text="not yours")
+
+    # Age the text message
+    old_item = next(row for row in fake_db.rows('inbox_items') if row['message_text'] == "old note")
+    old_item['created_at'] = (datetime.utcnow() - timedelta(days=10)).isoformat()
+    return first, second, other
+
+async def test_filters_are_applied_in_the_query(fake_db):
+    first, second, other = await seed_inbox(fake_db)
+
+    assert len(await InboxOperations.get_user_inbox(owner_id)) == 3
+    assert {item.file_id for item in await InboxOperations.get_user_inbox(owner_id, drop_id=first.id)} == {None, "img"}
+    assert [item.file_id for item in await InboxOperations.get_user_inbox(owner_id, file_type="document")] == ["doc"]
+    assert [item.message_text for item in await InboxOperations.get_user_inbox(owner_id, file_type="text")] == ["old note"]
+
+    recent = await InboxOperations.get_user_inbox(owner_id, since=datetime.utcnow() - timedelta(days=7))
+    assert {item.file_id for item in recent} == {"img", "doc"}
+
+    # Another user's Drop ID is not reachable through the filter
+    assert await InboxOperations.get_user_inbox(owner_id, drop_id=other.id) == []
+
+async def test_filter_menu_updates_the_inbox(fake_db, bot, dispatcher):
+    first, second, _ = await seed_inbox(fake_db)
+
+    await dispatcher.feed_update(bot, make_callback_update(owner_id, "inbox_filters"))
+    await dispatcher.feed_update(bot, make_callback_update(owner_id, f"inbox_fdrop_{second.id}"))
+    menu = next(method for method in reversed(bot.session.requests) if isinstance(method, EditMessageText))
+    assert second.id in menu.text
+
+    await dispatcher.feed_update(bot, make_callback_update(owner_id, "refresh_inbox"))
+    inbox_text = bot.session.sent_texts()[-1]
+    assert "Matching Messages:</b> 1" in inbox_text
+    assert first.id not in inbox_text.split("Matching")[0]
+
+    await dispatcher.feed_update(bot, make_callback_update(owner_id, "inbox_fclear"))
+    assert "Total Messages:</b> 3" in bot.session.sent_texts()[-1]
+
+async def test_download_all_only_delivers_filtered_files(fake_db, bot, dispatcher):
+    await seed_inbox(fake_db)
+
+    await dispatcher.feed_update(bot, make_callback_update(owner_id, "inbox_ftype_image"))
+    await dispatcher.feed_update(bot, make_callback_update(owner_id, "download_all_0"))
+
+    sent = [method for method in bot.session.requests
+            if isinstance(method, (SendPhoto, SendDocument, SendMediaGroup))]
+    assert [method.photo for method in sent] == ["img"]
+    assert "Delivered 1 file " in bot.session.sent_texts()[-1]
+
+    await dispatcher.feed_update(bot, make_callback_update(owner_id, "inbox_fclear"))
@@ -0,0 +1,47 @@
+from database.operations import DropIDOperations, InboxOperations, UserOperations
+
+owner_id = 444444444
+
+async def add_items(drop_id: str):
+    await InboxOperations.add_inbox_item(drop_id=drop_id, sender_anon_id="a", message_text="hi")
+    await InboxOperations.add_file_items(drop_id, "a", [
+        {'file_id': "f1", 'file_type': "document", 'file_name': "a.pdf", 'file_size': 1000},
+        {'file_id': "f2", 'file_type': "image", 'file_size': 500},
+    ])
+
+async def test_counters_follow_inserts(fake_db):
+    await UserOperations.get_or_create_user(owner_id)
+    first = await DropIDOperations.create_drop_id(owner_id)
+    second = await DropIDOperations.create_drop_id(owner_id)
+    await add_items(first.id)
+    await InboxOperations.add_inbox_item(drop_id=second.id, sender_anon_id="b", message_text="yo")
+
+    stats = await InboxOperations.get_owner_stats(owner_id)
+    assert (stats.item_count, stats.file_count, stats.total_bytes) == (4, 2, 1500)
+    assert stats.last_received_at is not None
+
+    per_drop = await InboxOperations.get_drop_id_stats(owner_id)
+    assert per_drop[first.id].item_count == 3
+    assert per_drop[first.id].total_bytes == 1500
+    assert per_drop[second.id].item_count == 1
+
+async def test_counters_follow_deletes(fake_db):
+    await UserOperations.get_or_create_user(owner_id)
+    first = await DropIDOperations.create_drop_id(owner_id)
+    second = await DropIDOperations.create_drop_id(owner_id)
+    await add_items(first.id)
+    await add_items(second.id)
+
+    assert await DropIDOperations.delete_drop_id(first.id, owner_id)
+    stats = await InboxOperations.get_owner_stats(owner_id)
+    assert (stats.item_count, stats.file_count, stats.total_bytes) == (3, 2, 1500)
+    assert (await InboxOperations.get_drop_id_stats(owner_id))[first.id].item_count == 0
+
+    assert await DropIDOperations.permanent_delete_drop_id(second.id, owner_id)
+    stats = await InboxOperations.get_owner_stats(owner_id)
+    assert (stats.item_count, stats.total_bytes) == (0, 0)
+    assert second.id not in await InboxOperations.get_drop_id_stats(owner_id)
+
+async def test_empty_owner_has_zero_counters(fake_db):
+    stats = await InboxOperations.get_owner_stats(owner_id)
+    assert stats.item_count == 0 and stats.last_received_at is None
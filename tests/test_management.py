@@ -0,0 +1,28 @@
+from database.operations import DropIDOperations, UserOperations
+from tests.fakes import make_message_update
+
+test_user_id = 444444444
+
+async def test_management_functionality(fake_db):
+    """Test Drop ID management (disable/enable)"""
+    await UserOperations.get_or_create_user(test_user_id)
+    drop_id1 = await DropIDOperations.create_drop_id(test_user_id)
+    drop_id2 = await DropIDOperations.create_drop_id(test_user_id)
+
+    assert await DropIDOperations.disable_drop_id(drop_id1.id, test_user_id)
+    assert not (await DropIDOperations.get_drop_id(drop_id1.id)).is_active
+
+    # Only the owner can change a Drop ID
+    assert not await DropIDOperations.disable_drop_id(drop_id2.id, 999999999)
+    assert (await DropIDOperations.get_drop_id(drop_id2.id)).is_active
+
+    assert await DropIDOperations.enable_drop_id(drop_id1.id, test_user_id)
+    drop_ids = await DropIDOperations.get_user_drop_ids(test_user_id)
+    assert all(drop.is_active for drop in drop_ids)
+
+async def test_my_ids_lists_drop_ids(fake_db, bot, dispatcher):
+    await UserOperations.get_or_create_user(test_user_id)
+    drop_id = await DropIDOperations.create_drop_id(test_user_id)
+
+    await dispatcher.feed_update(bot, make_message_update(test_user_id, "/my_ids"))
+    assert drop_id.id in bot.session.sent_texts()[-1]
@@ -0,0 +1,89 @@
+from types import SimpleNamespace
+
+import pytest
+from aiogram import Bot
+from aiogram.exceptions import TelegramBadRequest, TelegramRetryAfter
+from aiogram.methods import SendDocument, SendMediaGroup, SendPhoto
+
+from tests.fakes import MockedSession
+from utils import media_delivery
+from utils.media_delivery import build_media_batches, deliver_files, media_kind
+
+chat_id = 424242
+
+def make_item(item_id: int, file_type: str):
+    return SimpleNamespace(
+        id=item_id, file_type=file_type, file_id=f"file{item_id}",
+        file_name=f"file{item_id}", message_text=None, sender_anon_id="anon"
+    )
+
+class FailingSession(MockedSession):
+    """MockedSession that raises the queued errors for the matching method types first"""
+
+    def __init__(self, failures):
+        super().__init__()
+        self.failures = failures  # list of (method type, exception factory)
+
+    async def make_request(self, bot, method, timeout: int = None):
+        for index, (method_type, make_error) in enumerate(self.failures):
+            if isinstance(method, method_type):
+                del self.failures[index]
+                self.requests.append(method)
+                raise make_error(method)
+        return await super().make_request(bot, method, timeout)
+
+@pytest.fixture
+def no_sleep(monkeypatch):
+    waits = []
+
+    async def sleep(seconds):
+        waits.append(seconds)
+    monkeypatch.setattr(media_delivery.asyncio, "sleep", sleep)
+    return waits
+
+def test_photos_and_videos_share_groups():
+    assert media_kind("image") == media_kind("video") == "visual"
+    assert media_kind("audio") == "audio"
+    assert media_kind("unknown") == media_kind("document") == "document"
+
+def test_batches_split_by_kind_and_limit():
+    items = [make_item(i, "image") for i in range(12)]
+    items += [make_item(100, "document"), make_item(101, "audio"), make_item(102, "video")]
+
+    batches = build_media_batches(items)
+
+    assert [[item.id for item in batch] for batch in batches] == [
+        list(range(10)),
+        [10, 11, 102],
+        [100],
+        [101],
+    ]
+
+async def test_single_item_is_sent_on_its_own(bot, no_sleep):
+    assert await deliver_files(bot, chat_id, [make_item(1, "image")]) == 1
+    assert [type(method) for method in bot.session.requests] == [SendPhoto]
+    assert bot.session.requests[0].photo == "file1"
+
+async def test_flood_limit_is_waited_out_and_retried(no_sleep):
+    session = FailingSession([
+        (SendMediaGroup, lambda method: TelegramRetryAfter(method, "Too Many Requests", retry_after=7)),
+    ])
+    bot = Bot(token="123456:TEST-token", session=session)
+
+    items = [make_item(1, "image"), make_item(2, "video")]
+    assert await deliver_files(bot, chat_id, items) == 2
+    assert [type(method) for method in session.requests] == [SendMediaGroup, SendMediaGroup]
+    assert no_sleep == [7]
+
+async def test_rejected_group_falls_back_to_single_files(no_sleep):
+    session = FailingSession([
+        (SendMediaGroup, lambda method: TelegramBadRequest(method, "wrong file identifier")),
+        # The bad file is skipped; the rest of the group still arrives
+        (SendDocument, lambda method: TelegramBadRequest(method, "wrong file identifier")),
+    ])
+    bot = Bot(token="123456:TEST-token", session=session)
+
+    items = [make_item(i, "document") for i in range(1, 4)]
+    assert await deliver_files(bot, chat_id, items) == 2
+    sent = [method.document for method in session.requests if isinstance(method, SendDocument)]
+    assert sent == ["file1", "file2", "file3"]
@@ -0,0 +1,36 @@
+import asyncio
+
+from utils.media_group import MediaGroupCollector
+
+def test_collects_group_items_into_one_batch():
+    collector = MediaGroupCollector(window=0.05)
+    batches = []
+
+    async def on_complete(items):
+        batches.append(items)
+
+    async def run():
+        for i in range(3):
+            assert collector.add("album", i, on_complete) is (i == 0)
+            await asyncio.sleep(0.01)
+        collector.add("other", "x", on_complete)
+        await asyncio.sleep(0.15)
+
+    asyncio.run(run())
+    assert sorted(batches, key=len) == [["x"], [0, 1, 2]]
+    assert len(collector) == 0
+
+def test_flush_all_processes_pending_groups():
+    collector = MediaGroupCollector(window=60)
+    batches = []
+
+    async def on_complete(items):
+        batches.append(items)
+
+    async def run():
+        collector.add("album", 1, on_complete)
+        collector.add("album", 2, on_complete)
+        await collector.flush_all()
+
+    asyncio.run(run())
+    assert batches == [[1, 2]]
@@ -0,0 +1,44 @@
+import pytest
+
+from database.migrate import Migration, expected_indexes, load_migrations, pending_migrations, split_statements
+
+def test_migrations_are_numbered_in_order():
+    migrations = load_migrations()
+    versions = [migration.version for migration in migrations]
+    assert versions == list(range(1, len(migrations) + 1))
+
+def test_duplicate_versions_are_rejected(tmp_path):
+    (tmp_path / "0001_first.sql").write_text("SELECT 1;")
+    (tmp_path / "0001_again.sql").write_text("SELECT 2;")
+    with pytest.raises(ValueError, match="Duplicate"):
+        load_migrations(tmp_path)
+
+def test_pending_migrations_and_edited_files():
+    first, second = Migration(1, "first", "SELECT 1;"), Migration(2, "second", "SELECT 2;")
+    assert pending_migrations([first, second], {1: first.checksum}) == [second]
+
+    with pytest.raises(ValueError, match="modified"):
+        pending_migrations([first, second], {1: "stale checksum"})
+
+def test_hot_query_indexes_are_expected():
+    indexes = expected_indexes(load_migrations())
+
+    for name in ("idx_inbox_items_drop_id_created_at", "idx_drop_ids_owner_created_at",
+                 "idx_drop_ids_owner_live", "idx_inbox_items_idempotency_key"):
+        assert name in indexes
+    # Dropped by a later migration
+    assert "idx_drop_ids_active" not in indexes
+
+def test_no_transaction_migrations_run_statement_by_statement():
+    migration = Migration(9, "indexes", (
+        "-- migrate:no-transaction\n"
+        "-- Built without blocking writes\n"
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_a ON t(a);\n"
+        "DROP INDEX CONCURRENTLY IF EXISTS idx_b;\n"
+    ))
+    assert not migration.transactional
+    assert split_statements(migration.sql) == [
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_a ON t(a)",
+        "DROP INDEX CONCURRENTLY IF EXISTS idx_b",
+    ]
+    assert Migration(10, "plain", "SELECT 1;").transactional
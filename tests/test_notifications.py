@@ -0,0 +1,59 @@
+import asyncio
+
+from bot.handlers import send
+from database.operations import DropIDOperations, UserOperations
+from tests.fakes import make_message_update
+from utils.notifications import DropNotifier
+
+sender_id = 555555551
+owner_id = 555555552
+
+def test_coalesces_items_per_owner():
+    digests = []
+
+    async def on_send(owner, counts):
+        digests.append((owner, dict(counts)))
+
+    async def run():
+        notifier = DropNotifier(window=0.05)
+        assert notifier.add(1, "aaaa", 1, on_send)
+        assert not notifier.add(1, "aaaa", 2, on_send)
+        assert not notifier.add(1, "bbbb", 1, on_send)
+        assert notifier.add(2, "cccc", 1, on_send)
+        await asyncio.sleep(0.1)
+        assert len(notifier) == 0
+
+    asyncio.run(run())
+    assert sorted(digests) == [(1, {"aaaa": 3, "bbbb": 1}), (2, {"cccc": 1})]
+
+def test_flush_all_and_failed_delivery():
+    sent = []
+
+    async def on_send(owner, counts):
+        if owner == 1:
+            raise RuntimeError("bot was blocked by the user")
+        sent.append(owner)
+
+    async def run():
+        notifier = DropNotifier(window=60)
+        notifier.add(1, "aaaa", 1, on_send)
+        notifier.add(2, "bbbb", 1, on_send)
+        await notifier.flush_all()
+        assert len(notifier) == 0
+
+    asyncio.run(run())
+    assert sent == [2]
+
+async def test_owner_is_notified_after_send(fake_db, bot, dispatcher):
+    await UserOperations.get_or_create_user(owner_id)
+    drop_id = await DropIDOperations.create_drop_id(owner_id)
+
+    await dispatcher.feed_update(bot, make_message_update(sender_id, f"/send {drop_id.id} first"))
+    await dispatcher.feed_update(bot, make_message_update(sender_id, f"/send {drop_id.id} second"))
+    await send.drop_notifier.flush_all()
+
+    digests = [method for method in bot.session.requests
+               if getattr(method, 'chat_id', None) == owner_id]
+    assert len(digests) == 1
+    assert "2 new items" in digests[0].text
+    assert drop_id.id in digests[0].text
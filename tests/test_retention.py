@@ -0,0 +1,76 @@
+from datetime import datetime, timedelta
+
+from database.maintenance import purge_expired_inbox_items
+from database.operations import DropIDOperations, InboxOperations, UserOperations
+from tests.fakes import make_message_update
+
+owner_id = 888888881
+
+async def add_item(fake_db, drop_id: str, text: str, age_days: int):
+    await InboxOperations.add_inbox_item(drop_id=drop_id, sender_anon_id="a", message_text=text)
+    row = next(row for row in fake_db.rows('inbox_items') if row['message_text'] == text)
+    row['created_at'] = (datetime.utcnow() - timedelta(days=age_days)).isoformat()
+
+async def remaining_texts(fake_db):
+    return sorted(row['message_text'] for row in fake_db.rows('inbox_items'))
+
+async def test_purge_follows_drop_id_then_user_then_default(fake_db):
+    await UserOperations.get_or_create_user(owner_id)
+    inherited = await DropIDOperations.create_drop_id(owner_id)
+    short = await DropIDOperations.create_drop_id(owner_id)
+    forever = await DropIDOperations.create_drop_id(owner_id)
+    await DropIDOperations.set_retention_days(short.id, owner_id, 1)
+    await DropIDOperations.set_retention_days(forever.id, owner_id, 0)
+
+    await add_item(fake_db, inherited.id, "inherited old", 40)
+    await add_item(fake_db, inherited.id, "inherited new", 5)
+    await add_item(fake_db, short.id, "short old", 2)
+    await add_item(fake_db, forever.id, "forever old", 400)
+
+    # No user setting: the server default (30 days) applies
+    assert await purge_expired_inbox_items(default_days=30, pause=0) == 2
+    assert await remaining_texts(fake_db) == ["forever old", "inherited new"]
+
+    await UserOperations.set_retention_days(owner_id, 3)
+    assert await purge_expired_inbox_items(default_days=30, pause=0) == 1
+    assert await remaining_texts(fake_db) == ["forever old"]
+
+    stats = await InboxOperations.get_owner_stats(owner_id)
+    assert stats.item_count == 1
+
+async def test_purge_runs_in_bounded_batches(fake_db):
+    await UserOperations.get_or_create_user(owner_id)
+    drop_id = await DropIDOperations.create_drop_id(owner_id)
+    for i in range(7):
+        await add_item(fake_db, drop_id.id, f"old {i}", 10)
+
+    assert await purge_expired_inbox_items(default_days=1, batch_size=3, pause=0, max_batches=2) == 6
+    assert len(fake_db.rows('inbox_items')) == 1
+    assert await purge_expired_inbox_items(default_days=1, batch_size=3, pause=0) == 1
+
+    # A default of 0 keeps everything
+    await add_item(fake_db, drop_id.id, "ancient", 1000)
+    assert await purge_expired_inbox_items(default_days=0, pause=0) == 0
+
+async def test_retention_command(fake_db, bot, dispatcher):
+    await UserOperations.get_or_create_user(owner_id)
+    drop_id = await DropIDOperations.create_drop_id(owner_id)
+
+    await dispatcher.feed_update(bot, make_message_update(owner_id, "/retention 14"))
+    assert "14 days" in bot.session.sent_texts()[-1]
+    await dispatcher.feed_update(bot, make_message_update(owner_id, f"/retention {drop_id.id} off"))
+    assert "kept forever" in bot.session.sent_texts()[-1]
+    await dispatcher.feed_update(bot, make_message_update(owner_id, "/retention soon"))
+    assert "number of days" in bot.session.sent_texts()[-1]
+
+    await dispatcher.feed_update(bot, make_message_update(owner_id, "/retention"))
+    overview = bot.session.sent_texts()[-1]
+    assert "Account: 14 days" in overview
+    assert drop_id.id in overview
+
+async def test_retention_for_user_without_a_users_row(fake_db, bot, dispatcher):
+    await dispatcher.feed_update(bot, make_message_update(888888882, "/retention 30"))
+
+    assert "30 days" in bot.session.sent_texts()[-1]
+    user = next(row for row in fake_db.rows('users') if row['telegram_id'] == 888888882)
+    assert user['retention_days'] == 30
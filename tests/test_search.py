@@ -0,0 +1,86 @@
+from aiogram.methods import EditMessageText
+
+from config import config
+from database.operations import DropIDOperations, InboxOperations, UserOperations
+from security.pin import PINManager
+from tests.fakes import make_callback_update, make_message_update
+
+owner_id = 666666661
+other_id = 666666662
+
+async def seed_inbox():
+    await UserOperations.get_or_create_user(owner_id)
+    await UserOperations.get_or_create_user(other_id)
+    drop_id = await DropIDOperations.create_drop_id(owner_id)
+    other_drop = await DropIDOperations.create_drop_id(other_id)
+
+    await InboxOperations.add_inbox_item(drop_id=drop_id.id, sender_anon_id="a", message_text="Quarterly report attached")
+    await InboxOperations.add_inbox_item(drop_id=drop_id.id, sender_anon_id="b", message_text="lunch on friday?")
+    await InboxOperations.add_file_items(drop_id.id, "c", [
+        {'file_id': "f1", 'file_type': "document", 'file_name': "report_q3.pdf"},
+    ])
+    await InboxOperations.add_inbox_item(drop_id=other_drop.id, sender_anon_id="d", message_text="someone else's report")
+    return drop_id
+
+async def test_search_matches_words_then_substrings(fake_db):
+    await seed_inbox()
+
+    results = await InboxOperations.search_inbox(owner_id, "report")
+    assert [item.message_text for item in results] == ["Quarterly report attached"]
+
+    # No whole-word match: falls back to substring search over text and file names
+    results = await InboxOperations.search_inbox(owner_id, "repo")
+    assert {item.file_name or item.message_text for item in results} == {"report_q3.pdf", "Quarterly report attached"}
+
+    assert await InboxOperations.search_inbox(owner_id, "nothing like this") == []
+
+async def test_search_is_paged_and_skips_deleted_items(fake_db):
+    drop_id = await seed_inbox()
+    for i in range(5):
+        await InboxOperations.add_inbox_item(drop_id=drop_id.id, sender_anon_id="e", message_text=f"note {i}")
+
+    first = await InboxOperations.search_inbox(owner_id, "note", limit=3)
+    second = await InboxOperations.search_inbox(owner_id, "note", limit=3, offset=3)
+    assert len(first) == 3 and len(second) == 2
+    assert not {item.id for item in first} & {item.id for item in second}
+
+    await DropIDOperations.delete_drop_id(drop_id.id, owner_id)
+    assert await InboxOperations.search_inbox(owner_id, "note") == []
+
+async def test_search_command_pages_results(fake_db, bot, dispatcher, monkeypatch):
+    monkeypatch.setattr(config, "SEARCH_PAGE_SIZE", 1)
+    await seed_inbox()
+
+    await dispatcher.feed_update(bot, make_message_update(owner_id, "/search repo"))
+    first_page = bot.session.requests[-1]
+    assert "Results for" in first_page.text
+    buttons = [button.callback_data for row in first_page.reply_markup.inline_keyboard for button in row]
+    assert "search_page_1" in buttons
+
+    await dispatcher.feed_update(bot, make_callback_update(owner_id, "search_page_1"))
+    second_page = next(method for method in reversed(bot.session.requests) if isinstance(method, EditMessageText))
+    assert "(2-2)" in second_page.text
+
+async def test_search_asks_for_pin(fake_db, bot, dispatcher):
+    await seed_inbox()
+    await UserOperations.set_user_pin(owner_id, PINManager.hash_pin("4321"))
+
+    await dispatcher.feed_update(bot, make_message_update(owner_id, "/search lunch"))
+    assert "PIN Required" in bot.session.sent_texts()[-1]
+
+    await dispatcher.feed_update(bot, make_message_update(owner_id, "4321"))
+    assert "lunch on friday?" in bot.session.sent_texts()[-1]
+
+async def test_page_buttons_need_a_verified_pin(fake_db, bot, dispatcher):
+    await seed_inbox()
+    await UserOperations.set_user_pin(owner_id, PINManager.hash_pin("4321"))
+
+    await dispatcher.feed_update(bot, make_message_update(owner_id, "/search lunch"))
+    await dispatcher.feed_update(bot, make_message_update(owner_id, "4321"))
+
+    # A new search whose PIN prompt is skipped must not be reachable through old page buttons
+    await dispatcher.feed_update(bot, make_message_update(owner_id, "/search report"))
+    await dispatcher.feed_update(bot, make_callback_update(owner_id, "search_page_0"))
+
+    edits = [method for method in bot.session.requests if isinstance(method, EditMessageText)]
+    assert not any("report" in method.text for method in edits)
@@ -0,0 +1,104 @@
+from aiogram.types import Document
+
+from bot.handlers.send import process_text_message
+from database.operations import DropIDOperations, InboxOperations, UserOperations
+from tests.fakes import make_callback_update, make_message_update
+
+sender_id = 111111111
+receiver_id = 222222222
+
+async def test_send_functionality(fake_db):
+    """Test sending messages to Drop IDs"""
+    await UserOperations.get_or_create_user(sender_id)
+    await UserOperations.get_or_create_user(receiver_id)
+    drop_id = await DropIDOperations.create_drop_id(receiver_id)
+
+    test_message = "Hello! This is a test message from the automated test."
+    inbox_item = await InboxOperations.add_inbox_item(
+        drop_id=drop_id.id,
+        sender_anon_id="test123",
+        message_text=test_message
+    )
+    assert inbox_item.id is not None
+
+    inbox_items = await InboxOperations.get_user_inbox(receiver_id)
+    assert len(inbox_items) == 1
+    assert inbox_items[0].drop_id == drop_id.id
+    assert inbox_items[0].sender_anon_id == "test123"
+    assert inbox_items[0].message_text == test_message
+
+async def test_send_command_disables_single_use_drop_id(fake_db, bot, dispatcher):
+    await UserOperations.get_or_create_user(receiver_id)
+    single_use_drop = await DropIDOperations.create_drop_id(receiver_id, is_single_use=True)
+
+    await dispatcher.feed_update(bot, make_message_update(sender_id, f"/send {single_use_drop.id} hi there"))
+
+    updated_drop = await DropIDOperations.get_drop_id(single_use_drop.id)
+    assert not updated_drop.is_active
+    assert "Message sent successfully" in bot.session.sent_texts()[-1]
+
+    # A second attempt is refused
+    await dispatcher.feed_update(bot, make_message_update(sender_id, f"/send {single_use_drop.id} again"))
+    assert "Drop ID is disabled" in bot.session.sent_texts()[-1]
+    assert len(await InboxOperations.get_user_inbox(receiver_id)) == 1
+
+async def test_send_command_unknown_drop_id(fake_db, bot, dispatcher):
+    await dispatcher.feed_update(bot, make_message_update(sender_id, "/send zzzzzzzz hello"))
+    assert "Drop ID not found" in bot.session.sent_texts()[-1]
+    assert fake_db.rows('inbox_items') == []
+
+async def open_session_with_file(bot, dispatcher, user_id: int, drop_id: str):
+    await dispatcher.feed_update(bot, make_message_update(user_id, f"/send {drop_id}"))
+    await dispatcher.feed_update(bot, make_message_update(user_id, document=Document(
+        file_id=f"doc{user_id}", file_unique_id=f"u{user_id}", file_name="notes.pdf", file_size=1000
+    )))
+
+async def test_drop_id_disabled_during_session_gets_no_files(fake_db, bot, dispatcher):
+    await UserOperations.get_or_create_user(receiver_id)
+    drop_id = await DropIDOperations.create_drop_id(receiver_id)
+
+    await open_session_with_file(bot, dispatcher, 111111112, drop_id.id)
+    await DropIDOperations.disable_drop_id(drop_id.id, receiver_id)
+    await dispatcher.feed_update(bot, make_callback_update(111111112, "finish_send"))
+
+    assert "Files not sent" in bot.session.sent_texts()[-1]
+    assert fake_db.rows('inbox_items') == []
+
+async def test_single_use_drop_id_takes_one_session_batch(fake_db, bot, dispatcher):
+    await UserOperations.get_or_create_user(receiver_id)
+    drop_id = await DropIDOperations.create_drop_id(receiver_id, is_single_use=True)
+
+    # Both sessions open while the Drop ID is still unused
+    await open_session_with_file(bot, dispatcher, 111111113, drop_id.id)
+    await open_session_with_file(bot, dispatcher, 111111114, drop_id.id)
+    await dispatcher.feed_update(bot, make_callback_update(111111113, "finish_send"))
+    await dispatcher.feed_update(bot, make_callback_update(111111114, "finish_send"))
+
+    assert len(fake_db.rows('inbox_items')) == 1
+    assert "Files not sent" in bot.session.sent_texts()[-1]
+
+async def test_single_file_is_classified_once_and_checked(fake_db, bot, dispatcher):
+    await UserOperations.get_or_create_user(receiver_id)
+    drop_id = await DropIDOperations.create_drop_id(receiver_id)
+
+    await open_session_with_file(bot, dispatcher, 111111115, drop_id.id)
+    await dispatcher.feed_update(bot, make_message_update(111111115, document=Document(
+        file_id="exe1", file_unique_id="x1", file_name="setup.EXE", file_size=1000
+    )))
+    assert "not allowed" in bot.session.sent_texts()[-1]
+
+    await dispatcher.feed_update(bot, make_callback_update(111111115, "finish_send"))
+    assert [row['file_type'] for row in fake_db.rows('inbox_items')] == ["document"]
+
+async def test_concurrent_text_sends_use_a_single_use_drop_id_once(fake_db, bot, dispatcher):
+    await UserOperations.get_or_create_user(receiver_id)
+    single_use_drop = await DropIDOperations.create_drop_id(receiver_id, is_single_use=True)
+    # Both senders looked the Drop ID up while it was still active
+    stale = await DropIDOperations.get_drop_id(single_use_drop.id)
+
+    for user_id, text in ((111111116, "first"), (111111117, "second")):
+        message = make_message_update(user_id, f"/send {single_use_drop.id} {text}").message.as_(bot)
+        await process_text_message(message, single_use_drop.id, text, stale)
+
+    assert [row['message_text'] for row in fake_db.rows('inbox_items')] == ["first"]
+    assert "already used" in bot.session.sent_texts()[-1]
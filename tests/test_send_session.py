@@ -0,0 +1,64 @@
+import asyncio
+
+from utils.send_session import SendSessionManager
+
+def make_files(*names):
+    return [{"file_name": name} for name in names]
+
+def test_session_flushes_once_when_closed():
+    manager = SendSessionManager(max_files=3, timeout=60)
+    closed = []
+
+    async def on_close(session, reason):
+        closed.append((reason, [f["file_name"] for f in session.files]))
+
+    async def run():
+        session = manager.open("k", "abcd1234", None, on_close)
+        session.add_files(make_files("a", "b"))
+        assert await manager.close("k", "done")
+        assert not await manager.close("k", "done")
+
+    asyncio.run(run())
+    assert closed == [("done", ["a", "b"])]
+
+def test_session_caps_files_and_reports_overflow():
+    manager = SendSessionManager(max_files=2, timeout=60)
+
+    async def run():
+        session = manager.open("k", "abcd1234", None, None)
+        assert session.add_files(make_files("a", "b", "c")) == 2
+        assert session.is_full
+        assert session.rejected == [("c", "session limit reached")]
+        manager.discard("k")
+
+    asyncio.run(run())
+
+def test_session_times_out():
+    manager = SendSessionManager(max_files=5, timeout=0.05)
+    closed = []
+
+    async def on_close(session, reason):
+        closed.append(reason)
+
+    async def run():
+        manager.open("k", "abcd1234", None, on_close)
+        await asyncio.sleep(0.1)
+
+    asyncio.run(run())
+    assert closed == ["timeout"]
+    assert len(manager) == 0
+
+def test_discard_skips_callback():
+    manager = SendSessionManager(max_files=5, timeout=0.05)
+    closed = []
+
+    async def on_close(session, reason):
+        closed.append(reason)
+
+    async def run():
+        manager.open("k", "abcd1234", None, on_close)
+        manager.discard("k")
+        await asyncio.sleep(0.1)
+
+    asyncio.run(run())
+    assert closed == []
@@ -0,0 +1,55 @@
+import asyncio
+
+from bot.middleware import InFlightMiddleware
+from utils.shutdown import ShutdownCoordinator
+
+def test_steps_run_in_order_after_handlers_drain():
+    order = []
+
+    async def run():
+        in_flight = InFlightMiddleware()
+
+        async def slow_handler(event, data):
+            await asyncio.sleep(0.05)
+            order.append("handler")
+
+        handler_task = asyncio.create_task(in_flight(slow_handler, object(), {}))
+
+        async def flush_writes():
+            order.append("writes")
+
+        shutdown = ShutdownCoordinator(timeout=1)
+        shutdown.add_step("handlers", in_flight.drain, pending=lambda: in_flight.in_flight)
+        shutdown.add_step("writes", flush_writes)
+        abandoned = await shutdown.shutdown()
+        await handler_task
+        return abandoned
+
+    assert asyncio.run(run()) == {}
+    assert order == ["handler", "writes"]
+
+def test_deadline_reports_abandoned_work_and_runs_remaining_steps():
+    closed = []
+
+    async def run():
+        queue = [1, 2, 3]
+
+        async def stuck():
+            await asyncio.sleep(60)
+
+        async def failing():
+            raise RuntimeError("boom")
+
+        async def close_pool():
+            closed.append(True)
+
+        shutdown = ShutdownCoordinator(timeout=0.05)
+        shutdown.add_step("queue", stuck, pending=lambda: len(queue))
+        shutdown.add_step("notifications", failing)
+        shutdown.add_step("pool", close_pool)
+        return await shutdown.shutdown()
+
+    abandoned = asyncio.run(run())
+    assert abandoned == {"queue": 3, "notifications": 0}
+    # Steps after the deadline still get a chance to finish
+    assert closed == [True]
@@ -0,0 +1,15 @@
+from aiogram.methods import SetMyCommands
+
+from main import BOT_COMMANDS, setup_bot_commands
+
+async def test_bot_commands_are_only_sent_when_changed(bot, tmp_path, monkeypatch):
+    cache_file = str(tmp_path / "commands.hash")
+
+    assert await setup_bot_commands(bot, cache_file)
+    assert not await setup_bot_commands(bot, cache_file)
+    sent = [request for request in bot.session.requests if isinstance(request, SetMyCommands)]
+    assert len(sent) == 1
+
+    # Editing the menu invalidates the cached hash
+    monkeypatch.setattr("main.BOT_COMMANDS", BOT_COMMANDS[:-1])
+    assert await setup_bot_commands(bot, cache_file)
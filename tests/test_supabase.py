@@ -0,0 +1,34 @@
+import database.connection as connection
+from database.connection import db
+from database.operations import DropIDOperations, UserOperations
+from tests.fakes import FakeSupabaseClient
+
+async def test_connect_runs_probe_query(monkeypatch):
+    """Test Supabase connection setup against the fake client"""
+    client = FakeSupabaseClient()
+    monkeypatch.setattr(connection, "create_client", lambda url, key: client)
+    monkeypatch.setattr(connection.config, "SUPABASE_URL", "https://example.supabase.co")
+    monkeypatch.setattr(connection.config, "SUPABASE_KEY", "test-key")
+    monkeypatch.setattr(db, "client", None)
+    monkeypatch.setattr(db, "is_connected", False)
+
+    await db.connect()
+
+    assert db.is_connected
+    assert db.client is client
+    assert [query.table_name for query in client.queries] == ['users']
+    assert client.queries[0].count is None
+
+    await db.disconnect()
+    assert not db.is_connected
+
+async def test_supabase_basic_operations(fake_db):
+    """Test user creation, Drop ID creation and retrieval"""
+    test_user_id = 123456789
+    user = await UserOperations.get_or_create_user(test_user_id)
+    assert user.telegram_id == test_user_id
+
+    drop_id = await DropIDOperations.create_drop_id(test_user_id)
+    retrieved_drop = await DropIDOperations.get_drop_id(drop_id.id)
+    assert retrieved_drop.id == drop_id.id
+    assert retrieved_drop.owner_id == test_user_id
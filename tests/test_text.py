@@ -0,0 +1,5 @@
+from utils.text import safe_truncate
+
+def test_safe_truncate():
+    assert safe_truncate("short", 10) == "short"
+    assert safe_truncate("x" * 60) == "x" * 47 + "..."
@@ -0,0 +1,132 @@
+import asyncio
+
+from aiogram.types import Chat, Message, User
+
+from bot.middleware.throttling import MemoryThrottleStorage, ThrottlingMiddleware
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def make_message(text: str, user_id: int = 42) -> Message:
+    return Message(
+        message_id=1,
+        date=0,
+        chat=Chat(id=user_id, type="private"),
+        from_user=User(id=user_id, is_bot=False, first_name="Test"),
+        text=text
+    )
+
+def test_bucket_allows_burst_then_refills():
+    clock = FakeClock()
+    storage = MemoryThrottleStorage(clock=clock)
+
+    async def run():
+        results = [await storage.consume("k", rate=1, capacity=3) for _ in range(4)]
+        assert results[:3] == [0.0, 0.0, 0.0]
+        assert results[3] == 1.0
+
+        clock.now += 1
+        assert await storage.consume("k", rate=1, capacity=3) == 0.0
+
+    asyncio.run(run())
+
+def test_buckets_are_per_key():
+    storage = MemoryThrottleStorage(clock=FakeClock())
+
+    async def run():
+        assert await storage.consume("a", rate=1, capacity=1) == 0.0
+        assert await storage.consume("a", rate=1, capacity=1) > 0
+        assert await storage.consume("b", rate=1, capacity=1) == 0.0
+
+    asyncio.run(run())
+
+def test_command_name_parsing():
+    assert ThrottlingMiddleware.get_command(make_message("/send abc12345 hi")) == "send"
+    assert ThrottlingMiddleware.get_command(make_message("/Create_ID@DropKeyBot")) == "create_id"
+    assert ThrottlingMiddleware.get_command(make_message("hello")) is None
+
+def test_middleware_drops_excess_commands():
+    storage = MemoryThrottleStorage(clock=FakeClock())
+    middleware = ThrottlingMiddleware(
+        storage=storage, rate=100, burst=100,
+        command_limits={"send": (1, 2)}, notice_interval=3600
+    )
+    handled = []
+
+    async def handler(event, data):
+        handled.append(event.text)
+
+    async def run():
+        message = make_message("/send abc12345")
+        data = {"event_from_user": message.from_user}
+        for _ in range(3):
+            # The throttle notice goes through message.answer, which has no bot here
+            await middleware(handler, message, data)
+
+        other = make_message("/inbox")
+        await middleware(handler, other, data)
+
+    asyncio.run(run())
+    assert handled == ["/send abc12345", "/send abc12345", "/inbox"]
+
+def test_album_items_are_charged_once():
+    storage = MemoryThrottleStorage(clock=FakeClock())
+    middleware = ThrottlingMiddleware(storage=storage, rate=1, burst=1, notice_interval=3600)
+    handled = []
+
+    async def handler(event, data):
+        handled.append(event.message_id)
+
+    async def run():
+        for message_id in range(1, 6):
+            message = make_message("").model_copy(
+                update={"message_id": message_id, "text": None, "media_group_id": "album1"}
+            )
+            await middleware(handler, message, {"event_from_user": message.from_user})
+
+    asyncio.run(run())
+    assert handled == [1, 2, 3, 4, 5]
+
+def test_refused_command_does_not_spend_user_tokens():
+    storage = MemoryThrottleStorage(clock=FakeClock())
+    middleware = ThrottlingMiddleware(
+        storage=storage, rate=1, burst=3,
+        command_limits={"send": (1, 1)}, notice_interval=3600
+    )
+    handled = []
+
+    async def handler(event, data):
+        handled.append(event.text)
+
+    async def run():
+        send = make_message("/send abc12345")
+        data = {"event_from_user": send.from_user}
+        for _ in range(3):
+            await middleware(handler, send, data)
+
+        # Two /send were refused by the command bucket; the user bucket still has 2 tokens
+        for _ in range(2):
+            await middleware(handler, make_message("/inbox"), data)
+
+    asyncio.run(run())
+    assert handled == ["/send abc12345", "/inbox", "/inbox"]
+
+def test_prune_uses_each_buckets_own_rate():
+    clock = FakeClock()
+    storage = MemoryThrottleStorage(max_keys=2, clock=clock)
+
+    async def run():
+        await storage.consume("slow", rate=0.1, capacity=1)  # refills after 10s
+        await storage.consume("fast", rate=10, capacity=1)   # refills after 0.1s
+        clock.now += 1
+        await storage.consume("new", rate=10, capacity=1)
+
+        # The slow bucket is still empty, so it must not have been forgotten
+        assert await storage.consume("slow", rate=0.1, capacity=1) > 0
+        assert "fast" not in storage._buckets
+
+    asyncio.run(run())
@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+
+import database.operations as operations
+from database.operations import DropIDOperations, InboxOperations, UserOperations
+from database.write_buffer import InboxWriteBuffer
+
+async def test_concurrent_rows_share_one_insert():
+    calls = []
+
+    async def insert_rows(rows):
+        calls.append(rows)
+        return [dict(row, id=i) for i, row in enumerate(rows)]
+
+    buffer = InboxWriteBuffer(insert_rows, window=0.01)
+    results = await asyncio.gather(*(buffer.submit({'n': n}) for n in range(5)))
+
+    assert len(calls) == 1
+    assert [row['n'] for row in results] == [0, 1, 2, 3, 4]
+
+async def test_full_batch_is_written_without_waiting():
+    calls = []
+
+    async def insert_rows(rows):
+        calls.append(len(rows))
+        return rows
+
+    buffer = InboxWriteBuffer(insert_rows, window=60, max_batch=2)
+    await asyncio.wait_for(asyncio.gather(buffer.submit({'n': 1}), buffer.submit({'n': 2})), timeout=1)
+    assert calls == [2]
+
+async def test_failed_batch_falls_back_to_single_rows():
+    async def insert_rows(rows):
+        if any(row['n'] == 'bad' for row in rows):
+            raise ValueError("rejected")
+        return rows
+
+    buffer = InboxWriteBuffer(insert_rows, window=0.01)
+    good, bad = await asyncio.gather(
+        buffer.submit({'n': 'good'}), buffer.submit({'n': 'bad'}), return_exceptions=True
+    )
+    assert good == {'n': 'good'}
+    assert isinstance(bad, ValueError)
+
+async def test_rows_are_padded_to_the_same_columns():
+    seen = []
+
+    async def insert_rows(rows):
+        seen.extend(rows)
+        return rows
+
+    buffer = InboxWriteBuffer(insert_rows, window=0.01)
+    await asyncio.gather(buffer.submit({'a': 1}), buffer.submit({'a': 2, 'b': 3}))
+    assert seen == [{'a': 1, 'b': None}, {'a': 2, 'b': 3}]
+
+async def test_close_flushes_pending_rows():
+    async def insert_rows(rows):
+        return rows
+
+    buffer = InboxWriteBuffer(insert_rows, window=60)
+    pending = asyncio.create_task(buffer.submit({'n': 1}))
+    await asyncio.sleep(0)
+    await buffer.close()
+    assert await pending == {'n': 1}
+
+async def test_inbox_operations_use_buffer(fake_db, monkeypatch):
+    monkeypatch.setattr(operations, "inbox_write_buffer", InboxWriteBuffer(InboxOperations.insert_items))
+    await UserOperations.get_or_create_user(1)
+    drop_id = (await DropIDOperations.create_drop_id(1)).id
+
+    items = await asyncio.gather(*(
+        InboxOperations.add_inbox_item(drop_id=drop_id, sender_anon_id="a", message_text=f"m{i}")
+        for i in range(4)
+    ))
+
+    assert [item.message_text for item in items] == ["m0", "m1", "m2", "m3"]
+    inserts = [query for query in fake_db.queries if query.action == 'insert' and query.table_name == 'inbox_items']
+    assert len(inserts) == 1
@@ -0,0 +1,39 @@
+import hashlib
+import math
+from typing import Iterable
+
+class BloomFilter:
+    """Probabilistic set: no false negatives, tunable false-positive rate"""
+    
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        if capacity <= 0 or not 0 < error_rate < 1:
+            raise ValueError("Bloom filter needs a positive capacity and 0 < error_rate < 1")
+        
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+    
+    @classmethod
+    def from_iterable(cls, items: Iterable[str], capacity: int, error_rate: float = 0.001) -> "BloomFilter":
+        bloom = cls(capacity, error_rate)
+        for item in items:
+            bloom.add(item)
+        return bloom
+    
+    def _positions(self, item: str):
+        # Double hashing: two 64-bit halves of one digest give every probe position
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+    
+    def add(self, item: str):
+        for pos in self._positions(item):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+    
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
@@ -0,0 +1,50 @@
+from collections import OrderedDict
+import time
+from typing import Any, Callable, Hashable
+
+_MISSING = object()
+
+class TTLCache:
+    """Small LRU cache whose entries expire after `ttl` seconds"""
+    
+    def __init__(self, maxsize: int = 10_000, ttl: float = 300,
+                 clock: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data: OrderedDict = OrderedDict()
+    
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get a cached value, or `default` if missing or expired"""
+        entry = self._data.get(key, _MISSING)
+        if entry is _MISSING:
+            return default
+        
+        value, expires_at = entry
+        if self._clock() >= expires_at:
+            del self._data[key]
+            return default
+        
+        self._data.move_to_end(key)
+        return value
+    
+    def set(self, key: Hashable, value: Any = True):
+        """Store a value, evicting the least recently used entry when full"""
+        self._data[key] = (value, self._clock() + self.ttl)
+        self._data.move_to_end(key)
+        
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+    
+    def discard(self, key: Hashable):
+        """Remove a key if present"""
+        self._data.pop(key, None)
+    
+    def clear(self):
+        self._data.clear()
+    
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+    
+    def __len__(self) -> int:
+        return len(self._data)
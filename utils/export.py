@@ -0,0 +1,80 @@
+import asyncio
+import json
+import tempfile
+import zipfile
+from datetime import datetime
+from typing import IO, AsyncIterable, List
+
+MANIFEST_NAME = "manifest.json"
+# The manifest stays in memory up to this size, then spills to disk
+MANIFEST_SPOOL_SIZE = 1024 * 1024
+
+class InboxArchiveWriter:
+    """Writes inbox items into a ZIP file one page at a time
+
+    Message texts are stored as messages/<id>.txt as they arrive. The JSON
+    manifest (one entry per item) is spooled to a temporary file, because a
+    ZIP entry must be complete before the next one starts, and is added
+    last. Memory use is bounded by one page of items.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.count = 0
+        self._zip = zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED)
+        self._manifest: IO[str] = tempfile.SpooledTemporaryFile(max_size=MANIFEST_SPOOL_SIZE, mode="w+")
+        self._manifest.write('{"exported_at": %s, "items": [' % json.dumps(datetime.utcnow().isoformat()))
+
+    def add_page(self, items: List) -> None:
+        """Add a page of InboxItem objects"""
+        for item in items:
+            entry = {
+                "id": item.id,
+                "drop_id": item.drop_id,
+                "sender": item.sender_anon_id,
+                "created_at": item.created_at.isoformat(),
+                "type": item.file_type or "text",
+                "text_file": None,
+            }
+            if item.file_id:
+                entry.update(file_id=item.file_id, file_name=item.file_name,
+                             file_size=item.file_size, mime_type=item.mime_type)
+            if item.message_text:
+                entry["text_file"] = f"messages/{item.id}.txt"
+                self._zip.writestr(entry["text_file"], item.message_text)
+
+            self._manifest.write(("," if self.count else "") + "\n  " + json.dumps(entry, ensure_ascii=False))
+            self.count += 1
+
+    def close(self) -> None:
+        """Add the manifest and finish the ZIP file"""
+        try:
+            self._manifest.write("\n]}\n")
+            self._manifest.seek(0)
+            with self._zip.open(MANIFEST_NAME, "w") as target:
+                for chunk in iter(lambda: self._manifest.read(64 * 1024), ""):
+                    target.write(chunk.encode("utf-8"))
+        finally:
+            self._manifest.close()
+            self._zip.close()
+
+    def abort(self) -> None:
+        self._manifest.close()
+        self._zip.close()
+
+async def write_inbox_archive(pages: AsyncIterable[List], path: str) -> int:
+    """Stream pages of inbox items into a ZIP at `path`; returns the number of items
+
+    Compression and disk writes run in a worker thread, one page at a time,
+    so the event loop keeps serving other users during a large export.
+    """
+    writer = await asyncio.to_thread(InboxArchiveWriter, path)
+    try:
+        async for items in pages:
+            await asyncio.to_thread(writer.add_page, items)
+    except BaseException:
+        await asyncio.to_thread(writer.abort)
+        raise
+
+    await asyncio.to_thread(writer.close)
+    return writer.count
@@ -1,5 +1,17 @@
-import re
-from typing import Dict, Any
+from typing import Dict, Iterable, List, NamedTuple, Tuple
+
+class FileClassification(NamedTuple):
+    """Result of classifying one file"""
+    category: str
+    extension: str
+    is_dangerous: bool
+
+def get_extension(file_name: str) -> str:
+    """Lower-case extension without the dot ('' if there is none)"""
+    if not file_name:
+        return ''
+    _, dot, ext = file_name.rpartition('.')
+    return ext.lower() if dot else ''
 
 class FileTypeDetector:
     """Detect and categorize file types"""
@@ -13,32 +25,41 @@ class FileTypeDetector:
         'application/vnd.ms-excel', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
     }
     
+    EXTENSION_CATEGORIES = {
+        'image': {'jpg', 'jpeg', 'png', 'gif', 'bmp', 'webp'},
+        'audio': {'mp3', 'ogg', 'wav', 'm4a'},
+        'video': {'mp4', 'avi', 'mkv', 'mov'},
+        'document': {'pdf', 'txt', 'doc', 'docx', 'xls', 'xlsx'},
+    }
+    
+    @staticmethod
+    def classify(mime_type: str, file_name: str = "") -> FileClassification:
+        """Categorize a file and flag dangerous extensions with a single name parse"""
+        ext = get_extension(file_name)
+        ext_category, dangerous = _EXTENSION_INDEX.get(ext, _UNKNOWN_EXTENSION)
+        
+        mime_type = mime_type or ''
+        category = _MIME_INDEX.get(mime_type)
+        if category is None:
+            category = 'text' if mime_type.startswith('text/') else ext_category
+        return FileClassification(category, ext, dangerous)
+    
+    @staticmethod
+    def classify_batch(files: Iterable[Dict]) -> List[FileClassification]:
+        """Classify several files (dicts with mime_type/file_name), e.g. an album"""
+        classify = FileTypeDetector.classify
+        return [classify(file_info.get('mime_type'), file_info.get('file_name')) for file_info in files]
+    
     @staticmethod
     def categorize_file(mime_type: str, file_name: str = "") -> str:
         """Categorize file into broad types"""
-        if mime_type in FileTypeDetector.IMAGE_TYPES:
-            return 'image'
-        elif mime_type in FileTypeDetector.AUDIO_TYPES:
-            return 'audio'
-        elif mime_type in FileTypeDetector.VIDEO_TYPES:
-            return 'video'
-        elif mime_type in FileTypeDetector.DOCUMENT_TYPES:
-            return 'document'
-        elif mime_type.startswith('text/'):
+        category = _MIME_INDEX.get(mime_type)
+        if category is not None:
+            return category
+        if mime_type and mime_type.startswith('text/'):
             return 'text'
-        else:
-            # Try to determine from file extension
-            if file_name:
-                ext = file_name.lower().split('.')[-1] if '.' in file_name else ''
-                if ext in {'jpg', 'jpeg', 'png', 'gif', 'bmp', 'webp'}:
-                    return 'image'
-                elif ext in {'mp3', 'ogg', 'wav', 'm4a'}:
-                    return 'audio'
-                elif ext in {'mp4', 'avi', 'mkv', 'mov'}:
-                    return 'video'
-                elif ext in {'pdf', 'txt', 'doc', 'docx', 'xls', 'xlsx'}:
-                    return 'document'
-            return 'unknown'
+        # Only parse the name when the MIME type doesn't decide
+        return _EXTENSION_INDEX.get(get_extension(file_name), _UNKNOWN_EXTENSION)[0]
     
     @staticmethod
     def get_file_icon(file_type: str) -> str:
@@ -83,20 +104,38 @@ class FileValidator:
     @staticmethod
     def is_file_safe(file_name: str, mime_type: str) -> bool:
         """Check if file is safe to accept"""
-        if not file_name:
-            return True
-            
-        # Check extension
-        ext = file_name.lower().split('.')[-1] if '.' in file_name else ''
-        if ext in FileValidator.DANGEROUS_EXTENSIONS:
-            return False
-            
-        # Additional safety checks can be added here
-        return True
+        # Same extension index as FileTypeDetector.classify, so one parse per check
+        return not _EXTENSION_INDEX.get(get_extension(file_name), _UNKNOWN_EXTENSION)[1]
     
     @staticmethod
     def is_size_within_limit(file_size: int) -> bool:
         """Check if file size is within limits"""
         if file_size is None:
             return True  # Some files might not have size info
-        return file_size <= FileValidator.MAX_FILE_SIZE
\ No newline at end of file
+        return file_size <= FileValidator.MAX_FILE_SIZE
+
+def _build_mime_index() -> Dict[str, str]:
+    index = {}
+    for category, mime_types in (
+        ('image', FileTypeDetector.IMAGE_TYPES),
+        ('audio', FileTypeDetector.AUDIO_TYPES),
+        ('video', FileTypeDetector.VIDEO_TYPES),
+        ('document', FileTypeDetector.DOCUMENT_TYPES),
+    ):
+        for mime_type in mime_types:
+            index.setdefault(mime_type, category)
+    return index
+
+def _build_extension_index() -> Dict[str, Tuple[str, bool]]:
+    index = {}
+    for category, extensions in FileTypeDetector.EXTENSION_CATEGORIES.items():
+        for ext in extensions:
+            index[ext] = (category, ext in FileValidator.DANGEROUS_EXTENSIONS)
+    for ext in FileValidator.DANGEROUS_EXTENSIONS:
+        index.setdefault(ext, ('unknown', True))
+    return index
+
+# Built once at import: MIME type -> category, extension -> (category, dangerous)
+_MIME_INDEX = _build_mime_index()
+_EXTENSION_INDEX = _build_extension_index()
+_UNKNOWN_EXTENSION = ('unknown', False)
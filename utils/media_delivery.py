@@ -0,0 +1,109 @@
+import asyncio
+import logging
+from typing import List
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramBadRequest, TelegramRetryAfter
+from aiogram.types import InputMediaAudio, InputMediaDocument, InputMediaPhoto, InputMediaVideo
+
+logger = logging.getLogger(__name__)
+
+# sendMediaGroup accepts 2-10 items
+MEDIA_GROUP_LIMIT = 10
+
+def media_kind(file_type: str) -> str:
+    """Telegram only mixes photos with videos; audio and documents group with their own kind"""
+    if file_type in ('image', 'video'):
+        return 'visual'
+    if file_type == 'audio':
+        return 'audio'
+    return 'document'
+
+def build_media_batches(items: list, limit: int = MEDIA_GROUP_LIMIT) -> List[list]:
+    """Split file items into sendable groups of one kind, keeping their order within a kind"""
+    by_kind = {}
+    for item in items:
+        by_kind.setdefault(media_kind(item.file_type), []).append(item)
+    
+    batches = []
+    for kind_items in by_kind.values():
+        for start in range(0, len(kind_items), limit):
+            batches.append(kind_items[start:start + limit])
+    return batches
+
+def file_caption(item) -> str:
+    """Caption with the anonymous sender, like single-file delivery"""
+    sender_info = f"👤 From: Anonymous ({item.sender_anon_id})"
+    if item.message_text:
+        return f"{item.message_text}\n\n{sender_info}"
+    return f"📎 {item.file_name or 'File'}\n\n{sender_info}"
+
+def to_input_media(item):
+    caption = file_caption(item)
+    if item.file_type == 'image':
+        return InputMediaPhoto(media=item.file_id, caption=caption, parse_mode=None)
+    if item.file_type == 'video':
+        return InputMediaVideo(media=item.file_id, caption=caption, parse_mode=None)
+    if item.file_type == 'audio':
+        return InputMediaAudio(media=item.file_id, caption=caption, parse_mode=None)
+    return InputMediaDocument(media=item.file_id, caption=caption, parse_mode=None)
+
+async def send_single_file(bot: Bot, chat_id: int, item):
+    caption = file_caption(item)
+    if item.file_type == 'image':
+        await bot.send_photo(chat_id, photo=item.file_id, caption=caption, parse_mode=None)
+    elif item.file_type == 'video':
+        await bot.send_video(chat_id, video=item.file_id, caption=caption, parse_mode=None)
+    elif item.file_type == 'audio':
+        await bot.send_audio(chat_id, audio=item.file_id, caption=caption, parse_mode=None)
+    else:
+        await bot.send_document(chat_id, document=item.file_id, caption=caption, parse_mode=None)
+
+async def send_with_retry(send, chat_id: int, max_retries: int = 3):
+    """Await `send()`, waiting out Telegram flood limits up to `max_retries` times"""
+    for attempt in range(max_retries + 1):
+        try:
+            return await send()
+        except TelegramRetryAfter as e:
+            if attempt == max_retries:
+                raise
+            logger.warning(f"Flood limit while delivering files to {chat_id}, waiting {e.retry_after}s")
+            await asyncio.sleep(e.retry_after)
+
+async def send_one_by_one(bot: Bot, chat_id: int, items: list, max_retries: int = 3) -> int:
+    """Send items as single messages, skipping ones Telegram rejects; returns how many were sent"""
+    sent = 0
+    for item in items:
+        try:
+            await send_with_retry(lambda: send_single_file(bot, chat_id, item), chat_id, max_retries)
+            sent += 1
+        except TelegramBadRequest as e:
+            logger.warning(f"Could not deliver inbox item {item.id} to {chat_id}: {e}")
+    return sent
+
+async def deliver_files(bot: Bot, chat_id: int, items: list, pause: float = 1.0,
+                        max_retries: int = 3) -> int:
+    """Send file items as media groups; returns how many files were delivered"""
+    delivered = 0
+    batches = build_media_batches(items)
+    
+    for index, batch in enumerate(batches):
+        if len(batch) == 1:
+            delivered += await send_one_by_one(bot, chat_id, batch, max_retries)
+        else:
+            try:
+                await send_with_retry(
+                    lambda: bot.send_media_group(chat_id, media=[to_input_media(item) for item in batch]),
+                    chat_id, max_retries
+                )
+                delivered += len(batch)
+            except TelegramBadRequest as e:
+                # One unusable file fails the whole group; the others can still go out alone
+                logger.warning(f"Media group rejected for {chat_id}, sending its files one by one: {e}")
+                delivered += await send_one_by_one(bot, chat_id, batch, max_retries)
+        
+        # Stay under Telegram's per-chat message rate between groups
+        if index < len(batches) - 1:
+            await asyncio.sleep(pause)
+    
+    return delivered
@@ -0,0 +1,66 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, List
+
+logger = logging.getLogger(__name__)
+
+class MediaGroupCollector:
+    """Collects album (media group) messages and hands them over as one batch
+    
+    Telegram delivers every album item as a separate update. Items are
+    buffered per key until no new item arrived for `window` seconds.
+    """
+    
+    def __init__(self, window: float = 1.0):
+        self.window = window
+        self._groups: Dict[Hashable, List[Any]] = {}
+        self._last_seen: Dict[Hashable, float] = {}
+        self._callbacks: Dict[Hashable, Callable[[List[Any]], Awaitable]] = {}
+        self._tasks: Dict[Hashable, asyncio.Task] = {}
+    
+    def add(self, key: Hashable, item: Any, on_complete: Callable[[List[Any]], Awaitable]) -> bool:
+        """Buffer an item; returns True if it started a new group"""
+        self._last_seen[key] = time.monotonic()
+        
+        if key in self._groups:
+            self._groups[key].append(item)
+            return False
+        
+        self._groups[key] = [item]
+        self._callbacks[key] = on_complete
+        self._tasks[key] = asyncio.create_task(self._flush_when_quiet(key))
+        return True
+    
+    def __len__(self) -> int:
+        return len(self._groups)
+    
+    async def _flush_when_quiet(self, key: Hashable):
+        while True:
+            delay = self._last_seen[key] + self.window - time.monotonic()
+            if delay <= 0:
+                break
+            await asyncio.sleep(delay)
+        
+        self._tasks.pop(key, None)
+        await self._flush(key)
+    
+    async def _flush(self, key: Hashable):
+        items = self._groups.pop(key, None)
+        callback = self._callbacks.pop(key, None)
+        self._last_seen.pop(key, None)
+        
+        if not items:
+            return
+        try:
+            await callback(items)
+        except Exception as e:
+            logger.error(f"Error processing media group {key}: {e}", exc_info=True)
+    
+    async def flush_all(self):
+        """Process every pending group immediately (used on shutdown)"""
+        for key in list(self._groups):
+            task = self._tasks.pop(key, None)
+            if task:
+                task.cancel()
+            await self._flush(key)
@@ -0,0 +1,63 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+class DropNotifier:
+    """Coalesces new-item notifications into one digest per owner
+
+    The first item for an owner starts a `window` second timer; items that
+    arrive before it fires are counted into the same digest. The timer is
+    not extended by later items, so a steady stream still produces one
+    digest per window.
+    """
+
+    def __init__(self, window: float = 10.0):
+        self.window = window
+        self._pending: Dict[int, Dict[str, int]] = {}
+        self._senders: Dict[int, Callable[[int, Dict[str, int]], Awaitable]] = {}
+        self._tasks: Dict[int, asyncio.Task] = {}
+
+    def add(self, owner_id: int, drop_id: str, count: int,
+            send: Callable[[int, Dict[str, int]], Awaitable]) -> bool:
+        """Count new items for an owner; returns True if it started a new digest
+
+        `send(owner_id, counts_by_drop_id)` delivers the digest when the window ends.
+        """
+        counts = self._pending.get(owner_id)
+        if counts is not None:
+            counts[drop_id] = counts.get(drop_id, 0) + count
+            return False
+
+        self._pending[owner_id] = {drop_id: count}
+        self._senders[owner_id] = send
+        self._tasks[owner_id] = asyncio.create_task(self._send_later(owner_id))
+        return True
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    async def _send_later(self, owner_id: int):
+        await asyncio.sleep(self.window)
+        self._tasks.pop(owner_id, None)
+        await self._flush(owner_id)
+
+    async def _flush(self, owner_id: int):
+        counts = self._pending.pop(owner_id, None)
+        send = self._senders.pop(owner_id, None)
+        if not counts:
+            return
+        try:
+            await send(owner_id, counts)
+        except Exception as e:
+            # e.g. the owner blocked the bot; the items are in the inbox either way
+            logger.warning(f"Could not notify user {owner_id} about new items: {e}")
+
+    async def flush_all(self):
+        """Send every pending digest immediately (used on shutdown)"""
+        for owner_id in list(self._pending):
+            task = self._tasks.pop(owner_id, None)
+            if task:
+                task.cancel()
+            await self._flush(owner_id)
@@ -0,0 +1,100 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, List
+
+logger = logging.getLogger(__name__)
+
+class SendSession:
+    """Files buffered for one Drop ID until the sender's session ends"""
+
+    def __init__(self, drop_id: str, target_drop: Any, max_files: int, timeout: float):
+        self.drop_id = drop_id
+        self.target_drop = target_drop
+        self.max_files = max_files
+        self.expires_at = time.monotonic() + timeout
+        self.files: List[dict] = []
+        self.rejected: List[tuple] = []
+
+    @property
+    def is_full(self) -> bool:
+        return len(self.files) >= self.max_files
+
+    def add_files(self, files: List[dict]) -> int:
+        """Buffer files up to the session limit; returns how many were accepted"""
+        room = max(0, self.max_files - len(self.files))
+        accepted = files[:room]
+        self.files.extend(accepted)
+
+        for file_info in files[room:]:
+            self.rejected.append((file_info.get('file_name') or 'file', "session limit reached"))
+        return len(accepted)
+
+class SendSessionManager:
+    """Open send sessions, closed when full, finished by the sender, or timed out
+
+    Closing a session awaits its `on_close(session, reason)` callback exactly
+    once, where reason is one of "full", "done", "timeout", "replaced" or
+    "shutdown".
+    """
+
+    def __init__(self, max_files: int = 10, timeout: float = 120):
+        self.max_files = max_files
+        self.timeout = timeout
+        self._sessions: Dict[Hashable, SendSession] = {}
+        self._callbacks: Dict[Hashable, Callable[[SendSession, str], Awaitable]] = {}
+        self._timers: Dict[Hashable, asyncio.Task] = {}
+
+    def open(self, key: Hashable, drop_id: str, target_drop: Any,
+             on_close: Callable[[SendSession, str], Awaitable]) -> SendSession:
+        """Start a session; an existing session for the key must be closed first"""
+        if key in self._sessions:
+            raise RuntimeError(f"Send session {key} is already open")
+
+        session = SendSession(drop_id, target_drop, self.max_files, self.timeout)
+        self._sessions[key] = session
+        self._callbacks[key] = on_close
+        self._timers[key] = asyncio.create_task(self._expire_later(key, session))
+        return session
+
+    def get(self, key: Hashable) -> SendSession:
+        return self._sessions.get(key)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    async def close(self, key: Hashable, reason: str) -> bool:
+        """End a session and run its callback; False if it was already closed"""
+        session = self._sessions.pop(key, None)
+        callback = self._callbacks.pop(key, None)
+        timer = self._timers.pop(key, None)
+
+        if session is None:
+            return False
+        if timer and timer is not asyncio.current_task():
+            timer.cancel()
+
+        try:
+            await callback(session, reason)
+        except Exception as e:
+            logger.error(f"Error closing send session {key}: {e}", exc_info=True)
+        return True
+
+    def discard(self, key: Hashable) -> SendSession:
+        """End a session without running its callback (sender cancelled)"""
+        session = self._sessions.pop(key, None)
+        self._callbacks.pop(key, None)
+        timer = self._timers.pop(key, None)
+        if timer:
+            timer.cancel()
+        return session
+
+    async def close_all(self, reason: str = "shutdown"):
+        """Close every open session (used on shutdown)"""
+        for key in list(self._sessions):
+            await self.close(key, reason)
+
+    async def _expire_later(self, key: Hashable, session: SendSession):
+        await asyncio.sleep(max(0, session.expires_at - time.monotonic()))
+        if self._sessions.get(key) is session:
+            await self.close(key, "timeout")
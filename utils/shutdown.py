@@ -0,0 +1,68 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+class ShutdownStep(NamedTuple):
+    name: str
+    run: Callable[[], Awaitable]
+    pending: Optional[Callable[[], int]]
+
+class ShutdownCoordinator:
+    """Runs the shutdown steps in order within one overall deadline
+
+    Each step gets whatever is left of `timeout`. A step that times out or
+    fails is recorded with how much work it still had pending (if it can
+    tell), and the remaining steps still run - closing connections must
+    happen even when draining did not finish.
+    """
+
+    def __init__(self, timeout: float = 25.0):
+        self.timeout = timeout
+        self._steps: List[ShutdownStep] = []
+        self._started = False
+
+    def add_step(self, name: str, run: Callable[[], Awaitable],
+                 pending: Callable[[], int] = None):
+        """Register a step; steps run in registration order"""
+        self._steps.append(ShutdownStep(name, run, pending))
+
+    async def shutdown(self) -> Dict[str, int]:
+        """Run every step; returns {step name: abandoned work} for steps that did not finish"""
+        if self._started:
+            return {}
+        self._started = True
+
+        deadline = time.monotonic() + self.timeout
+        abandoned = {}
+        for step in self._steps:
+            remaining = max(0.0, deadline - time.monotonic())
+            started = time.monotonic()
+            try:
+                await asyncio.wait_for(step.run(), timeout=remaining or 0.001)
+                logger.info(f"Shutdown: {step.name} done in {(time.monotonic() - started) * 1000:.0f} ms")
+                continue
+            except asyncio.TimeoutError:
+                logger.warning(f"Shutdown: {step.name} did not finish before the deadline")
+            except Exception as e:
+                logger.error(f"Shutdown: {step.name} failed: {e}")
+
+            abandoned[step.name] = self._pending(step)
+
+        if abandoned:
+            report = ", ".join(f"{name} ({count} pending)" for name, count in abandoned.items())
+            logger.warning(f"Shutdown finished with abandoned work: {report}")
+        else:
+            logger.info("Shutdown finished cleanly")
+        return abandoned
+
+    @staticmethod
+    def _pending(step: ShutdownStep) -> int:
+        if step.pending is None:
+            return 0
+        try:
+            return step.pending()
+        except Exception:
+            return 0
@@ -0,0 +1,22 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+def run_periodically(func: Callable[[], Awaitable], interval: float, name: str,
+                     run_immediately: bool = True) -> asyncio.Task:
+    """Start a background task that awaits `func()` every `interval` seconds"""
+    async def loop():
+        if not run_immediately:
+            await asyncio.sleep(interval)
+        while True:
+            try:
+                await func()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Background task {name} failed: {e}")
+            await asyncio.sleep(interval)
+    
+    return asyncio.create_task(loop(), name=name)
@@ -0,0 +1,5 @@
+def safe_truncate(text: str, max_length: int = 50) -> str:
+    """Safely truncate text without breaking Markdown"""
+    if len(text) <= max_length:
+        return text
+    return text[:max_length-3] + "..."